@@ -0,0 +1,101 @@
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from agregados import elecciones_disponibles
+from consultas import DIMENSIONES, obtener_indice
+from figuras import figura_cacheada
+from padron import version_padron
+
+
+def figura_participacion(tabla, por):
+  # Con más de una dimensión: la última va al color, el resto al eje x
+  datos = tabla.assign(participacion_pct=(tabla["participacion"] * 100).round(1))
+  color = None
+  if len(por) > 1:
+    color = por[-1]
+    datos["grupo"] = datos[por[:-1]].astype(str).agg(" · ".join, axis=1)
+    x = "grupo"
+  else:
+    x = por[0]
+
+  fig = px.bar(
+    datos,
+    x=x,
+    y="participacion_pct",
+    color=color,
+    barmode="group",
+    hover_data=["electores", "con_informacion", "votaron"],
+    title="Participación conocida (%)",
+  )
+  fig.update_layout(
+    xaxis_title=" · ".join(DIMENSIONES[d] for d in (por[:-1] if color else por)),
+    yaxis_title="Participación (%)",
+    legend_title_text=DIMENSIONES.get(color, ""),
+  )
+  return fig
+
+
+def pagina5(df):
+  st.title("🔎 Consultas cruzadas")
+  st.markdown(
+    "Elegí cualquier combinación de filtros y de dimensiones para agrupar: "
+    "se muestran la cantidad de electores y la participación conocida "
+    "(votaron / con información) de cada grupo."
+  )
+
+  elecciones = elecciones_disponibles(df)
+  if not elecciones:
+    st.info("El padrón no tiene columnas de voto.")
+    return
+  eleccion = st.selectbox("Elección", elecciones, key="consulta_eleccion")
+
+  # Bitmaps por valor de cada dimensión, armados una vez por versión
+  indice = obtener_indice(df, eleccion)
+
+  # ============================
+  # Filtros y agrupación
+  # ============================
+  st.subheader("Filtros")
+  columnas = st.columns(3)
+  filtros = {}
+  for i, (dimension, nombre) in enumerate(DIMENSIONES.items()):
+    with columnas[i % 3]:
+      filtros[dimension] = st.multiselect(nombre, indice.valores(dimension), key=f"consulta_filtro_{dimension}")
+
+  por = st.multiselect(
+    "Agrupar por",
+    list(DIMENSIONES),
+    default=["rango_edad"],
+    format_func=DIMENSIONES.get,
+    key="consulta_por",
+  )
+
+  # ============================
+  # Resultado
+  # ============================
+  tabla = indice.consultar(filtros, por)
+  total = tabla[["electores", "con_informacion", "votaron"]].sum()
+
+  col1, col2, col3 = st.columns(3)
+  col1.metric("Electores", f"{int(total['electores']):,}".replace(",", "."))
+  col2.metric("Con información", f"{int(total['con_informacion']):,}".replace(",", "."))
+  participacion = total["votaron"] / total["con_informacion"] if total["con_informacion"] else float("nan")
+  col3.metric("Participación conocida", "-" if pd.isna(participacion) else f"{participacion:.1%}")
+
+  if por and len(tabla) > 0:
+    clave = (eleccion, tuple((d, tuple(v)) for d, v in filtros.items()), tuple(por))
+    fig = figura_cacheada("consulta_cruzada", version_padron(df), lambda: figura_participacion(tabla, por), clave)
+    st.plotly_chart(fig, width="stretch")
+
+  st.dataframe(
+    tabla.rename(columns={
+      **DIMENSIONES,
+      "electores": "Electores",
+      "con_informacion": "Con información",
+      "votaron": "Votaron",
+      "participacion": "Participación",
+    }),
+    use_container_width=True,
+    hide_index=True,
+  )
@@ -2,17 +2,31 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
-def elecotes_conocidos(df, column):
+from agregados import obtener_cubo, sumar
+from clasificacion import INFORMACION
+from figuras import figura_cacheada
+from padron import version_padron
+from participacion import imputar_participacion
+
+def figura_cobertura(df, column):
 
   # ===============================================================
   # 1️⃣ PRIMER GRÁFICO  
   # True o False (tienen info) vs None (no hay información)
   # ===============================================================
 
-  df["tiene_informacion"] = df[column].apply(lambda x: "Con información" if x in [True, False] else "Sin información")
+  cubo = obtener_cubo(df)
+  eleccion = column.removeprefix("voto_")
+  por_estado = sumar(cubo, ["estado_voto"], eleccion=eleccion)
 
-  conteo_info = df["tiene_informacion"].value_counts().reset_index()
-  conteo_info.columns = ["categoria", "cantidad"]
+  conteo_info = pd.DataFrame({
+    "categoria": INFORMACION,
+    "cantidad": [
+      por_estado.get("Votó", 0) + por_estado.get("No votó", 0),
+      por_estado.get("Sin información", 0),
+    ],
+  })
+  conteo_info = conteo_info.sort_values("cantidad", ascending=False)
 
   fig1 = px.pie(
     conteo_info,
@@ -32,20 +46,25 @@ def elecotes_conocidos(df, column):
     hovertemplate="%{label}<br>%{value} votos",
     textinfo="label+percent"
   )
+  return fig1
 
-  st.plotly_chart(fig1, width="stretch")
 
+def figura_votantes(df, column):
 
   # ===============================================================
   # 2️⃣ SEGUNDO GRÁFICO  
   # True vs False (solo personas con información)
   # ===============================================================
 
-  df_filtrado = df[df[column].isin([True, False])]
+  cubo = obtener_cubo(df)
+  eleccion = column.removeprefix("voto_")
+  por_estado = sumar(cubo, ["estado_voto"], eleccion=eleccion)
 
-  conteo_tf = df_filtrado[column].value_counts().reset_index()
-  conteo_tf.columns = [column, "cantidad"]
-  conteo_tf[column] = conteo_tf[column].map({True: "Votó", False: "No votó"})
+  conteo_tf = pd.DataFrame({
+    column: ["Votó", "No votó"],
+    "cantidad": [por_estado.get("Votó", 0), por_estado.get("No votó", 0)],
+  })
+  conteo_tf = conteo_tf.sort_values("cantidad", ascending=False)
 
   fig2 = px.pie(
     conteo_tf,
@@ -65,8 +84,54 @@ def elecotes_conocidos(df, column):
     hovertemplate="%{label}<br>%{value} votos",
     textinfo="label+percent"
   )
+  return fig2
+
+
+def figura_imputacion(df, column):
+
+  # ===============================================================
+  # 3️⃣ TERCER GRÁFICO  
+  # Participación estimada por rango de edad (conocidos + imputados)
+  # ===============================================================
 
-  st.plotly_chart(fig2, width="stretch")
+  por_edad = imputar_participacion(df, column.removeprefix("voto_"), ["rango_edad"]).reset_index()
+  por_edad["rango_edad"] = por_edad["rango_edad"].astype(str)
+
+  fig3 = px.bar(
+    por_edad,
+    x="rango_edad",
+    y="participacion",
+    error_y=por_edad["participacion_superior"] - por_edad["participacion"],
+    error_y_minus=por_edad["participacion"] - por_edad["participacion_inferior"],
+    title="Participación estimada en todo el padrón (IC 95%)",
+    labels={"rango_edad": "Rango de edad", "participacion": "Participación"},
+  )
+  fig3.update_layout(yaxis_tickformat=".0%")
+  return fig3
+
+
+def elecotes_conocidos(df, column):
+  # Las figuras se arman solo la primera vez para cada versión del padrón
+  version = version_padron(df)
+  st.plotly_chart(figura_cacheada("cobertura", version, lambda: figura_cobertura(df, column), column), width="stretch")
+  st.plotly_chart(figura_cacheada("votantes_conocidos", version, lambda: figura_votantes(df, column), column), width="stretch")
+
+  # Los "Sin información" se imputan con un modelo entrenado con los conocidos
+  total = imputar_participacion(df, column.removeprefix("voto_"))
+  if total is None:
+    return
+  total = total.iloc[0]
+  st.metric(
+    "Votantes estimados (padrón completo)",
+    f"{total['votaron_conocidos'] + total['votaron_imputados']:,.0f}",
+    help="Votantes conocidos más los imputados entre los electores sin información, "
+    "según edad, género, profesión y zona.",
+  )
+  st.caption(
+    f"Participación estimada {total['participacion']:.1%} "
+    f"(IC 95%: {total['participacion_inferior']:.1%} – {total['participacion_superior']:.1%})"
+  )
+  st.plotly_chart(figura_cacheada("participacion_imputada", version, lambda: figura_imputacion(df, column), column), width="stretch")
 
 
 def elecotes_conocidos_octubre():
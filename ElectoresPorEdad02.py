@@ -2,69 +2,20 @@ import pandas as pd
 import plotly.express as px
 import streamlit as st
 
+from agregados import obtener_cubo, sumar
+from clasificacion import RANGOS_EDAD
+from figuras import figura_cacheada
+from padron import version_padron
 
-def electores_por_edad(df):
-  
-
-  # ============================
-  # Cargar TSV
-  # ============================
-  
-
-  # ============================
-  # Calcular edad
-  # ============================
-  ANIO_ACTUAL = 2025
-  df["edad"] = ANIO_ACTUAL - df["fecha_nacimiento"]
-
-  # ============================
-  # Clasificar rangos etarios
-  # ============================
-  def clasificar_rango(edad):
-    if 16 <= edad <= 24:
-      return "16-24"
-    elif 25 <= edad <= 30:
-      return "25-30"
-    elif 31 <= edad <= 44:
-      return "31-44"
-    elif 45 <= edad <= 60:
-      return "45-60"
-    elif edad > 60:
-      return "61+"
-    else:
-      return None  # menores de 16 se descartan
-
-  df["rango_edad"] = df["edad"].apply(clasificar_rango)
-
-  # Eliminar las filas sin rango válido
-  df = df.dropna(subset=["rango_edad"])
-
-  # ============================
-  # Limpiar columna voto
-  # ============================
-  # Convertimos a booleano real o None
-  df["voto"] = df["voto_septiembre"].map(lambda x: True if x is True else (False if x is False else None))
-
-  # Sacar las filas con voto = None (gente sin información de voto)
-  df_votos = df.dropna(subset=["voto_septiembre"])
-
-  # ============================
-  # Agrupar y contar
-  # ============================
-  conteo = df_votos.groupby(["rango_edad", "voto_septiembre"]).size().unstack(fill_value=0)
-  conteo.columns = ["No votó", "Votó"]
-  conteo = conteo[["Votó", "No votó"]]  # orden lógico
 
-  # ============================
-  # Gráfico Plotly
-  # ============================
+def figura_participacion(conteo):
   fig = px.bar(
     conteo,
     x=conteo.index,
     y=["Votó", "No votó"],
     barmode="group",
     title="Participación electoral por rango etario",
-    category_orders={"rango_edad": ["16-24", "25-30", "31-44", "45-60", "61+"]},
+    category_orders={"rango_edad": RANGOS_EDAD},
     color_discrete_map={
       "Voto": "#2ecc71",
       "No voto": "#e74c3c"
@@ -78,34 +29,45 @@ def electores_por_edad(df):
     hovermode="x unified",
   )
 
+  return fig
+
+
+def electores_por_edad(df):
+  
+
+  # ============================
+  # Conteos desde el cubo agregado
+  # ============================
+  # Solo personas con información de voto (Votó / No votó) y con rango
+  # etario válido (los menores de 16 quedan sin rango y se descartan)
+  cubo = obtener_cubo(df)
+  conteo = (
+    sumar(cubo, ["rango_edad", "estado_voto"], eleccion="septiembre", estado_voto=["Votó", "No votó"])
+    .unstack(fill_value=0)
+    .reindex(index=RANGOS_EDAD, columns=["Votó", "No votó"], fill_value=0)
+  )
+  conteo.index.name = "rango_edad"
+
+  # ============================
+  # Gráfico Plotly (cacheado por versión del padrón)
+  # ============================
+  fig = figura_cacheada("participacion_por_edad", version_padron(df), lambda: figura_participacion(conteo))
   st.plotly_chart(fig, width="stretch")
   # ============================
   # Porcentajes de participación
   # ============================
 
   # Usamos SOLO personas con información (True/False)
-  df_info = df.dropna(subset=["voto_septiembre"])
-
-  # Total por rango (solo con info real)
-  totales = df_info.groupby("rango_edad").size()
-
-  # Cantidad que votaron por rango
-  votaron = df_info[df_info["voto_septiembre"] == True].groupby("rango_edad").size()
-
-  # Construir tabla
   tabla_pct = pd.DataFrame({
-      "Total con información": totales,
-      "Votaron": votaron
-  }).fillna(0)
+      "Total con información": conteo["Votó"] + conteo["No votó"],
+      "Votaron": conteo["Votó"],
+  })
 
   tabla_pct["Votaron"] = tabla_pct["Votaron"].astype(int)
   tabla_pct["Participación (%)"] = (
       tabla_pct["Votaron"] / tabla_pct["Total con información"] * 100
   ).round(2)
 
-  # Orden lógico
-  tabla_pct = tabla_pct.loc[["16-24", "25-30", "31-44", "45-60", "61+"]]
-
   st.subheader("📊 Porcentaje de participación por rango etario (solo personas con información)")
   st.dataframe(tabla_pct)
 
@@ -1,118 +1,87 @@
 import streamlit as st
 import pandas as pd
 import pydeck as pdk
-from shapely.geometry import Polygon
 
+from agregados import obtener_cubo, sumar
+from capas_mapa import DECIMALES_COORDENADAS, DeckConCapasFijas, redondear_coordenadas, serializar_capa
+from clasificacion import RANGOS_EDAD
+from densidad import obtener_hexagonos
+from zonas import obtener_geocodificacion, obtener_zonas
 
-def mapa_electores_conocidos(df):
 
-    # =============================
-    # 1) Cargar polígonos
-    # =============================
-    df_poly = pd.read_csv("data/zonas_coronel_rosales.tsv", sep="\t")
+# =============================
+# Colores por zona
+# =============================
+zona_colores = {
+    "ZONA 1": [255, 87, 51, 120],    # naranja suave
+    "ZONA 2": [70, 130, 180, 120],   # celeste / steelblue
+    "ZONA 3": [60, 179, 113, 120],   # verde suave
+    "ZONA 4": [186, 85, 211, 120],   # violeta pastel
+}
 
-    # Normalizar zona y polígono
-    df_poly["zona"] = df_poly["zona"].astype(str).str.strip()
-    df_poly["poligono"] = df_poly["poligono"].astype(str).str.strip()
 
-    # Crear key uniforme
-    df_poly["key"] = df_poly["zona"] + " - " + df_poly["poligono"]
+def asignar_color(zona):
+    return zona_colores.get(zona, [200, 200, 200, 120])
 
-    # =============================
-    # 2) Normalizar votantes
-    # =============================
-    df_votos = df.copy()
 
-    df_votos["zona"] = df_votos["zona"].astype(str).str.strip()
-    df_votos["poligono"] = df_votos["poligono"].astype(str).str.strip()
-
-    df_votos["key"] = df_votos["zona"] + " - " + df_votos["poligono"]
-
-    # =============================
-    # 3) Verificar claves que no coinciden
-    # =============================
-    keys_poligonos = set(df_poly["key"].unique())
-    keys_votos = set(df_votos["key"].unique())
+@st.cache_resource
+def capa_zonas_serializada(version_zonas, _zonas):
+    """PolygonLayer de las zonas en JSON compacto (no depende del padrón)."""
+    return serializar_capa(pdk.Layer(
+        "PolygonLayer",
+        id="zonas",
+        data=[{
+            "polygon": redondear_coordenadas(coords),
+            "zona": zona,
+            "color": asignar_color(zona)
+        } for coords, zona in zip(_zonas["coords"], _zonas["zona"])],
+        get_polygon="polygon",
+        get_fill_color="color",
+        get_line_color=[0, 0, 0],
+        line_width_min_pixels=1,
+        pickable=True,
+    ))
 
-    faltantes = keys_votos - keys_poligonos
 
-    if len(faltantes) > 0:
-        st.warning("⚠️ Polígonos sin coincidencia en el mapa:\n" + "\n".join(sorted(faltantes)))
+def mapa_electores_conocidos(df):
 
     # =============================
-    # 4) Construir diccionario de polígonos
+    # 1) Catálogo de polígonos (cacheado por archivo)
     # =============================
-    poligonos = {}
-    for key, grupo in df_poly.groupby("key"):
-        grupo_sorted = grupo.sort_values("orden")
-        coords = grupo_sorted[["lon", "lat"]].values.tolist()
-        poligonos[key] = coords
+    # Trae vértices, centroides, áreas y cajas ya calculados
+    zonas = obtener_zonas()
 
     # =============================
-    # 5) Conteo por polígono
+    # 2) Conteo por polígono (desde el cubo agregado)
     # =============================
-    conteo = df_votos.groupby("key").size().reset_index(name="cantidad")
+    conteo = sumar(obtener_cubo(df), ["zona", "poligono"])
+    conteo.index = conteo.index.map(lambda zp: f"{zp[0]} - {zp[1]}")
 
     # =============================
-    # 6) Centroides de cada polígono
+    # 3) Verificar claves que no coinciden
     # =============================
-    centroides_data = []
-
-    for key, coords in poligonos.items():
-        poly = Polygon(coords)
-        cx, cy = poly.centroid.x, poly.centroid.y
+    faltantes = set(conteo.index) - set(zonas.index)
 
-        cantidad = conteo.loc[conteo["key"] == key, "cantidad"]
-        cantidad = int(cantidad.values[0]) if len(cantidad) else 0
-
-        centroides_data.append({
-            "key": key,
-            "lon": cx,
-            "lat": cy,
-            "cantidad": cantidad,
-            "zona": key.split(" - ")[0]  # ej "ZONA 2"
-        })
-
-    df_centroides = pd.DataFrame(centroides_data)
+    if len(faltantes) > 0:
+        st.warning("⚠️ Polígonos sin coincidencia en el mapa:\n" + "\n".join(sorted(faltantes)))
 
     # =============================
-    # 7) Colores por zona
+    # 4) Centroides + cantidad (un solo reindex)
     # =============================
-    zona_colores = {
-        "ZONA 1": [255, 87, 51, 120],    # naranja suave
-        "ZONA 2": [70, 130, 180, 120],   # celeste / steelblue
-        "ZONA 3": [60, 179, 113, 120],   # verde suave
-        "ZONA 4": [186, 85, 211, 120],   # violeta pastel
-    }
-
-    def asignar_color(zona):
-        return zona_colores.get(zona, [200, 200, 200, 120])
-
-    df_poly["zona_color"] = df_poly["zona"].apply(asignar_color)
+    df_centroides = zonas[["key", "lon", "lat", "zona"]].copy()
+    df_centroides["cantidad"] = conteo.reindex(zonas.index, fill_value=0).astype(int).to_numpy()
 
     # =============================
-    # 8) Capas de PyDeck
+    # 5) Capas de PyDeck
     # =============================
 
-    # POLYGON LAYER
-    polygon_layer = pdk.Layer(
-        "PolygonLayer",
-        data=[{
-            "polygon": poligonos[key],
-            "zona": key.split(" - ")[0],
-            "color": asignar_color(key.split(" - ")[0])
-        } for key in poligonos.keys()],
-        get_polygon="polygon",
-        get_fill_color="color",
-        get_line_color=[0, 0, 0],
-        line_width_min_pixels=1,
-        pickable=True,
-    )
+    # POLYGON LAYER → geometría fija, serializada una vez por archivo de zonas
+    polygon_layer = capa_zonas_serializada(zonas.attrs["version"], zonas)
 
     # TEXT LAYER → cantidad por polígono
     text_layer = pdk.Layer(
         "TextLayer",
-        data=df_centroides,
+        data=df_centroides[["lon", "lat", "cantidad"]].round(DECIMALES_COORDENADAS),
         get_position='[lon, lat]',
         get_text="cantidad",
         get_size=28,
@@ -122,16 +91,17 @@ def mapa_electores_conocidos(df):
     )
 
     # =============================
-    # 9) Vista inicial
+    # 6) Vista inicial
     # =============================
     view_state = pdk.ViewState(
-        latitude=df_votos["lat"].mean(),
-        longitude=df_votos["lon"].mean(),
+        latitude=df["lat"].mean(),
+        longitude=df["lon"].mean(),
         zoom=12,
     )
 
-    deck = pdk.Deck(
-        layers=[polygon_layer, text_layer],
+    deck = DeckConCapasFijas(
+        capas_fijas=[polygon_layer],
+        layers=[text_layer],
         initial_view_state=view_state,
         tooltip={"text": "{zona}"} # type: ignore
     )
@@ -139,58 +109,118 @@ def mapa_electores_conocidos(df):
     st.pydeck_chart(deck)
 
 
+# =====================================
+# MAPA DE DENSIDAD (HEXÁGONOS)
+# =====================================
+def mapa_densidad_electores(df):
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        radio_m = st.select_slider("Tamaño del hexágono (m)", [100, 200, 400, 800], value=200, key="hex_radio")
+    with col2:
+        rango = st.selectbox("Rango etario", ["Todos"] + RANGOS_EDAD, key="hex_rango")
+    with col3:
+        metrica = st.radio("Altura", ["Electores", "Participación"], horizontal=True, key="hex_metrica")
+
+    # Binning en el servidor: el navegador recibe hexágonos, no electores
+    hexagonos = obtener_hexagonos(df, "septiembre", radio_m, None if rango == "Todos" else rango)
+    hexagonos = hexagonos.assign(
+        participacion_pct=(hexagonos["participacion"] * 100).round(1),
+        altura=hexagonos["electores"] if metrica == "Electores" else hexagonos["participacion"].fillna(0) * 100,
+    )
+
+    hex_layer = pdk.Layer(
+        "ColumnLayer",
+        data=hexagonos[["lon", "lat", "electores", "votaron", "con_informacion", "participacion_pct", "altura", "color"]],
+        get_position="[lon, lat]",
+        get_elevation="altura",
+        elevation_scale=4 if metrica == "Electores" else 10,
+        radius=radio_m * 0.95,
+        disk_resolution=6,
+        get_fill_color="color",
+        extruded=True,
+        pickable=True,
+    )
+
+    zonas = obtener_zonas()
+    view_state = pdk.ViewState(
+        latitude=df["lat"].mean(),
+        longitude=df["lon"].mean(),
+        zoom=12,
+        pitch=40,
+    )
+
+    deck = DeckConCapasFijas(
+        capas_fijas=[capa_zonas_serializada(zonas.attrs["version"], zonas)],
+        layers=[hex_layer],
+        initial_view_state=view_state,
+        tooltip={"text": "{electores} electores\nParticipación conocida: {participacion_pct}% ({votaron}/{con_informacion})"} # type: ignore
+    )
+
+    st.pydeck_chart(deck)
+    st.caption(f"{len(hexagonos)} hexágonos · color: participación conocida (rojo 0% → verde 100%, gris sin información)")
+
+
+# =====================================
+# CONTROL DE GEOLOCALIZACIÓN
+# =====================================
+def control_geolocalizacion(df):
+    """
+    Reasigna zona/polígono a cada elector desde sus coordenadas y muestra
+    los que quedan fuera de todos los polígonos o no coinciden con la zona
+    precargada en el padrón.
+    """
+    zonas = obtener_zonas()
+    geo = obtener_geocodificacion(df, zonas)
+
+    fuera = df.loc[geo["fuera_de_zona"].to_numpy()]
+    distinta = geo["zona_distinta"]
+
+    with st.expander(f"📍 Control de geolocalización ({len(fuera)} fuera de zona, {int(distinta.sum())} con zona distinta)"):
+        st.markdown(
+            "Zona y polígono recalculados desde lat/lon de cada elector contra los polígonos del mapa."
+        )
+        if len(fuera) > 0:
+            st.markdown("**Electores fuera de todos los polígonos**")
+            st.dataframe(fuera[["nro_documento", "zona", "poligono", "lat", "lon"]], use_container_width=True)
+        if distinta.any():
+            st.markdown("**Zona del padrón vs zona por coordenadas**")
+            cruce = pd.crosstab(
+                geo["key_padron"][distinta].cat.remove_unused_categories(),
+                geo["key_geo"][distinta].cat.remove_unused_categories(),
+            )
+            st.dataframe(cruce, use_container_width=True)
+
+
 # =====================================
 # PÁGINA STREAMLIT
 # =====================================
 def pagina3(df):
     st.title("🗺️ Mapa de Votantes Geolocalizados")
     st.markdown("---")
-    mapa_electores_conocidos(df)
+    modo = st.radio("Modo de mapa", ["Cantidad por zona", "Densidad de electores (hexágonos)"], horizontal=True, key="modo_mapa")
+    if modo == "Cantidad por zona":
+        mapa_electores_conocidos(df)
+    else:
+        mapa_densidad_electores(df)
+    control_geolocalizacion(df)
     st.markdown("## 📊 Análisis por Zona y Polígono")
     st.markdown("### Distribución de Género y Profesión")
 
     # ============================
-    #   LIMPIEZA PROFESIÓN
+    #   TABLAS DESDE EL CUBO
     # ============================
-    df2 = df.copy()
-    df2["profesion"] = df2["profesion"].astype(str).str.upper().str.strip()
-
-    categorias_especiales = ["SIN OCUPACION", "ESTUDIANTE", "NO CONSTA", "JUBILADO"]
+    # El cubo ya trae la profesión normalizada en profesion_categoria
+    cubo = obtener_cubo(df)
 
-    def clasificar_profesion(x):
-        if x in categorias_especiales:
-            return x
-        if x == "" or x == "NAN" or pd.isna(x):
-            return "SIN DATO"
-        return "OTRAS"
-
-    df2["profesion_categoria"] = df2["profesion"].apply(clasificar_profesion)
-
-    # ============================
-    #   TABLA DE GÉNERO
-    # ============================
     genero_tabla = (
-        df2.pivot_table(
-            index=["zona", "poligono"],
-            columns="genero",
-            values="nro_documento",
-            aggfunc="count",
-            fill_value=0,
-        )
+        sumar(cubo, ["zona", "poligono", "genero"])
+        .unstack("genero", fill_value=0)
         .reset_index()
     )
 
-    # ============================
-    #   TABLA DE PROFESIÓN
-    # ============================
     profesion_tabla = (
-        df2.pivot_table(
-            index=["zona", "poligono"],
-            columns="profesion_categoria",
-            values="nro_documento",
-            aggfunc="count",
-            fill_value=0,
-        )
+        sumar(cubo, ["zona", "poligono", "profesion_categoria"])
+        .unstack("profesion_categoria", fill_value=0)
         .reset_index()
     )
 
@@ -4,42 +4,26 @@ import plotly.express as px
 import numpy as np
 import plotly.graph_objects as go
 
-
-def inferir_votantes_septiembre():
-  st.title("Estimación de θ (por franja etaria y partido) - Septiembre")
-
-  # -----------------------------
-  # Cargar datos
-  # -----------------------------
-  df_theta = pd.read_csv("data/septiembre/theta_estimates.csv")
-  df_ci = pd.read_csv("data/septiembre/theta_bootstrap_summary.csv")
-
-  # Asegurar que la columna age_group sea string
-  df_theta["age_group"] = df_theta["age_group"].astype(str)
-
-  # -----------------------------
-  # HEATMAP (primer gráfico)
-  # -----------------------------
-  st.subheader("Grafico de calor")
-  st.markdown("Este mapa de calor muestra **cómo varía la probabilidad estimada (θ)** de que una persona de cierta franja etaria vote a determinado partido.")
-
-  df_heat = df_theta.set_index("age_group")
-
-  fig_heatmap = px.imshow(
-      df_heat,
-      color_continuous_scale="Viridis",
-      aspect="auto",
-      labels=dict(color="Prob"),
-  )
-
-  fig_heatmap.update_layout(
-      xaxis_tickangle=-60,
-      width=1300,
-      height=600,
-  )
-
-  st.plotly_chart(fig_heatmap, width="stretch", key="heatmap_septiembre")
-  st.markdown("""
+from bootstrap import cargar_muestras
+from figuras import figura_cacheada
+from inferencia import ARCHIVOS, version_archivo
+
+# ===============================================================
+# Vista de θ por elección
+#
+# Una sola vista para todas las elecciones de `inferencia.ARCHIVOS`:
+# cada elección aporta sus rutas y un título, y las claves de los
+# widgets se derivan de su nombre. Los CSV se cachean por versión del
+# archivo y las figuras (en `figuras.py`) por (elección, versión,
+# selección), así cambiar de modo o de selección no vuelve a leer ni
+# a armar lo que no cambió.
+# ===============================================================
+
+MODOS = ["Por franja etaria", "Por partido", "Todos los partidos por franja (punto + CI)"]
+MAXIMO_PERFILES = 15
+MINIMO_PERSONAS = 30  # celdas más chicas quedan casi en la previa: no se listan
+
+TEXTO_HEATMAP = """
   ### ¿Cómo leerlo?
   - Cada **fila** es una franja etaria.
   - Cada **columna** es un partido.
@@ -51,121 +35,9 @@ def inferir_votantes_septiembre():
   Permite ver **tendencias generales**, por ejemplo:
   - Qué partidos son más fuertes en edades jóvenes o mayores;
   - Dónde hay patrones homogéneos o contrastes entre grupos.
-  """)
-
-  st.markdown("---")
-  # -----------------------------
-  # Radio para elegir tipo de gráfico
-  # -----------------------------
-  st.subheader("Intervalo de confianza de θ")
-
-  tipo = st.radio(
-      "¿Cómo querés mostrar los intervalos?",
-      ["Por franja etaria", "Por partido", "Todos los partidos por franja (punto + CI)"],
-      key="radio_septiembre"
-  )
-
-  # -----------------------------
-  # Función: estilo matplotlib en Plotly
-  # -----------------------------
-  def plot_bars_with_ci_plotly(theta, thetas_boot, parties, AGE_LABELS):
-      G, P = theta.shape
-      x = np.arange(G)
-
-      fig = go.Figure()
-
-      for p in range(P):
-          med = theta[:, p]
-
-          if thetas_boot is not None and not np.isnan(thetas_boot).all():
-              lows = np.percentile(thetas_boot[:, :, p], 2.5, axis=0)
-              highs = np.percentile(thetas_boot[:, :, p], 97.5, axis=0)
-
-              fig.add_trace(go.Scatter(
-                  x=x,
-                  y=med,
-                  mode='markers',
-                  name=parties[p],
-                  error_y=dict(
-                      type='data',
-                      symmetric=False,
-                      array=highs - med,
-                      arrayminus=med - lows,
-                      thickness=1.5,
-                      width=3
-                  )
-              ))
-          else:
-              fig.add_trace(go.Scatter(
-                  x=x,
-                  y=med,
-                  mode='lines+markers',
-                  name=parties[p]
-              ))
-
-      fig.update_layout(
-          title='Distribución por franja etaria por partido (punto + 95% CI)',
-          xaxis=dict(
-              tickmode='array',
-              tickvals=x,
-              ticktext=AGE_LABELS,
-              title='Franja etaria'
-          ),
-          yaxis=dict(title='Probabilidad estimada'),
-          legend=dict(x=1.02, y=1, orientation='v'),
-          margin=dict(l=40, r=150, t=80, b=40),
-          height=500
-      )
-
-      return fig
-
+  """
 
-  # -----------------------------
-  # MODO 1: Por franja etaria
-  # -----------------------------
-  if tipo == "Por franja etaria":
-      
-      grupos = df_ci["age_group"].unique().tolist()
-      seleccionado = st.selectbox("Elegir franja etaria", grupos)
-
-      df_sel = df_ci[df_ci["age_group"] == seleccionado]
-
-      fig_ci = go.Figure()
-
-      fig_ci.add_trace(go.Scatter(
-          x=df_sel["party"],
-          y=df_sel["theta_50"],
-          mode="markers",
-          marker=dict(size=10),
-          name="θ median"
-      ))
-
-      fig_ci.add_trace(go.Scatter(
-          x=df_sel["party"],
-          y=df_sel["theta_2.5"],
-          mode="lines",
-          line=dict(width=0),
-          showlegend=False
-      ))
-
-      fig_ci.add_trace(go.Scatter(
-          x=df_sel["party"],
-          y=df_sel["theta_97.5"],
-          fill='tonexty',
-          mode="lines",
-          line=dict(width=0),
-          name="IC 95%"
-      ))
-
-      fig_ci.update_layout(
-          xaxis_tickangle=-60,
-          title=f"Intervalos de confianza - {seleccionado}",
-          width=1300,
-          height=600
-      )
-
-      st.plotly_chart(fig_ci, width="stretch", key="ci_septiembre")
-      st.markdown("""
+TEXTO_POR_FRANJA = """
       ### ¿Qué muestra este gráfico?
       Para una **franja etaria seleccionada**, mostramos la probabilidad estimada (θ) de votar a cada partido.
 
@@ -178,56 +50,9 @@ def inferir_votantes_septiembre():
 
       ### ¿Qué significa?
       Ayuda a comparar **partido por partido dentro de un mismo grupo de edad**, viendo tanto la estimación como la incertidumbre.
-      """)
-
-
-  # -----------------------------
-  # MODO 2: Por partido
-  # -----------------------------
-
-  elif tipo == "Por partido":
-      
-      partidos = df_ci["party"].unique().tolist()
-      seleccionado = st.selectbox("Elegir partido", partidos)
-
-      df_sel = df_ci[df_ci["party"] == seleccionado]
-
-      fig_ci = go.Figure()
-
-      fig_ci.add_trace(go.Scatter(
-          x=df_sel["age_group"],
-          y=df_sel["theta_50"],
-          mode="markers",
-          marker=dict(size=10),
-          name="θ median"
-      ))
-
-      fig_ci.add_trace(go.Scatter(
-          x=df_sel["age_group"],
-          y=df_sel["theta_2.5"],
-          mode="lines",
-          line=dict(width=0),
-          showlegend=False
-      ))
-
-      fig_ci.add_trace(go.Scatter(
-          x=df_sel["age_group"],
-          y=df_sel["theta_97.5"],
-          fill='tonexty',
-          mode="lines",
-          line=dict(width=0),
-          name="IC 95%"
-      ))
-
-      fig_ci.update_layout(
-          xaxis_tickangle=-30,
-          title=f"Intervalos de confianza - {seleccionado}",
-          width=1100,
-          height=500
-      )
+      """
 
-      st.plotly_chart(fig_ci, width="stretch", key="ci2_septiembre")
-      st.markdown("""
+TEXTO_POR_PARTIDO = """
       ### ¿Qué muestra este gráfico?
       Para un **partido seleccionado**, mostramos cómo cambia la probabilidad estimada (θ) según la franja etaria.
 
@@ -240,26 +65,9 @@ def inferir_votantes_septiembre():
 
       ### ¿Qué significa?
       Permite ver la **composición etaria del voto** de cada partido y qué tan segura es esa estimación.
-      """)
-
-
-  # -----------------------------
-  # MODO 3: Estilo matplotlib en Plotly
-  # -----------------------------
-  else:
-      
+      """
 
-      parties = df_theta.columns.drop("age_group").tolist()
-      AGE_LABELS = df_theta["age_group"].tolist()
-
-      theta = df_theta.drop(columns=["age_group"]).values  # G × P
-
-      # Como no tenemos bootstrap B×G×P en este CSV → usar None
-      thetas_boot = None
-
-      fig = plot_bars_with_ci_plotly(theta, thetas_boot, parties, AGE_LABELS)
-      st.plotly_chart(fig, width="stretch", key="ci3_septiembre")
-      st.markdown("""
+TEXTO_PUNTOS_CI = """
       ### ¿Qué muestra este gráfico?
       Es una visualización estilo científico que muestra, para cada franja etaria y partido, la **probabilidad estimada (θ)** acompañada de su **intervalo de confianza**.
 
@@ -272,273 +80,253 @@ def inferir_votantes_septiembre():
 
       ### ¿Qué aporta este gráfico?
       Ayuda a ver **diferencias finas** entre partidos dentro de cada edad, con énfasis en cuán confiables son las estimaciones.
-      """)
+      """
 
-def inferir_votantes_octubre():
-  st.title("Estimación de θ (por franja etaria y partido) - Octubre")
-
-  # -----------------------------
-  # Cargar datos
-  # -----------------------------
-  df_theta = pd.read_csv("data/theta_estimates.csv")
-  df_ci = pd.read_csv("data/theta_bootstrap_summary.csv")
 
+# ========================
+#  CARGA (CACHEADA)
+# ========================
+@st.cache_data(show_spinner=False)
+def _leer_theta(eleccion: str, version: str) -> pd.DataFrame:
+  df_theta = pd.read_csv(ARCHIVOS[eleccion]["theta"])
   # Asegurar que la columna age_group sea string
   df_theta["age_group"] = df_theta["age_group"].astype(str)
+  return df_theta
 
-  # -----------------------------
-  # HEATMAP (primer gráfico)
-  # -----------------------------
-  st.subheader("Grafico de calor")
-  st.markdown("Este mapa de calor muestra **cómo varía la probabilidad estimada (θ)** de que una persona de cierta franja etaria vote a determinado partido.")
 
-  df_heat = df_theta.set_index("age_group")
+@st.cache_data(show_spinner=False)
+def _leer_resumen(eleccion: str, version: str) -> pd.DataFrame:
+  return pd.read_csv(ARCHIVOS[eleccion]["bootstrap"])
 
-  fig_heatmap = px.imshow(
-      df_heat,
-      color_continuous_scale="Viridis",
-      aspect="auto",
-      labels=dict(color="Prob"),
-  )
-
-  fig_heatmap.update_layout(
-      xaxis_tickangle=-60,
-      width=1300,
-      height=600,
-  )
 
-  st.plotly_chart(fig_heatmap, width="stretch", key="heatmap_octubre")
-  st.markdown("""
-  ### ¿Cómo leerlo?
-  - Cada **fila** es una franja etaria.
-  - Cada **columna** es un partido.
-  - Los colores indican **qué tan alta es la probabilidad**:
-    - Colores claros → probabilidad alta.
-    - Colores oscuros → probabilidad baja.
+@st.cache_data(show_spinner=False)
+def _leer_theta_celdas(eleccion: str, version: str) -> pd.DataFrame:
+  return pd.read_csv(ARCHIVOS[eleccion]["theta_celdas"])
 
-  ### ¿Para qué sirve?
-  Permite ver **tendencias generales**, por ejemplo:
-  - Qué partidos son más fuertes en edades jóvenes o mayores;
-  - Dónde hay patrones homogéneos o contrastes entre grupos.
-  """)
 
-  st.markdown("---")
-  # -----------------------------
-  # Radio para elegir tipo de gráfico
-  # -----------------------------
-  st.subheader("Intervalo de confianza de θ")
+# ========================
+#  FIGURAS
+# ========================
+def figura_heatmap(eleccion: str, version: str) -> go.Figure:
+  df_heat = _leer_theta(eleccion, version).set_index("age_group")
 
-  tipo = st.radio(
-      "¿Cómo querés mostrar los intervalos?",
-      ["Por franja etaria", "Por partido", "Todos los partidos por franja (punto + CI)"],
-      key="radio_octubre",
+  fig_heatmap = px.imshow(
+    df_heat,
+    color_continuous_scale="Viridis",
+    aspect="auto",
+    labels=dict(color="Prob"),
   )
-
-  # -----------------------------
-  # Función: estilo matplotlib en Plotly
-  # -----------------------------
-  def plot_bars_with_ci_plotly(theta, thetas_boot, parties, AGE_LABELS):
-      G, P = theta.shape
-      x = np.arange(G)
-
-      fig = go.Figure()
-
-      for p in range(P):
-          med = theta[:, p]
-
-          if thetas_boot is not None and not np.isnan(thetas_boot).all():
-              lows = np.percentile(thetas_boot[:, :, p], 2.5, axis=0)
-              highs = np.percentile(thetas_boot[:, :, p], 97.5, axis=0)
-
-              fig.add_trace(go.Scatter(
-                  x=x,
-                  y=med,
-                  mode='markers',
-                  name=parties[p],
-                  error_y=dict(
-                      type='data',
-                      symmetric=False,
-                      array=highs - med,
-                      arrayminus=med - lows,
-                      thickness=1.5,
-                      width=3
-                  )
-              ))
-          else:
-              fig.add_trace(go.Scatter(
-                  x=x,
-                  y=med,
-                  mode='lines+markers',
-                  name=parties[p]
-              ))
-
-      fig.update_layout(
-          title='Distribución por franja etaria por partido (punto + 95% CI)',
-          xaxis=dict(
-              tickmode='array',
-              tickvals=x,
-              ticktext=AGE_LABELS,
-              title='Franja etaria'
-          ),
-          yaxis=dict(title='Probabilidad estimada'),
-          legend=dict(x=1.02, y=1, orientation='v'),
-          margin=dict(l=40, r=150, t=80, b=40),
-          height=500
-      )
-
-      return fig
-
-
-  # -----------------------------
-  # MODO 1: Por franja etaria
-  # -----------------------------
-  if tipo == "Por franja etaria":
-      
-      grupos = df_ci["age_group"].unique().tolist()
-      seleccionado = st.selectbox("Elegir franja etaria", grupos, key="franja_octubre")
-
-      df_sel = df_ci[df_ci["age_group"] == seleccionado]
-
-      fig_ci = go.Figure()
-
-      fig_ci.add_trace(go.Scatter(
-          x=df_sel["party"],
-          y=df_sel["theta_50"],
-          mode="markers",
-          marker=dict(size=10),
-          name="θ median"
-      ))
-
-      fig_ci.add_trace(go.Scatter(
-          x=df_sel["party"],
-          y=df_sel["theta_2.5"],
-          mode="lines",
-          line=dict(width=0),
-          showlegend=False
+  fig_heatmap.update_layout(
+    xaxis_tickangle=-60,
+    width=1300,
+    height=600,
+  )
+  return fig_heatmap
+
+
+def _figura_intervalos(df_sel: pd.DataFrame, eje: str, titulo: str, **layout) -> go.Figure:
+  fig_ci = go.Figure()
+
+  fig_ci.add_trace(go.Scatter(
+    x=df_sel[eje],
+    y=df_sel["theta_50"],
+    mode="markers",
+    marker=dict(size=10),
+    name="θ median"
+  ))
+
+  fig_ci.add_trace(go.Scatter(
+    x=df_sel[eje],
+    y=df_sel["theta_2.5"],
+    mode="lines",
+    line=dict(width=0),
+    showlegend=False
+  ))
+
+  fig_ci.add_trace(go.Scatter(
+    x=df_sel[eje],
+    y=df_sel["theta_97.5"],
+    fill='tonexty',
+    mode="lines",
+    line=dict(width=0),
+    name="IC 95%"
+  ))
+
+  fig_ci.update_layout(title=f"Intervalos de confianza - {titulo}", **layout)
+  return fig_ci
+
+
+def figura_por_franja(eleccion: str, version: str, franja: str) -> go.Figure:
+  df_ci = _leer_resumen(eleccion, version)
+  df_sel = df_ci[df_ci["age_group"] == franja]
+  return _figura_intervalos(df_sel, "party", franja, xaxis_tickangle=-60, width=1300, height=600)
+
+
+def figura_por_partido(eleccion: str, version: str, partido: str) -> go.Figure:
+  df_ci = _leer_resumen(eleccion, version)
+  df_sel = df_ci[df_ci["party"] == partido]
+  return _figura_intervalos(df_sel, "age_group", partido, xaxis_tickangle=-30, width=1100, height=500)
+
+
+def plot_bars_with_ci_plotly(theta, thetas_boot, parties, AGE_LABELS):
+  G, P = theta.shape
+  x = np.arange(G)
+
+  fig = go.Figure()
+
+  # Percentiles de todas las réplicas en una sola pasada (G × P cada uno),
+  # ignorando las réplicas que quedaron en NaN
+  con_ci = thetas_boot is not None and not np.isnan(thetas_boot).all()
+  if con_ci:
+    lows, highs = np.nanpercentile(thetas_boot, [2.5, 97.5], axis=0)
+
+  for p in range(P):
+    med = theta[:, p]
+
+    if con_ci:
+      fig.add_trace(go.Scatter(
+        x=x,
+        y=med,
+        mode='markers',
+        name=parties[p],
+        error_y=dict(
+          type='data',
+          symmetric=False,
+          array=highs[:, p] - med,
+          arrayminus=med - lows[:, p],
+          thickness=1.5,
+          width=3
+        )
       ))
-
-      fig_ci.add_trace(go.Scatter(
-          x=df_sel["party"],
-          y=df_sel["theta_97.5"],
-          fill='tonexty',
-          mode="lines",
-          line=dict(width=0),
-          name="IC 95%"
+    else:
+      fig.add_trace(go.Scatter(
+        x=x,
+        y=med,
+        mode='lines+markers',
+        name=parties[p]
       ))
 
-      fig_ci.update_layout(
-          xaxis_tickangle=-60,
-          title=f"Intervalos de confianza - {seleccionado}",
-          width=1300,
-          height=600
-      )
+  fig.update_layout(
+    title='Distribución por franja etaria por partido (punto + 95% CI)',
+    xaxis=dict(
+      tickmode='array',
+      tickvals=x,
+      ticktext=AGE_LABELS,
+      title='Franja etaria'
+    ),
+    yaxis=dict(title='Probabilidad estimada'),
+    legend=dict(x=1.02, y=1, orientation='v'),
+    margin=dict(l=40, r=150, t=80, b=40),
+    height=500
+  )
 
-      st.plotly_chart(fig_ci, width="stretch", key="ci_octubre")
-      st.markdown("""
-      ### ¿Qué muestra este gráfico?
-      Para una **franja etaria seleccionada**, mostramos la probabilidad estimada (θ) de votar a cada partido.
+  return fig
+
+
+def figura_puntos_ci(eleccion: str, version_theta: str) -> go.Figure:
+  df_theta = _leer_theta(eleccion, version_theta)
+  parties = df_theta.columns.drop("age_group").tolist()
+  AGE_LABELS = df_theta["age_group"].tolist()
+  theta = df_theta.drop(columns=["age_group"]).values  # G × P
+
+  # Réplicas bootstrap B×G×P (generadas con bootstrap.py); None si no hay
+  thetas_boot = cargar_muestras(ARCHIVOS[eleccion]["muestras"])
+  if thetas_boot is not None and thetas_boot.shape[1:] != theta.shape:
+    thetas_boot = None
+  return plot_bars_with_ci_plotly(theta, thetas_boot, parties, AGE_LABELS)
+
+
+def figura_perfiles(eleccion: str, version: str, partido: str) -> go.Figure:
+  """Celdas de covariables (votante modelo) con mayor θ para `partido`."""
+  df_celdas = _leer_theta_celdas(eleccion, version)
+  covariables = list(df_celdas.columns[:df_celdas.columns.get_loc("personas")])
+  perfiles = df_celdas[df_celdas["personas"] >= MINIMO_PERSONAS].nlargest(MAXIMO_PERFILES, partido)
+  perfiles["perfil"] = perfiles[covariables].astype(str).agg(" · ".join, axis=1)
+
+  fig = px.bar(
+    perfiles.iloc[::-1],
+    x=partido,
+    y="perfil",
+    orientation="h",
+    hover_data={"personas": True},
+    labels={partido: "θ", "perfil": ""},
+    title=f"Perfiles con mayor probabilidad de votar a {partido}",
+  )
+  fig.update_layout(height=max(400, 28 * len(perfiles)))
+  return fig
 
-      ### ¿Cómo leerlo?
-      - **Puntos:** muestran la estimación central (mediana) de la probabilidad.
-      - **Sombra entre líneas:** representa el **intervalo de confianza del 95%**.
-      - Indica la zona donde se espera que esté el valor real según las simulaciones.
-      - Una sombra más ancha = más incertidumbre.
-      - Una sombra más estrecha = estimación más precisa.
 
-      ### ¿Qué significa?
-      Ayuda a comparar **partido por partido dentro de un mismo grupo de edad**, viendo tanto la estimación como la incertidumbre.
-      """)
+# ========================
+#  VISTA
+# ========================
+def inferir_votantes(eleccion: str):
+  """Heatmap e intervalos de θ de una elección de `inferencia.ARCHIVOS`."""
+  archivos = ARCHIVOS[eleccion]
+  st.title(f"Estimación de θ (por franja etaria y partido) - {archivos['titulo']}")
 
+  version_theta = version_archivo(archivos["theta"])
+  version_resumen = version_archivo(archivos["bootstrap"])
 
   # -----------------------------
-  # MODO 2: Por partido
+  # HEATMAP (primer gráfico)
   # -----------------------------
+  st.subheader("Grafico de calor")
+  st.markdown("Este mapa de calor muestra **cómo varía la probabilidad estimada (θ)** de que una persona de cierta franja etaria vote a determinado partido.")
+  fig_heatmap = figura_cacheada("theta_heatmap", version_theta, lambda: figura_heatmap(eleccion, version_theta), eleccion)
+  st.plotly_chart(fig_heatmap, width="stretch", key=f"heatmap_{eleccion}")
+  st.markdown(TEXTO_HEATMAP)
 
-  elif tipo == "Por partido":
-      
-      partidos = df_ci["party"].unique().tolist()
-      seleccionado = st.selectbox("Elegir partido", partidos)
-
-      df_sel = df_ci[df_ci["party"] == seleccionado]
-
-      fig_ci = go.Figure()
-
-      fig_ci.add_trace(go.Scatter(
-          x=df_sel["age_group"],
-          y=df_sel["theta_50"],
-          mode="markers",
-          marker=dict(size=10),
-          name="θ median"
-      ))
-
-      fig_ci.add_trace(go.Scatter(
-          x=df_sel["age_group"],
-          y=df_sel["theta_2.5"],
-          mode="lines",
-          line=dict(width=0),
-          showlegend=False
-      ))
-
-      fig_ci.add_trace(go.Scatter(
-          x=df_sel["age_group"],
-          y=df_sel["theta_97.5"],
-          fill='tonexty',
-          mode="lines",
-          line=dict(width=0),
-          name="IC 95%"
-      ))
-
-      fig_ci.update_layout(
-          xaxis_tickangle=-30,
-          title=f"Intervalos de confianza - {seleccionado}",
-          width=1100,
-          height=500
-      )
-
-      st.plotly_chart(fig_ci, width="stretch", key="ci2_octubre")
-      st.markdown("""
-      ### ¿Qué muestra este gráfico?
-      Para un **partido seleccionado**, mostramos cómo cambia la probabilidad estimada (θ) según la franja etaria.
-
-      ### ¿Cómo leerlo?
-      - **Puntos:** estimación central (mediana).
-      - **Sombra:** intervalo de confianza del 95%.
-      - Mirá la dirección de los puntos:
-      - Si suben → mayor apoyo en edades mayores.
-      - Si bajan → mayor apoyo en edades jóvenes.
-
-      ### ¿Qué significa?
-      Permite ver la **composición etaria del voto** de cada partido y qué tan segura es esa estimación.
-      """)
-
-
+  st.markdown("---")
   # -----------------------------
-  # MODO 3: Estilo matplotlib en Plotly
+  # Radio para elegir tipo de gráfico
   # -----------------------------
-  else:
-      
-
-      parties = df_theta.columns.drop("age_group").tolist()
-      AGE_LABELS = df_theta["age_group"].tolist()
+  st.subheader("Intervalo de confianza de θ")
 
-      theta = df_theta.drop(columns=["age_group"]).values  # G × P
+  tipo = st.radio("¿Cómo querés mostrar los intervalos?", MODOS, key=f"radio_{eleccion}")
 
-      # Como no tenemos bootstrap B×G×P en este CSV → usar None
-      thetas_boot = None
+  if tipo == "Por franja etaria":
+    grupos = _leer_resumen(eleccion, version_resumen)["age_group"].unique().tolist()
+    seleccionado = st.selectbox("Elegir franja etaria", grupos, key=f"franja_{eleccion}")
+    fig_ci = figura_cacheada("theta_por_franja", version_resumen, lambda: figura_por_franja(eleccion, version_resumen, seleccionado), eleccion, seleccionado)
+    st.plotly_chart(fig_ci, width="stretch", key=f"ci_{eleccion}")
+    st.markdown(TEXTO_POR_FRANJA)
 
-      fig = plot_bars_with_ci_plotly(theta, thetas_boot, parties, AGE_LABELS)
-      st.plotly_chart(fig, width="stretch", key="ci3_octubre")
-      st.markdown("""
-      ### ¿Qué muestra este gráfico?
-      Es una visualización estilo científico que muestra, para cada franja etaria y partido, la **probabilidad estimada (θ)** acompañada de su **intervalo de confianza**.
+  elif tipo == "Por partido":
+    partidos = _leer_resumen(eleccion, version_resumen)["party"].unique().tolist()
+    seleccionado = st.selectbox("Elegir partido", partidos, key=f"partido_{eleccion}")
+    fig_ci = figura_cacheada("theta_por_partido", version_resumen, lambda: figura_por_partido(eleccion, version_resumen, seleccionado), eleccion, seleccionado)
+    st.plotly_chart(fig_ci, width="stretch", key=f"ci2_{eleccion}")
+    st.markdown(TEXTO_POR_PARTIDO)
 
-      ### ¿Cómo leerlo?
-      - **Cada punto** representa la estimación central (mediana) de θ.
-      - **Las barras verticales** son el intervalo de confianza del 95%.
-      - Muestran la variabilidad que surge de las simulaciones bootstrap.
-      - Barras largas → más incertidumbre.
-      - Barras cortas → estimaciones más estables.
+  else:
+    version = f"{version_theta}|{version_archivo(archivos['muestras'])}"
+    fig = figura_cacheada("theta_puntos_ci", version, lambda: figura_puntos_ci(eleccion, version_theta), eleccion)
+    st.plotly_chart(fig, width="stretch", key=f"ci3_{eleccion}")
+    st.markdown(TEXTO_PUNTOS_CI)
 
-      ### ¿Qué aporta este gráfico?
-      Ayuda a ver **diferencias finas** entre partidos dentro de cada edad, con énfasis en cuán confiables son las estimaciones.
-      """)
\ No newline at end of file
+  # -----------------------------
+  # Votante modelo por celdas de covariables (covariables.py)
+  # -----------------------------
+  version_celdas = version_archivo(archivos["theta_celdas"])
+  if version_celdas:
+    st.markdown("---")
+    st.subheader("Votante modelo (edad × género × profesión × zona)")
+    st.markdown(
+      "θ estimado por celdas cruzadas de covariables. Cada celda parte del θ de su "
+      f"franja etaria y se aleja según sus votos; solo se listan celdas con al menos {MINIMO_PERSONAS} personas."
+    )
+    # Los partidos salen del mismo archivo que se grafica (theta_estimates.csv puede ser de otra corrida)
+    df_celdas = _leer_theta_celdas(eleccion, version_celdas)
+    partidos = list(df_celdas.columns[df_celdas.columns.get_loc("personas") + 1:])
+    partido = st.selectbox("Elegir partido", partidos, key=f"perfil_{eleccion}")
+    fig = figura_cacheada("theta_perfiles", version_celdas, lambda: figura_perfiles(eleccion, version_celdas, partido), eleccion, partido)
+    st.plotly_chart(fig, width="stretch", key=f"perfiles_{eleccion}")
+
+
+def pagina4():
+  for i, eleccion in enumerate(ARCHIVOS):
+    if i > 0:
+      st.markdown("---")
+      st.markdown("---")
+      st.markdown("---")
+    inferir_votantes(eleccion)
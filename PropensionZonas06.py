@@ -0,0 +1,77 @@
+import os
+
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from figuras import figura_cacheada
+from inferencia import ARCHIVOS, resultados_eleccion
+from propension import obtener_puntajes, probabilidad_voto, version_puntajes, votos_esperados
+from zonas import clave_padron
+
+NIVELES = ["Zona", "Polígono"]
+MAXIMO_RANKING = 25
+
+
+# ========================
+#  VOTOS ESPERADOS (CACHEADOS)
+# ========================
+@st.cache_data(show_spinner="Sumando votos esperados...")
+def _votos_por_nivel(version: str, eleccion: str, nivel: str, _df: pd.DataFrame) -> pd.DataFrame:
+  puntajes, partidos = obtener_puntajes(_df, eleccion)
+  peso = probabilidad_voto(_df, eleccion, resultados_eleccion(eleccion, partidos))
+  grupos = pd.Categorical(_df["zona"] if nivel == "Zona" else clave_padron(_df))
+  votos = votos_esperados(puntajes, peso, grupos.codes, len(grupos.categories))
+  return pd.DataFrame(votos, index=pd.Index(grupos.categories, name=nivel), columns=partidos)
+
+
+def figura_ranking(ranking: pd.DataFrame, nivel: str, partido: str):
+  fig = px.bar(
+    ranking.iloc[::-1],
+    x="votos_esperados",
+    y=nivel,
+    orientation="h",
+    hover_data={"porcentaje": ":.1f"},
+    title=f"Votos esperados de {partido} por {nivel.lower()}",
+  )
+  fig.update_layout(xaxis_title="Votos esperados", yaxis_title=nivel, height=max(400, 22 * len(ranking)))
+  return fig
+
+
+# ========================
+#  PÁGINA
+# ========================
+def pagina6(df):
+  st.title("🗳️ Propensión de voto por zona")
+  st.markdown(
+    "Cada elector tiene una probabilidad de votar a cada partido según su franja "
+    "etaria (θ) corregida por el resultado de su mesa. Sumando esas probabilidades, "
+    "ponderadas por la probabilidad de que el elector haya votado, se obtienen los "
+    "**votos esperados** de cada partido en cada zona o polígono."
+  )
+
+  elecciones = [e for e in ARCHIVOS if os.path.exists(ARCHIVOS[e]["theta"])]
+  if not elecciones:
+    st.info("No hay estimaciones de θ para ninguna elección.")
+    return
+
+  col1, col2 = st.columns(2)
+  eleccion = col1.selectbox("Elección", elecciones, format_func=lambda e: ARCHIVOS[e]["titulo"], key="propension_eleccion")
+  nivel = col2.radio("Agrupar por", NIVELES, horizontal=True, key="propension_nivel")
+  if not os.path.exists(ARCHIVOS[eleccion]["resultados"]):
+    st.caption("Sin escrutinio por mesa para esta elección: se usa θ sin corregir por mesa.")
+
+  version = version_puntajes(df, eleccion)
+  votos = _votos_por_nivel(version, eleccion, nivel, df)
+
+  partido = st.selectbox("Partido", list(votos.columns), key=f"propension_partido_{eleccion}")
+  ranking = pd.DataFrame({
+    "votos_esperados": votos[partido],
+    "porcentaje": 100 * votos[partido] / votos.sum(axis=1),
+  }).sort_values("votos_esperados", ascending=False).head(MAXIMO_RANKING).reset_index()
+
+  fig = figura_cacheada("propension_ranking", version, lambda: figura_ranking(ranking, nivel, partido), eleccion, nivel, partido)
+  st.plotly_chart(fig, width="stretch")
+
+  st.subheader(f"Votos esperados por {nivel.lower()}")
+  st.dataframe(votos.round(1), use_container_width=True)
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from clasificacion import ESTADOS_VOTO, categoria_profesion, edad_desde_nacimiento, estado_voto, rango_edad
+from padron import PREFIJO_VOTO, VERSIONES_EN_CACHE, version_padron
+
+# ===============================================================
+# Cubo de conteos del padrón
+#
+# Una fila por combinación observada de
+#   (eleccion, zona, poligono, rango_edad, genero, profesion_categoria, estado_voto)
+# con la cantidad de electores. Se arma una vez por versión de datos y
+# las páginas lo filtran/suman: el costo de cada render depende de la
+# cantidad de celdas, no de la cantidad de electores.
+# ===============================================================
+
+DIMENSIONES = ["eleccion", "zona", "poligono", "rango_edad", "genero", "profesion_categoria", "estado_voto"]
+
+
+def elecciones_disponibles(df: pd.DataFrame) -> list[str]:
+  return [c[len(PREFIJO_VOTO):] for c in df.columns if c.startswith(PREFIJO_VOTO)]
+
+
+# ========================
+#  COLUMNAS DERIVADAS
+# ========================
+def columnas_derivadas(df: pd.DataFrame) -> pd.DataFrame:
+  """
+  Clasificaciones de cada elector que usan las páginas, alineadas con
+  `df`: `rango_edad`, `profesion_categoria` y `estado_<eleccion>` por
+  cada columna de voto. Todas categóricas (un byte por fila).
+  """
+  derivadas = pd.DataFrame({
+    "rango_edad": rango_edad(edad_desde_nacimiento(df["fecha_nacimiento"])),
+    "profesion_categoria": categoria_profesion(df["profesion"]),
+  }, index=df.index)
+  for eleccion in elecciones_disponibles(df):
+    derivadas[f"estado_{eleccion}"] = estado_voto(df[f"{PREFIJO_VOTO}{eleccion}"])
+  return derivadas
+
+
+@st.cache_resource(show_spinner="Clasificando electores...", max_entries=VERSIONES_EN_CACHE)
+def _derivadas_compartidas(version: str, _df: pd.DataFrame) -> pd.DataFrame:
+  # cache_resource: un único frame por versión para todas las sesiones
+  # (cache_data devolvería una copia nueva en cada llamada)
+  return columnas_derivadas(_df)
+
+
+def obtener_derivadas(df: pd.DataFrame) -> pd.DataFrame:
+  """`columnas_derivadas(df)` calculadas una sola vez por versión de datos. Solo lectura."""
+  return _derivadas_compartidas(version_padron(df), df)
+
+
+# ========================
+#  CUBO
+# ========================
+def construir_cubo(df: pd.DataFrame, derivadas: pd.DataFrame | None = None) -> pd.DataFrame:
+  """Agrupa el padrón completo en el cubo de conteos (ver arriba)."""
+  if derivadas is None:
+    derivadas = columnas_derivadas(df)
+  base = pd.DataFrame({
+    "zona": df["zona"],
+    "poligono": df["poligono"],
+    "rango_edad": derivadas["rango_edad"],
+    "genero": df["genero"],
+    "profesion_categoria": derivadas["profesion_categoria"],
+  })
+
+  elecciones = elecciones_disponibles(df)
+  partes = []
+  for eleccion in elecciones:
+    base["estado_voto"] = derivadas[f"estado_{eleccion}"]
+    parte = base.groupby(DIMENSIONES[1:], observed=True, dropna=False).size().reset_index(name="cantidad")
+    parte.insert(0, "eleccion", eleccion)
+    partes.append(parte)
+
+  if not partes:
+    # Sin columnas de voto: un único bloque "sin información"
+    base["estado_voto"] = pd.Categorical.from_codes(np.full(len(df), 2), ESTADOS_VOTO)
+    parte = base.groupby(DIMENSIONES[1:], observed=True, dropna=False).size().reset_index(name="cantidad")
+    parte.insert(0, "eleccion", "")
+    partes.append(parte)
+
+  cubo = pd.concat(partes, ignore_index=True)
+  cubo["eleccion"] = cubo["eleccion"].astype("category")
+  return cubo[cubo["cantidad"] > 0].reset_index(drop=True)
+
+
+@st.cache_data(show_spinner="Calculando agregados...", max_entries=VERSIONES_EN_CACHE)
+def _cubo_cacheado(version: str, _df: pd.DataFrame) -> pd.DataFrame:
+  return construir_cubo(_df, obtener_derivadas(_df))
+
+
+def obtener_cubo(df: pd.DataFrame) -> pd.DataFrame:
+  """Cubo de conteos de `df`, calculado una sola vez por versión de datos."""
+  return _cubo_cacheado(version_padron(df), df)
+
+
+def sumar(cubo: pd.DataFrame, por: list[str], eleccion: str | None = None, **filtros) -> pd.Series:
+  """
+  Suma el cubo agrupando por las dimensiones `por`.
+
+  Si no se indica `eleccion` se usa la primera del cubo: cada elector
+  aparece una vez por elección, así que no hay que mezclarlas al contar
+  personas. Los `filtros` restringen dimensiones a un valor o una lista.
+  """
+  if eleccion is None:
+    eleccion = cubo["eleccion"].cat.categories[0]
+  mascara = cubo["eleccion"] == eleccion
+  for dimension, valores in filtros.items():
+    valores = valores if isinstance(valores, (list, tuple, set)) else [valores]
+    mascara &= cubo[dimension].isin(valores)
+  return cubo[mascara].groupby(por, observed=True)["cantidad"].sum()
@@ -0,0 +1,66 @@
+import json
+import urllib.error
+import urllib.parse
+import urllib.request
+
+# ========================
+#  SUPABASE STORAGE (REST)
+# ========================
+# Se usa la API REST del storage directamente en lugar de
+# `supabase.storage.from_(bucket).download(...)`, que devuelve el objeto
+# completo en bytes. Acá la respuesta se entrega como stream para que el
+# parser la consuma por bloques.
+
+TIMEOUT = 60
+
+
+def _headers(key: str) -> dict:
+  return {"Authorization": f"Bearer {key}", "apikey": key}
+
+
+def _url_objeto(url: str, bucket: str, ruta: str) -> str:
+  ruta = urllib.parse.quote(ruta.lstrip("/"))
+  return f"{url.rstrip('/')}/storage/v1/object/{bucket}/{ruta}"
+
+
+def abrir_objeto(url: str, key: str, bucket: str, ruta: str, etag: str | None = None):
+  """
+  Abre un objeto de un bucket (privado) como stream binario.
+
+  Si se pasa el `etag` de la copia local, se hace un GET condicional:
+  devuelve None cuando el objeto no cambió (HTTP 304) y no se descarga nada.
+  La respuesta devuelta expone el ETag nuevo en `respuesta.headers["ETag"]`
+  y debe cerrarse (usarla con `with`).
+  """
+  headers = _headers(key)
+  if etag:
+    headers["If-None-Match"] = etag
+
+  pedido = urllib.request.Request(_url_objeto(url, bucket, ruta), headers=headers)
+  try:
+    return urllib.request.urlopen(pedido, timeout=TIMEOUT)
+  except urllib.error.HTTPError as e:
+    if e.code == 304:
+      return None
+    raise
+
+
+def listar_objetos(url: str, key: str, bucket: str, prefijo: str, tamanio_pagina: int = 1000) -> list[dict]:
+  """
+  Lista los objetos de `bucket` bajo `prefijo` (un nivel, sin recursión).
+  Cada elemento trae `name` y `metadata` (con `eTag` y `size`); solo se
+  transfiere la metadata, no el contenido.
+  """
+  endpoint = f"{url.rstrip('/')}/storage/v1/object/list/{bucket}"
+  headers = {**_headers(key), "Content-Type": "application/json"}
+  objetos = []
+  offset = 0
+  while True:
+    cuerpo = json.dumps({"prefix": prefijo.strip("/"), "limit": tamanio_pagina, "offset": offset}).encode()
+    pedido = urllib.request.Request(endpoint, data=cuerpo, headers=headers, method="POST")
+    with urllib.request.urlopen(pedido, timeout=TIMEOUT) as respuesta:
+      pagina = json.load(respuesta)
+    objetos.extend(pagina)
+    if len(pagina) < tamanio_pagina:
+      return objetos
+    offset += tamanio_pagina
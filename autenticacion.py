@@ -0,0 +1,120 @@
+"""
+Búsqueda de usuarios para el login.
+
+El login necesita un único dato remoto: el registro del usuario (id,
+nombre y hash de la contraseña). Acá ese registro pasa por una cache
+con vencimiento corto y, si varias sesiones piden el mismo usuario a la
+vez, se hace una sola consulta y todas esperan ese resultado.
+
+El origen de los usuarios es intercambiable: `BackendSupabase` en la
+app y `BackendSQLite` (en archivo o en memoria) para pruebas y
+benchmarks.
+"""
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+TTL_USUARIOS = 60  # segundos
+
+
+# ========================
+#  BACKENDS
+# ========================
+class BackendSupabase:
+  """Usuarios en la tabla `users` de Supabase."""
+
+  def __init__(self, cliente, tabla: str = "users"):
+    self.cliente = cliente
+    self.tabla = tabla
+
+  def buscar_usuario(self, nombre: str) -> dict | None:
+    respuesta = self.cliente.table(self.tabla).select("id, name, password").eq("name", nombre).limit(1).execute()
+    return respuesta.data[0] if respuesta.data else None
+
+  def actualizar_password(self, nombre: str, password_hash: str):
+    self.cliente.table(self.tabla).update({"password": password_hash}).eq("name", nombre).execute()
+
+
+class BackendSQLite:
+  """
+  Misma tabla `users` (id, name, password) en SQLite. Con la ruta por
+  defecto la base vive en memoria, útil para pruebas y benchmarks.
+  """
+
+  def __init__(self, ruta: str = ":memory:"):
+    self._conexion = sqlite3.connect(ruta, check_same_thread=False)
+    self._conexion.row_factory = sqlite3.Row
+    self._lock = threading.Lock()
+    with self._lock, self._conexion:
+      self._conexion.execute("CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY, name TEXT UNIQUE, password TEXT)")
+
+  def agregar_usuario(self, nombre: str, password_hash: str):
+    with self._lock, self._conexion:
+      self._conexion.execute("INSERT OR REPLACE INTO users (name, password) VALUES (?, ?)", (nombre, password_hash))
+
+  def buscar_usuario(self, nombre: str) -> dict | None:
+    with self._lock:
+      fila = self._conexion.execute("SELECT id, name, password FROM users WHERE name = ?", (nombre,)).fetchone()
+    return dict(fila) if fila is not None else None
+
+  def actualizar_password(self, nombre: str, password_hash: str):
+    with self._lock, self._conexion:
+      self._conexion.execute("UPDATE users SET password = ? WHERE name = ?", (password_hash, nombre))
+
+
+# ========================
+#  CACHE DE USUARIOS
+# ========================
+class CacheUsuarios:
+  """
+  Registros de usuario cacheados por `ttl` segundos (también los "no
+  existe"), con las búsquedas concurrentes del mismo usuario agrupadas
+  en una sola consulta al backend.
+  """
+
+  def __init__(self, backend, ttl: float = TTL_USUARIOS):
+    self.backend = backend
+    self.ttl = ttl
+    self.consultas = 0
+    self._registros = {}  # nombre → (vence, registro)
+    self._en_curso = {}   # nombre → Future de la consulta en curso
+    self._lock = threading.Lock()
+
+  def buscar_usuario(self, nombre: str) -> dict | None:
+    with self._lock:
+      vence, registro = self._registros.get(nombre, (0, None))
+      if time.monotonic() < vence:
+        return registro
+      futuro = self._en_curso.get(nombre)
+      propio = futuro is None
+      if propio:
+        futuro = self._en_curso[nombre] = Future()
+        self.consultas += 1
+
+    if not propio:
+      return futuro.result()
+
+    try:
+      registro = self.backend.buscar_usuario(nombre)
+    except Exception as e:
+      with self._lock:
+        del self._en_curso[nombre]
+      futuro.set_exception(e)
+      raise
+
+    with self._lock:
+      self._registros[nombre] = (time.monotonic() + self.ttl, registro)
+      del self._en_curso[nombre]
+    futuro.set_result(registro)
+    return registro
+
+  def invalidar(self, nombre: str):
+    """Descarta el registro cacheado (p. ej. después de cambiar la contraseña)."""
+    with self._lock:
+      self._registros.pop(nombre, None)
+
+  def actualizar_password(self, nombre: str, password_hash: str):
+    """Guarda un hash nuevo en el backend y descarta el registro cacheado."""
+    self.backend.actualizar_password(nombre, password_hash)
+    self.invalidar(nombre)
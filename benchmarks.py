@@ -0,0 +1,874 @@
+"""
+Benchmarks de las etapas de datos del proyecto.
+
+Uso:
+  python benchmarks.py                 # todos
+  python benchmarks.py clasificacion   # uno en particular
+
+Trabajan sobre un padrón sintético con las mismas columnas que el real,
+así que no hace falta tener los datos del padrón en la máquina.
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+
+# ========================
+#  UTILIDADES
+# ========================
+def padron_sintetico(n: int = 50_000, semilla: int = 0) -> pd.DataFrame:
+  rng = np.random.default_rng(semilla)
+  return pd.DataFrame({
+    "nro_documento": rng.integers(10_000_000, 50_000_000, n),
+    "fecha_nacimiento": rng.integers(1930, 2010, n),
+    "genero": rng.choice(["F", "M", "X"], n, p=[0.5, 0.49, 0.01]),
+    "profesion": rng.choice(["EMPLEADO", "ESTUDIANTE", "JUBILADO", "SIN OCUPACION", "NO CONSTA", None, "DOCENTE"], n),
+    "mesa": rng.integers(1, 200, n),
+    "orden": np.arange(n),
+    "zona": rng.choice(["ZONA 1", "ZONA 2", "ZONA 3"], n),
+    "poligono": rng.choice(["1", "2", "3"], n),
+    "lat": rng.uniform(-38.90, -38.80, n),
+    "lon": rng.uniform(-62.12, -62.04, n),
+    "voto_septiembre": rng.choice(np.array([True, False, None], dtype=object), n, p=[0.5, 0.2, 0.3]),
+  })
+
+
+def medir(funcion, repeticiones: int = 5) -> float:
+  """Mejor tiempo (en ms) de `repeticiones` corridas."""
+  tiempos = []
+  for _ in range(repeticiones):
+    inicio = time.perf_counter()
+    funcion()
+    tiempos.append(time.perf_counter() - inicio)
+  return min(tiempos) * 1000
+
+
+def reportar(nombre: str, antes_ms: float, despues_ms: float):
+  print(f"  {nombre:<32} {antes_ms:9.2f} ms → {despues_ms:9.2f} ms  (x{antes_ms / despues_ms:.1f})")
+
+
+# ========================
+#  CLASIFICACIÓN
+# ========================
+def bench_clasificacion(n: int = 200_000):
+  from clasificacion import categoria_profesion, edad_desde_nacimiento, rango_edad, tiene_informacion
+
+  df = padron_sintetico(n)
+  print(f"clasificacion (n={n})")
+
+  # Caminos con apply que usaban las páginas 01, 02 y 03
+  def clasificar_rango(edad):
+    if 16 <= edad <= 24:
+      return "16-24"
+    elif 25 <= edad <= 30:
+      return "25-30"
+    elif 31 <= edad <= 44:
+      return "31-44"
+    elif 45 <= edad <= 60:
+      return "45-60"
+    elif edad > 60:
+      return "61+"
+    return None
+
+  def clasificar_profesion(x):
+    if x in ["SIN OCUPACION", "ESTUDIANTE", "NO CONSTA", "JUBILADO"]:
+      return x
+    if x == "" or x == "NAN" or pd.isna(x):
+      return "SIN DATO"
+    return "OTRAS"
+
+  edad = 2025 - df["fecha_nacimiento"]
+  reportar(
+    "rango de edad",
+    medir(lambda: edad.apply(clasificar_rango)),
+    medir(lambda: rango_edad(edad_desde_nacimiento(df["fecha_nacimiento"]))),
+  )
+  reportar(
+    "tiene información",
+    medir(lambda: df["voto_septiembre"].apply(lambda x: "Con información" if x in [True, False] else "Sin información")),
+    medir(lambda: tiene_informacion(df["voto_septiembre"])),
+  )
+  profesion = df["profesion"].astype(str).str.upper().str.strip()
+  reportar(
+    "categoría de profesión",
+    medir(lambda: profesion.apply(clasificar_profesion)),
+    medir(lambda: categoria_profesion(df["profesion"])),
+  )
+  categorica = df["profesion"].astype("category")
+  reportar(
+    "categoría de profesión (category)",
+    medir(lambda: profesion.apply(clasificar_profesion)),
+    medir(lambda: categoria_profesion(categorica)),
+  )
+
+
+# ========================
+#  GEOCODIFICACIÓN
+# ========================
+def bench_geocodificacion(n: int = 100_000):
+  from shapely.geometry import Point
+
+  from zonas import asignar_zonas, cargar_zonas
+
+  zonas = cargar_zonas()
+  geometrias = zonas["geometry"].to_numpy()
+  xmin, ymin, xmax, ymax = np.array([g.bounds for g in geometrias]).T
+  rng = np.random.default_rng(0)
+  lon = rng.uniform(xmin.min() - 0.01, xmax.max() + 0.01, n)
+  lat = rng.uniform(ymin.min() - 0.01, ymax.max() + 0.01, n)
+  print(f"geocodificacion (n={n}, {len(geometrias)} polígonos)")
+
+  # Referencia: punto por punto contra cada polígono (sobre una muestra)
+  muestra = 5_000
+
+  def punto_a_punto():
+    for x, y in zip(lon[:muestra], lat[:muestra]):
+      p = Point(x, y)
+      next((i for i, g in enumerate(geometrias) if g.intersects(p)), -1)
+
+  reportar(
+    "asignar zonas (padrón completo)",
+    medir(punto_a_punto, repeticiones=1) * n / muestra,
+    medir(lambda: asignar_zonas(lon, lat, geometrias)),
+  )
+
+
+# ========================
+#  MAPA DE ZONAS
+# ========================
+def _grilla_de_poligonos(lado: int) -> pd.DataFrame:
+  # TSV de vértices sintético: lado × lado cuadrados (radios censales)
+  filas = []
+  paso = 0.1 / lado
+  for i in range(lado):
+    for j in range(lado):
+      x, y = -62.12 + i * paso, -38.90 + j * paso
+      vertices = [(x, y), (x + paso, y), (x + paso, y + paso), (x, y + paso)]
+      for orden, (lon, lat) in enumerate(vertices, start=1):
+        filas.append({"zona": f"ZONA {i}", "poligono": j, "lat": lat, "lon": lon, "orden": orden})
+  return pd.DataFrame(filas)
+
+
+def _mapa_original(df: pd.DataFrame, ruta_zonas: str):
+  # Referencia: la página 03 original completa, desde el TSV de polígonos
+  # hasta el JSON del Deck (dict de polígonos + scan por polígono)
+  import pydeck as pdk
+  from shapely.geometry import Polygon
+
+  df_poly = pd.read_csv(ruta_zonas, sep="\t")
+  df_poly["zona"] = df_poly["zona"].astype(str).str.strip()
+  df_poly["poligono"] = df_poly["poligono"].astype(str).str.strip()
+  df_poly["key"] = df_poly["zona"] + " - " + df_poly["poligono"]
+
+  df_votos = df.copy()
+  df_votos["zona"] = df_votos["zona"].astype(str).str.strip()
+  df_votos["poligono"] = df_votos["poligono"].astype(str).str.strip()
+  df_votos["key"] = df_votos["zona"] + " - " + df_votos["poligono"]
+  set(df_votos["key"].unique()) - set(df_poly["key"].unique())
+
+  poligonos = {key: g.sort_values("orden")[["lon", "lat"]].values.tolist() for key, g in df_poly.groupby("key")}
+  conteo = df_votos.groupby("key").size().reset_index(name="cantidad")
+  centroides = []
+  for key, coords in poligonos.items():
+    poly = Polygon(coords)
+    cantidad = conteo.loc[conteo["key"] == key, "cantidad"]
+    centroides.append({
+      "key": key,
+      "lon": poly.centroid.x,
+      "lat": poly.centroid.y,
+      "cantidad": int(cantidad.values[0]) if len(cantidad) else 0,
+      "zona": key.split(" - ")[0],
+    })
+
+  polygon_layer = pdk.Layer(
+    "PolygonLayer",
+    data=[{"polygon": coords, "zona": key.split(" - ")[0], "color": [200, 200, 200, 120]} for key, coords in poligonos.items()],
+    get_polygon="polygon", get_fill_color="color", get_line_color=[0, 0, 0], line_width_min_pixels=1, pickable=True,
+  )
+  text_layer = pdk.Layer(
+    "TextLayer", data=pd.DataFrame(centroides), get_position="[lon, lat]", get_text="cantidad",
+    get_size=28, get_color=[0, 0, 0], get_alignment_baseline="'center'", billboard=True,
+  )
+  vista = pdk.ViewState(latitude=df_votos["lat"].mean(), longitude=df_votos["lon"].mean(), zoom=12)
+  return pdk.Deck(layers=[polygon_layer, text_layer], initial_view_state=vista, tooltip={"text": "{zona}"}).to_json()
+
+
+def bench_mapa(n: int = 50_000):
+  import logging
+  import os
+  import tempfile
+  from unittest import mock
+
+  import streamlit as st
+
+  import ElectoresPorZonaConocidos03 as pagina
+  from zonas import obtener_zonas
+
+  print(f"mapa de zonas (n={n}): capa de polígonos + conteos + JSON del Deck, página 03 original vs actual")
+  rng = np.random.default_rng(0)
+  logging.disable(logging.WARNING)  # avisos de streamlit sin runtime en cada llamada
+  with tempfile.TemporaryDirectory() as tmp:
+    for lado in (3, 10, 32, 64):
+      ruta = os.path.join(tmp, f"zonas_{lado}.tsv")
+      _grilla_de_poligonos(lado).to_csv(ruta, sep="\t", index=False)
+      df = padron_sintetico(n)
+      df["zona"] = pd.Categorical([f"ZONA {i}" for i in rng.integers(0, lado, n)])
+      df["poligono"] = pd.Categorical(rng.integers(0, lado, n).astype(str))
+      df.attrs["version"] = f"mapa-{lado}"
+
+      # La página actual, tal cual (st.pydeck_chart serializa el Deck), con el TSV de la grilla
+      with mock.patch.object(pagina, "obtener_zonas", lambda: obtener_zonas(ruta)):
+        def primera_vez():
+          st.cache_data.clear()
+          st.cache_resource.clear()
+          pagina.mapa_electores_conocidos(df)
+
+        original = medir(lambda: _mapa_original(df, ruta), repeticiones=3)
+        reportar(f"{lado * lado} polígonos, primera vez", original, medir(primera_vez, repeticiones=3))
+        pagina.mapa_electores_conocidos(df)
+        reportar(f"{lado * lado} polígonos, rerun", original, medir(lambda: pagina.mapa_electores_conocidos(df)))
+  logging.disable(logging.NOTSET)
+
+
+# ========================
+#  BOOTSTRAP DE θ
+# ========================
+def _problema_theta(M: int = 190, G: int = 5, P: int = 8, semilla: int = 0):
+  # Mesas sintéticas: composición etaria y votos generados con un θ conocido
+  rng = np.random.default_rng(semilla)
+  N = rng.integers(20, 120, (M, G)).astype("float64")
+  theta = rng.dirichlet(np.ones(P) * 0.7, size=G)
+  V = np.stack([rng.multinomial(int(n), p) for n, p in zip(N.sum(axis=1), (N @ theta) / N.sum(axis=1, keepdims=True))])
+  return N, V.astype("float64")
+
+
+def bench_bootstrap(muestra: int = 100):
+  from bootstrap import TAMANIO_LOTE, pesos_bootstrap
+  from inferencia import ajustar_theta, ajustar_theta_lote
+
+  N, V = _problema_theta()
+  theta0 = ajustar_theta(N, V)
+  M = len(N)
+  print(f"bootstrap de θ ({M} mesas), réplicas por segundo")
+
+  def por_segundo(funcion, B):
+    return B / (medir(funcion, repeticiones=1) / 1000)
+
+  # Los bucles por réplica se miden sobre una muestra y se extrapolan
+  pesos_muestra = pesos_bootstrap(np.arange(M), muestra)
+
+  def em_por_replica():
+    # EM simple de `ajustar_theta`, una réplica por vez
+    for b in range(muestra):
+      mesas = np.repeat(np.arange(M), pesos_muestra[b].astype(np.int64))
+      ajustar_theta(N[mesas], V[mesas], theta0=theta0, tol=1e-7)
+
+  def squarem_por_replica():
+    # Mismo solver que en lote (SQUAREM), pero de a una réplica
+    for b in range(muestra):
+      ajustar_theta_lote(N, V, pesos_muestra[b:b + 1], theta0=theta0, tol=1e-7)
+
+  em = por_segundo(em_por_replica, muestra)
+  squarem = por_segundo(squarem_por_replica, muestra)
+  print(f"  {'algoritmo (por réplica)':<32} EM {em:9.1f}/s → SQUAREM {squarem:9.1f}/s  (x{squarem / em:.1f})")
+  for B in (1_000, 10_000):
+    pesos = pesos_bootstrap(np.arange(M), B)
+
+    def en_lote():
+      for inicio in range(0, B, TAMANIO_LOTE):
+        ajustar_theta_lote(N, V, pesos[inicio:inicio + TAMANIO_LOTE], theta0=theta0, tol=1e-7)
+
+    lote = por_segundo(en_lote, B)
+    print(f"  {f'lote, mismo solver (B={B})':<32} por réplica {squarem:9.1f}/s → en lote {lote:9.1f}/s  (x{lote / squarem:.1f})")
+
+
+# ========================
+#  FIGURAS
+# ========================
+def bench_figuras(partidos: int = 15):
+  import json
+
+  import plotly.express as px
+  import plotly.graph_objects as go
+
+  from figuras import CacheFiguras
+
+  rng = np.random.default_rng(0)
+  theta = pd.DataFrame(
+    rng.dirichlet(np.ones(partidos), size=5),
+    index=["(16, 24)", "(25, 30)", "(31, 44)", "(45, 60)", "(61, 200)"],
+    columns=[f"Partido {i}" for i in range(partidos)],
+  )
+  print(f"figuras: heatmap de θ (5 × {partidos})")
+
+  def armar():
+    fig = px.imshow(theta, color_continuous_scale="Viridis", aspect="auto", labels=dict(color="Prob"))
+    fig.update_layout(xaxis_tickangle=-60, width=1300, height=600)
+    return fig
+
+  cache = CacheFiguras()
+  cache.obtener("heatmap", armar)
+  reportar(
+    "figura repetida",
+    medir(armar),
+    medir(lambda: go.Figure(json.loads(cache.obtener("heatmap", armar)), _validate=False)),
+  )
+  print(f"  {cache.estadisticas()}")
+
+
+# ========================
+#  ARRANQUE
+# ========================
+_SCRIPT_LOGIN = """
+import time
+inicio = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("main.py", default_timeout=60)
+at.secrets["SALT"] = "x"
+at.secrets["SUPABASE_URL"] = "http://localhost"
+at.secrets["SUPABASE_KEY"] = "x"
+at.run()
+assert not at.exception, at.exception
+print(time.perf_counter() - inicio)
+"""
+
+MODULOS_PESADOS = ["pandas", "numpy", "plotly", "pydeck", "shapely", "pyarrow", "supabase"]
+
+
+def bench_arranque(repeticiones: int = 3):
+  import subprocess
+
+  print("arranque: tiempo hasta la pantalla de login (intérprete nuevo)")
+  tiempos = []
+  for _ in range(repeticiones):
+    salida = subprocess.run(
+      [sys.executable, "-X", "importtime", "-c", _SCRIPT_LOGIN],
+      capture_output=True, text=True, check=True,
+    )
+    tiempos.append(float(salida.stdout.strip().splitlines()[-1]))
+
+  # -X importtime: "import time: propio | acumulado | módulo" por línea
+  acumulado = {}
+  for linea in salida.stderr.splitlines():
+    if linea.startswith("import time:") and "|" in linea:
+      _, total, modulo = linea.removeprefix("import time:").split("|")
+      if total.strip().isdigit():
+        acumulado[modulo.strip()] = int(total) / 1000
+
+  print(f"  login en {min(tiempos) * 1000:9.2f} ms (mejor de {repeticiones})")
+  for modulo in MODULOS_PESADOS:
+    estado = f"{acumulado[modulo]:9.2f} ms" if modulo in acumulado else "no importado"
+    print(f"  {modulo:<32} {estado}")
+
+
+# ========================
+#  MEMORIA POR SESIÓN
+# ========================
+def _rss_mb() -> float:
+  # Memoria residente actual del proceso (Linux); si no, el pico
+  try:
+    with open("/proc/self/status") as f:
+      for linea in f:
+        if linea.startswith("VmRSS:"):
+          return int(linea.split()[1]) / 1024
+  except OSError:
+    pass
+  import resource
+  return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _rss_sesiones(modo: str, n: int, sesiones: int) -> tuple[float, float]:
+  """
+  En un proceso nuevo: RSS que deja un primer rerun (imports + vistas
+  compartidas) y crecimiento con `sesiones` reruns concurrentes vivos a
+  la vez (hilos, como los scripts de Streamlit).
+  """
+  import gc
+  import threading
+
+  from agregados import obtener_derivadas
+  from clasificacion import edad_desde_nacimiento, rango_edad, tiene_informacion
+  from padron import esquema_padron, tipar_padron
+  from zonas import geocodificar_padron, obtener_geocodificacion, obtener_zonas
+
+  df = padron_sintetico(n)
+  df = tipar_padron(df.astype(esquema_padron(df.columns)))
+  df.attrs["version"] = "bench"
+  zonas = obtener_zonas()
+
+  # Lo que hacía cada página con su copia del padrón
+  def rerun_antes():
+    copia = df.copy()
+    for col in ["zona", "poligono", "genero", "profesion"]:
+      copia[col] = copia[col].astype(str).str.strip()
+    copia["tiene_informacion"] = tiene_informacion(copia["voto_septiembre"]).astype(str)
+    copia["edad"] = 2025 - copia["fecha_nacimiento"]
+    copia["rango_edad"] = rango_edad(copia["edad"]).astype(str)
+    copia["key"] = copia["zona"] + " - " + copia["poligono"]
+    geo = geocodificar_padron(copia, zonas)
+    tabla = pd.crosstab(geo["zona_geo"], copia["rango_edad"])
+    return copia, geo, tabla
+
+  # Ahora: copia superficial + columnas derivadas y geocodificación compartidas
+  def rerun_despues():
+    copia = df.copy(deep=False)
+    derivadas = obtener_derivadas(copia)
+    geo = obtener_geocodificacion(copia, zonas)
+    tabla = pd.crosstab(geo["zona_geo"], derivadas["rango_edad"])
+    return copia, derivadas, geo, tabla
+
+  rerun = rerun_antes if modo == "antes" else rerun_despues
+  listas, medido = threading.Barrier(sesiones + 1), threading.Barrier(sesiones + 1)
+
+  def sesion():
+    vivo = rerun()
+    listas.wait()  # todas las sesiones con su rerun vivo
+    medido.wait()
+    del vivo
+
+  gc.collect()
+  inicio = _rss_mb()
+  # Un rerun previo: imports y, después, las vistas compartidas (se calculan una vez)
+  vivo = rerun()
+  gc.collect()
+  compartido = _rss_mb() - inicio
+  del vivo
+  gc.collect()
+  base = _rss_mb()
+  hilos = [threading.Thread(target=sesion) for _ in range(sesiones)]
+  for hilo in hilos:
+    hilo.start()
+  listas.wait()
+  gc.collect()
+  pico = _rss_mb()
+  medido.wait()
+  for hilo in hilos:
+    hilo.join()
+  return compartido, pico - base
+
+
+def bench_memoria(n: int = 200_000, sesiones: int = 8):
+  from concurrent.futures import ProcessPoolExecutor
+  from multiprocessing import get_context
+
+  print(f"memoria: RSS por sesión concurrente (n={n}, {sesiones} sesiones, un proceso nuevo por caso)")
+  medidas = {}
+  for modo in ("antes", "despues"):
+    # Cada caso en su propio proceso: el RSS liberado por uno no se reutiliza en el otro
+    with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+      medidas[modo] = pool.submit(_rss_sesiones, modo, n, sesiones).result()
+  (compartido_antes, antes), (compartido_despues, despues) = medidas["antes"], medidas["despues"]
+  print(f"  {'primer rerun (imports + caches)':<32} {compartido_antes:9.2f} MB → {compartido_despues:9.2f} MB")
+  print(f"  {'MB por sesión concurrente':<32} {antes / sesiones:9.2f} MB → {despues / sesiones:9.2f} MB  (x{antes / max(despues, 1e-9):.1f})")
+
+
+# ========================
+#  LOGIN
+# ========================
+class _BackendConLatencia:
+  # Simula la ida y vuelta a la base remota
+  def __init__(self, backend, latencia_s: float):
+    self.backend = backend
+    self.latencia_s = latencia_s
+    self.consultas = 0
+
+  def buscar_usuario(self, nombre):
+    self.consultas += 1
+    time.sleep(self.latencia_s)
+    return self.backend.buscar_usuario(nombre)
+
+
+def bench_login(intentos: int = 400, usuarios: int = 10, hilos: int = 50, latencia_ms: float = 40):
+  from concurrent.futures import ThreadPoolExecutor
+
+  from autenticacion import BackendSQLite, CacheUsuarios
+
+  base = BackendSQLite()
+  for i in range(usuarios):
+    base.agregar_usuario(f"usuario{i}", "x")
+  nombres = [f"usuario{i % usuarios}" for i in range(intentos)]
+  print(f"login: {intentos} búsquedas simultáneas de {usuarios} usuarios ({hilos} hilos, {latencia_ms:.0f} ms por consulta)")
+
+  def rafaga(buscador):
+    with ThreadPoolExecutor(hilos) as pool:
+      list(pool.map(buscador.buscar_usuario, nombres))
+
+  directo = _BackendConLatencia(base, latencia_ms / 1000)
+  cacheado = _BackendConLatencia(base, latencia_ms / 1000)
+  reportar(
+    "ráfaga de logins",
+    medir(lambda: rafaga(directo), repeticiones=1),
+    medir(lambda: rafaga(CacheUsuarios(cacheado)), repeticiones=1),
+  )
+  print(f"  consultas al backend: {directo.consultas} → {cacheado.consultas}")
+
+
+# ========================
+#  CONSULTAS CRUZADAS
+# ========================
+def bench_consultas(n: int = 500_000):
+  from agregados import columnas_derivadas
+  from consultas import indice_padron
+  from padron import esquema_padron, tipar_padron
+
+  df = padron_sintetico(n)
+  df = tipar_padron(df.astype(esquema_padron(df.columns)))
+  derivadas = columnas_derivadas(df)
+  inicio = time.perf_counter()
+  indice = indice_padron(df, "septiembre")
+  print(f"consultas cruzadas (n={n}, índice armado en {(time.perf_counter() - inicio) * 1000:.0f} ms)")
+
+  base = pd.DataFrame({
+    "zona": df["zona"],
+    "poligono": df["poligono"],
+    "rango_edad": derivadas["rango_edad"],
+    "genero": df["genero"],
+    "profesion_categoria": derivadas["profesion_categoria"],
+    "estado_voto": derivadas["estado_septiembre"],
+  })
+
+  def escaneo(filtros, por):
+    # Máscaras booleanas sobre el frame y groupby, como haría una página
+    mascara = np.ones(len(base), dtype=bool)
+    for dimension, valores in filtros.items():
+      mascara &= base[dimension].isin(valores).to_numpy()
+    sub = base[mascara]
+    return pd.DataFrame({
+      "electores": sub.groupby(por, observed=True).size(),
+      "con_informacion": sub[sub["estado_voto"] != "Sin información"].groupby(por, observed=True).size(),
+      "votaron": sub[sub["estado_voto"] == "Votó"].groupby(por, observed=True).size(),
+    })
+
+  # Una sesión de exploración: cada paso agrega un filtro o una dimensión
+  pasos = {
+    "por rango etario": ({}, ["rango_edad"]),
+    "+ zona 1": ({"zona": ["ZONA 1"]}, ["rango_edad"]),
+    "+ por género": ({"zona": ["ZONA 1"]}, ["rango_edad", "genero"]),
+    "+ polígonos 1 y 2": ({"zona": ["ZONA 1"], "poligono": ["1", "2"]}, ["rango_edad", "genero"]),
+    "+ por profesión": ({"zona": ["ZONA 1"], "poligono": ["1", "2"]}, ["rango_edad", "genero", "profesion_categoria"]),
+  }
+  for nombre, (filtros, por) in pasos.items():
+    reportar(nombre, medir(lambda: escaneo(filtros, por)), medir(lambda: indice.consultar(filtros, por)))
+
+
+# ========================
+#  MESAS × PADRÓN
+# ========================
+def bench_mesas(n: int = 500_000, partidos: int = 8):
+  from clasificacion import decodificar_voto, edad_desde_nacimiento, rango_edad
+  from padron import esquema_padron, tipar_padron
+  from resultados import PadronPorMesa, ResultadosMesa, unir
+
+  df = padron_sintetico(n)
+  df = tipar_padron(df.astype(esquema_padron(df.columns)))
+  rng = np.random.default_rng(0)
+  mesas = np.arange(1, 200)
+  escrutinio = pd.DataFrame(rng.integers(0, 80, (len(mesas), partidos)), index=pd.Index(mesas, name="mesa"), columns=[f"P{i}" for i in range(partidos)])
+  resultados = ResultadosMesa.desde_dataframe(escrutinio)
+  print(f"mesas × padrón (n={n}, {len(mesas)} mesas)")
+
+  # Referencia: un groupby por cada agregado y un reindex contra el escrutinio
+  def groupbys():
+    franja = rango_edad(edad_desde_nacimiento(df["fecha_nacimiento"]))
+    voto = pd.Series(decodificar_voto(df["voto_septiembre"]), index=df.index)
+    todos = pd.crosstab(df["mesa"], franja).reindex(escrutinio.index, fill_value=0)
+    votantes = pd.crosstab(df["mesa"][voto == 1], franja[voto == 1]).reindex(escrutinio.index, fill_value=0)
+    con_informacion = (voto >= 0).groupby(df["mesa"]).sum().reindex(escrutinio.index, fill_value=0)
+    return np.where((con_informacion > 0).to_numpy()[:, None], votantes, todos)
+
+  def union():
+    return unir(resultados, PadronPorMesa.desde_padron(df, "septiembre")).diseno()
+
+  reportar("diseño de θ", medir(groupbys), medir(union))
+  padron_mesa = PadronPorMesa.desde_padron(df, "septiembre")
+  reportar("con agregados ya cacheados", medir(groupbys), medir(lambda: unir(resultados, padron_mesa).diseno()))
+
+
+# ========================
+#  PROPENSIÓN POR ELECTOR
+# ========================
+def bench_propension(n: int = 500_000, partidos: int = 15):
+  import os
+  import tempfile
+
+  from padron import esquema_padron, tipar_padron
+  from propension import indices_electores, tabla_posterior, votos_esperados
+  from resultados import PadronPorMesa, ResultadosMesa
+
+  df = padron_sintetico(n)
+  df = tipar_padron(df.astype(esquema_padron(df.columns)))
+  rng = np.random.default_rng(0)
+  theta = rng.dirichlet(np.ones(partidos), size=5)
+  mesas = np.arange(1, 200)
+  resultados = ResultadosMesa(mesas, [f"P{i}" for i in range(partidos)], rng.integers(0, 80, (len(mesas), partidos)))
+  N = PadronPorMesa.desde_padron(df, "septiembre").diseno(mesas=resultados.mesas)
+  print(f"propensión por elector (n={n}, {partidos} partidos)")
+
+  # Referencia: actualización elector por elector (sobre una muestra)
+  muestra = 20_000
+  fila, grupo = indices_electores(df, resultados)
+  esperado = N @ theta
+
+  def por_elector():
+    salida = np.empty((muestra, partidos), dtype=np.float32)
+    for i in range(muestra):
+      q = theta[min(grupo[i], 4)] * resultados.votos[fila[i]] / esperado[fila[i]]
+      salida[i] = q / q.sum()
+    return salida
+
+  with tempfile.TemporaryDirectory() as tmp:
+    ruta = os.path.join(tmp, "puntajes.npy")
+
+    def vectorizado():
+      tabla = tabla_posterior(theta, N, resultados.votos).astype(np.float32)
+      salida = np.lib.format.open_memmap(ruta, mode="w+", dtype=np.float32, shape=(n, partidos))
+      salida[:] = tabla[fila, grupo]
+      salida.flush()
+
+    reportar("puntajes (padrón completo)", medir(por_elector, repeticiones=1) * n / muestra, medir(vectorizado))
+    puntajes = np.load(ruta, mmap_mode="r")
+    codigos = df["zona"].cat.codes.to_numpy()
+    peso = np.ones(n, dtype=np.float32)
+    reportar(
+      "votos esperados por zona",
+      medir(lambda: pd.DataFrame(np.asarray(puntajes)).groupby(codigos).sum()),
+      medir(lambda: votos_esperados(puntajes, peso, codigos, 3)),
+    )
+    del puntajes
+  print(f"  matriz en disco: {n * partidos * 4 / 1e6:.0f} MB (float32)")
+
+
+# ========================
+#  θ POR CELDAS DE COVARIABLES
+# ========================
+def _problema_celdas(M: int, C: int, por_mesa: int, P: int = 15, semilla: int = 0):
+  # Cada mesa tiene electores en `por_mesa` celdas (las de su zona), no en todas
+  import scipy.sparse as sp
+
+  rng = np.random.default_rng(semilla)
+  filas = np.repeat(np.arange(M), por_mesa)
+  inicio = rng.integers(0, C - por_mesa, M)
+  columnas = (inicio[:, None] + np.arange(por_mesa)).ravel()
+  N = sp.csr_matrix((rng.integers(1, 20, M * por_mesa).astype("float64"), (filas, columnas)), shape=(M, C))
+  theta = rng.dirichlet(np.ones(P), size=C)
+  esperado = N @ theta
+  V = rng.poisson(esperado).astype("float64")
+  return N, V, theta
+
+
+def bench_covariables(max_iter: int = 200):
+  from covariables import DENSA_HASTA, DENSIDAD_DENSA, FUERZA_PREVIA, conviene_densa
+  from inferencia import ajustar_theta_lote
+
+  print(
+    f"θ por celdas ({max_iter} ciclos de EM, N densa vs CSR; ajustar_theta_celdas densifica "
+    f"hasta {DENSA_HASTA:,} entradas con densidad desde {DENSIDAD_DENSA})"
+  )
+  # La primera es la escala real: ~200 mesas × ~250 celdas con un tercio de entradas no nulas
+  for M, C, por_mesa in ((200, 270, 90), (200, 270, 20), (2_000, 800, 40), (5_000, 2_000, 60)):
+    N, V, theta = _problema_celdas(M, C, por_mesa)
+    previa = np.full_like(theta, 1 / theta.shape[1])
+    densa = N.toarray()
+    pesos = np.ones((1, M))
+
+    def ajustar(diseno):
+      return ajustar_theta_lote(diseno, V, pesos, theta0=previa, max_iter=max_iter, tol=0, previa=FUERZA_PREVIA * previa)[0]
+
+    # Los dos caminos tienen que dar el mismo θ
+    diferencia = np.abs(ajustar(densa) - ajustar(N)).max()
+    assert diferencia < 1e-9, f"θ denso y CSR difieren en {diferencia:.2e}"
+    reportar(
+      f"{M} mesas × {C} celdas",
+      medir(lambda: ajustar(densa), repeticiones=1),
+      medir(lambda: ajustar(N), repeticiones=1),
+    )
+    camino = "densa" if conviene_densa(N) else "CSR"
+    print(f"  {'':<32} densidad {N.nnz / (M * C):.2f}, usa {camino}, máx |θ denso - θ CSR| = {diferencia:.1e}")
+    print(f"  {'':<32} diseño: {densa.nbytes / 1e6:.1f} MB → {(N.data.nbytes + N.indices.nbytes + N.indptr.nbytes) / 1e6:.2f} MB")
+
+
+# ========================
+#  REAJUSTE INCREMENTAL
+# ========================
+def bench_incremental(B: int = 1_000, repeticiones: int = 3):
+  import os
+  import tempfile
+
+  from bootstrap import _ruta_meta, actualizar_bootstrap_lote, correr_bootstrap_lote, firma_datos
+  from incremental import EstadoTheta
+  from inferencia import ajustar_theta
+  from padron import escribir_meta, leer_meta
+
+  N, V = _problema_theta()
+  M = len(N)
+  mesas = np.arange(1, M + 1)
+  partidos = [str(p) for p in range(V.shape[1])]
+  print(f"θ + bootstrap ({M} mesas, B={B}) al llegar mesas: desde cero vs incremental (mejor de {repeticiones})")
+  with tempfile.TemporaryDirectory() as carpeta:
+    ruta, ruta_cero = os.path.join(carpeta, "muestras.npy"), os.path.join(carpeta, "cero.npy")
+
+    def desde_cero():
+      correr_bootstrap_lote(N, V, B, ruta_cero, mesas=mesas, theta0=ajustar_theta(N, V))
+
+    # Calentamiento: la primera corrida paga la carga de BLAS y de las páginas del .npy
+    desde_cero()
+    for nuevas in (1, 5, 20):
+      # Estado previo: todas las mesas menos las últimas `nuevas`
+      previas = slice(0, M - nuevas)
+      theta_previo = ajustar_theta(N[previas], V[previas])
+      correr_bootstrap_lote(N[previas], V[previas], B, ruta, mesas=mesas[previas], theta0=theta_previo)
+      copia, meta = np.load(ruta).copy(), leer_meta(_ruta_meta(ruta))
+      firma_previa = firma_datos(mesas[previas], N[previas], V[previas])
+      rehechas = 0
+
+      def incremental():
+        nonlocal rehechas
+        np.save(ruta, copia)
+        escribir_meta(_ruta_meta(ruta), meta)
+        estado = EstadoTheta(mesas[previas], N[previas], V[previas], theta_previo, partidos)
+        cambiadas = estado.actualizar(mesas, N, V)
+        rehechas = actualizar_bootstrap_lote(estado.N, estado.V, estado.mesas, cambiadas, ruta, firma_previa)[1]
+
+      reportar(f"mesas nuevas: {nuevas}", medir(desde_cero, repeticiones), medir(incremental, repeticiones))
+      print(f"  {'':<32} réplicas recalculadas: {rehechas} de {B}")
+
+
+# ========================
+#  PARTICIPACIÓN IMPUTADA
+# ========================
+def bench_imputacion(n: int = 500_000):
+  from agregados import construir_cubo
+  from clasificacion import COVARIABLES
+  from participacion import VARIABLES, ModeloParticipacion, tabla_celdas
+
+  df = padron_sintetico(n)
+  cubo = construir_cubo(df)
+  tabla = tabla_celdas(cubo, "septiembre")
+  modelo = ModeloParticipacion.ajustar(tabla)
+  print(f"regresión logística de participación ({n:,} electores, {len(tabla)} celdas)")
+
+  def por_elector():
+    # Newton sobre una fila por elector conocido (matriz de diseño n × K)
+    columnas = {v: COVARIABLES[v](df) for v in VARIABLES}
+    voto = df["voto_septiembre"].to_numpy(dtype=object)
+    conocidos = ~pd.isna(voto)
+    X = modelo.diseno({v: np.asarray(c)[conocidos] for v, c in columnas.items()})
+    y = (voto[conocidos] == True).astype("float64")  # noqa: E712
+    beta = np.zeros(X.shape[1])
+    for _ in range(8):
+      p = 1 / (1 + np.exp(-X @ beta))
+      beta += np.linalg.solve((X * (p * (1 - p))[:, None]).T @ X + np.eye(len(beta)), X.T @ (y - p) - beta)
+
+  reportar("ajuste por elector vs por celdas", medir(por_elector, repeticiones=1), medir(lambda: ModeloParticipacion.ajustar(tabla_celdas(cubo, "septiembre"))))
+  reportar("probabilidad de cada elector", medir(lambda: modelo.diseno({v: COVARIABLES[v](df) for v in VARIABLES}) @ modelo.coeficientes, repeticiones=1), medir(lambda: modelo.probabilidad_electores(df)))
+
+
+# ========================
+#  PADRÓN DESDE STORAGE
+# ========================
+def _storage_local(raiz: str):
+  """Servidor HTTP local con la API de objetos del storage (GET con ETag / If-None-Match)."""
+  import hashlib
+  import http.server
+  import os
+  import threading
+
+  class Manejador(http.server.BaseHTTPRequestHandler):
+    pedidos = []  # código de cada respuesta
+
+    def log_message(self, *args):
+      pass
+
+    def do_GET(self):
+      ruta = os.path.join(raiz, self.path.removeprefix("/storage/v1/object/"))
+      if not os.path.exists(ruta):
+        self.send_response(404)
+        self.end_headers()
+        return
+      with open(ruta, "rb") as f:
+        datos = f.read()
+      etag = f'"{hashlib.md5(datos).hexdigest()}"'
+      codigo = 304 if self.headers.get("If-None-Match") == etag else 200
+      Manejador.pedidos.append(codigo)
+      self.send_response(codigo)
+      self.send_header("ETag", etag)
+      if codigo == 304:
+        self.end_headers()
+        return
+      self.send_header("Content-Length", str(len(datos)))
+      self.end_headers()
+      self.wfile.write(datos)
+
+  servidor = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Manejador)
+  threading.Thread(target=servidor.serve_forever, daemon=True).start()
+  return servidor, f"http://127.0.0.1:{servidor.server_address[1]}", Manejador.pedidos
+
+
+def bench_storage(n: int = 200_000):
+  import os
+  import shutil
+  import tempfile
+
+  from padron import descargar_padron
+
+  print(f"padrón desde storage (n={n}, servidor HTTP local)")
+  with tempfile.TemporaryDirectory() as tmp:
+    raiz, cache = os.path.join(tmp, "bucket"), os.path.join(tmp, "cache")
+    os.makedirs(os.path.join(raiz, "padrones"))
+    objeto = os.path.join(raiz, "padrones", "padron.tsv")
+    padron_sintetico(n).to_csv(objeto, sep="\t", index=False)
+    servidor, url, pedidos = _storage_local(raiz)
+    try:
+      def completa():
+        # Sin cache local: descarga y parseo del TSV
+        shutil.rmtree(cache, ignore_errors=True)
+        return descargar_padron(url, "key", "padrones", "padron.tsv", cache)
+
+      ruta_parquet, version = completa()
+      reportar(
+        "descarga vs GET condicional",
+        medir(completa, repeticiones=3),
+        medir(lambda: descargar_padron(url, "key", "padrones", "padron.tsv", cache)),
+      )
+
+      # Objeto sin cambios: 304, misma versión y el parquet no se reescribe
+      antes = os.path.getmtime(ruta_parquet)
+      del pedidos[:]
+      assert descargar_padron(url, "key", "padrones", "padron.tsv", cache) == (ruta_parquet, version)
+      assert pedidos == [304] and os.path.getmtime(ruta_parquet) == antes
+
+      # Objeto cambiado: ETag nuevo, 200, versión nueva y parquet reescrito
+      padron_sintetico(n // 2, semilla=1).to_csv(objeto, sep="\t", index=False)
+      del pedidos[:]
+      ruta_nueva, version_nueva = descargar_padron(url, "key", "padrones", "padron.tsv", cache)
+      assert pedidos == [200] and ruta_nueva == ruta_parquet and version_nueva != version
+      assert len(pd.read_parquet(ruta_nueva)) == n // 2
+      print("  ETag sin cambios → 304 y cache reutilizada; ETag nuevo → cache invalidada: ok")
+    finally:
+      servidor.shutdown()
+
+
+BENCHMARKS = {
+  "clasificacion": bench_clasificacion,
+  "geocodificacion": bench_geocodificacion,
+  "mapa": bench_mapa,
+  "bootstrap": bench_bootstrap,
+  "figuras": bench_figuras,
+  "arranque": bench_arranque,
+  "memoria": bench_memoria,
+  "login": bench_login,
+  "consultas": bench_consultas,
+  "mesas": bench_mesas,
+  "propension": bench_propension,
+  "covariables": bench_covariables,
+  "incremental": bench_incremental,
+  "imputacion": bench_imputacion,
+  "storage": bench_storage,
+}
+
+
+if __name__ == "__main__":
+  for nombre in sys.argv[1:] or BENCHMARKS:
+    BENCHMARKS[nombre]()
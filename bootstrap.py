@@ -0,0 +1,240 @@
+"""
+Bootstrap de θ por remuestreo de mesas.
+
+Dos motores, ambos escriben las réplicas directo a un .npy mapeado en
+memoria (B × G × P), sin juntarlas en RAM:
+
+- En lote (por defecto): cada réplica pesa cada mesa con un peso
+  Poisson(1) y todas las réplicas de un lote se ajustan juntas con
+  `ajustar_theta_lote`. Los pesos de una mesa salen de una semilla
+  propia (semilla global + número de mesa), así no dependen del orden
+  de las mesas ni de cuáles otras haya. Por eso, cuando se agregan o
+  corrigen mesas, `actualizar_bootstrap_lote` rehace solo las réplicas
+  que les dan peso a esas mesas.
+- En paralelo: cada réplica sortea M mesas con reposición y reajusta θ
+  por separado. Las réplicas se reparten en bloques entre procesos; cada
+  bloque tiene su propia semilla derivada de la semilla global
+  (SeedSequence.spawn), así el resultado es el mismo con 1 o con N
+  procesos.
+
+Uso:
+  python bootstrap.py octubre ./data/padron_con_voto_geolocalizado.tsv 10000 [lote|procesos]
+"""
+import hashlib
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from inferencia import ARCHIVOS, GRUPOS_EDAD, ajustar_theta, ajustar_theta_lote
+from padron import escribir_meta, leer_meta
+
+TAMANIO_BLOQUE = 50
+TAMANIO_LOTE = 250  # réplicas por lote: acota la memoria a ~lote × M × P
+
+# Datos compartidos por cada proceso del pool (se cargan una vez por proceso)
+_N = None
+_V = None
+_THETA0 = None
+
+
+# ========================
+#  EN LOTE (PESOS POISSON)
+# ========================
+def pesos_bootstrap(mesas, B: int, semilla: int = 0) -> np.ndarray:
+  """
+  Pesos B × M: cuántas veces cuenta cada mesa en cada réplica. La columna
+  de la mesa m depende solo de (semilla, m), de modo que agregar o
+  corregir mesas no cambia los pesos de las demás.
+  """
+  pesos = np.empty((B, len(mesas)), dtype=np.float32)
+  for j, mesa in enumerate(mesas):
+    pesos[:, j] = np.random.default_rng([semilla, int(mesa)]).poisson(1.0, B)
+  return pesos
+
+
+def firma_datos(mesas, N: np.ndarray, V: np.ndarray) -> str:
+  """Identifica las mesas y sus filas de N y V con las que se corrieron las réplicas."""
+  h = hashlib.sha1()
+  for arreglo in (np.asarray(mesas, dtype=np.int64), np.asarray(N, dtype="float64"), np.asarray(V, dtype="float64")):
+    h.update(np.ascontiguousarray(arreglo).tobytes())
+  return h.hexdigest()
+
+
+def _ruta_meta(ruta: str) -> str:
+  return os.path.splitext(ruta)[0] + ".json"
+
+
+def _escribir_meta_muestras(ruta: str, motor: str, semilla: int, mesas, N: np.ndarray, V: np.ndarray):
+  # Motor, semilla y datos de las réplicas: sin esto no se puede saber si
+  # es válido reajustar solo algunas (ver `actualizar_bootstrap_lote`)
+  escribir_meta(_ruta_meta(ruta), {
+    "motor": motor,
+    "semilla": semilla,
+    "mesas": np.asarray(mesas, dtype=np.int64).tolist(),
+    "firma": firma_datos(mesas, N, V),
+  })
+
+
+def _crear_salida(ruta: str, B: int, G: int, P: int):
+  os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+  salida = np.lib.format.open_memmap(ruta, mode="w+", dtype=np.float32, shape=(B, G, P))
+  salida[:] = np.nan
+  return salida
+
+
+def correr_bootstrap_lote(N: np.ndarray, V: np.ndarray, B: int, ruta: str, mesas=None, semilla: int = 0, theta0: np.ndarray | None = None) -> np.ndarray:
+  """
+  Corre B réplicas en lotes de TAMANIO_LOTE y devuelve el arreglo
+  B × G × P mapeado desde `ruta`. `mesas` son los números de mesa de las
+  filas de N y V (por defecto 0..M-1), usados para derivar los pesos.
+  """
+  mesas = np.arange(len(N)) if mesas is None else np.asarray(mesas)
+  pesos = pesos_bootstrap(mesas, B, semilla)
+  salida = _crear_salida(ruta, B, N.shape[1], V.shape[1])
+  for inicio in range(0, B, TAMANIO_LOTE):
+    fin = min(inicio + TAMANIO_LOTE, B)
+    salida[inicio:fin] = ajustar_theta_lote(N, V, pesos[inicio:fin], theta0=theta0, tol=1e-7)
+  salida.flush()
+  del salida
+  _escribir_meta_muestras(ruta, "lote", semilla, mesas, N, V)
+  return np.load(ruta, mmap_mode="r")
+
+
+def actualizar_bootstrap_lote(
+  N: np.ndarray,
+  V: np.ndarray,
+  mesas,
+  cambiadas,
+  ruta: str,
+  firma_previa: str,
+  semilla: int = 0,
+  theta0: np.ndarray | None = None,
+) -> tuple[np.ndarray, int]:
+  """
+  Rehace en `ruta` solo las réplicas afectadas por las mesas `cambiadas`
+  (nuevas, corregidas o quitadas): las que le dan peso > 0 a alguna de
+  ellas. En las demás esas mesas no cuentan, así que su θ no cambia.
+  Cada réplica afectada arranca desde su θ anterior. Devuelve las
+  réplicas (mapeadas) y cuántas se recalcularon.
+
+  Solo vale si las réplicas salieron de `correr_bootstrap_lote` con la
+  misma `semilla` y sobre los datos de `firma_previa` (`firma_datos` de
+  las mesas antes del cambio): los pesos de cada mesa dependen solo de
+  (semilla, mesa). Si el .json de las réplicas no coincide (motor en
+  paralelo, otra semilla, otros datos o sin .json) o cambió la cantidad
+  de franjas o de partidos, se corren todas de nuevo, desde `theta0`.
+  """
+  salida = np.load(ruta, mmap_mode="r+")
+  B, G, P = salida.shape
+  meta = leer_meta(_ruta_meta(ruta))
+  coincide = (meta.get("motor"), meta.get("semilla"), meta.get("firma")) == ("lote", semilla, firma_previa)
+  if not coincide or (G, P) != (N.shape[1], V.shape[1]):
+    del salida
+    return correr_bootstrap_lote(N, V, B, ruta, mesas=mesas, semilla=semilla, theta0=theta0), B
+
+  afectadas = np.flatnonzero((pesos_bootstrap(np.asarray(cambiadas), B, semilla) > 0).any(axis=1))
+  pesos = pesos_bootstrap(np.asarray(mesas), B, semilla)
+  for inicio in range(0, len(afectadas), TAMANIO_LOTE):
+    lote = afectadas[inicio:inicio + TAMANIO_LOTE]
+    anteriores = np.asarray(salida[lote], dtype="float64")
+    # Réplicas que nunca se completaron (NaN) arrancan desde θ uniforme
+    anteriores[~np.isfinite(anteriores)] = 1 / P
+    salida[lote] = ajustar_theta_lote(N, V, pesos[lote], theta0=anteriores, tol=1e-7)
+  salida.flush()
+  del salida
+  _escribir_meta_muestras(ruta, "lote", semilla, mesas, N, V)
+  return np.load(ruta, mmap_mode="r"), len(afectadas)
+
+
+# ========================
+#  EN PARALELO (REMUESTREO)
+# ========================
+def _inicializar(N, V, theta0):
+  global _N, _V, _THETA0
+  _N, _V, _THETA0 = N, V, theta0
+
+
+def _correr_bloque(ruta: str, inicio: int, fin: int, semilla: np.random.SeedSequence):
+  rng = np.random.default_rng(semilla)
+  salida = np.load(ruta, mmap_mode="r+")
+  M = _N.shape[0]
+  for b in range(inicio, fin):
+    mesas = rng.integers(0, M, M)
+    salida[b] = ajustar_theta(_N[mesas], _V[mesas], theta0=_THETA0, tol=1e-7)
+  salida.flush()
+  return fin - inicio
+
+
+def correr_bootstrap(N: np.ndarray, V: np.ndarray, B: int, ruta: str, mesas=None, semilla: int = 0, procesos: int | None = None, theta0: np.ndarray | None = None) -> np.ndarray:
+  """
+  Corre B réplicas y devuelve el arreglo B × G × P mapeado desde `ruta`.
+  `mesas` son los números de mesa de las filas de N y V (por defecto
+  0..M-1); quedan registrados junto a las réplicas.
+
+  `theta0` (típicamente el θ de la muestra completa) se usa como punto de
+  partida de cada reajuste, lo que reduce mucho las iteraciones del EM.
+  """
+  N = np.asarray(N, dtype="float64")
+  V = np.asarray(V, dtype="float64")
+  G, P = N.shape[1], V.shape[1]
+
+  salida = _crear_salida(ruta, B, G, P)
+  salida.flush()
+  del salida
+
+  bloques = [(i, min(i + TAMANIO_BLOQUE, B)) for i in range(0, B, TAMANIO_BLOQUE)]
+  semillas = np.random.SeedSequence(semilla).spawn(len(bloques))
+
+  with ProcessPoolExecutor(max_workers=procesos, initializer=_inicializar, initargs=(N, V, theta0)) as pool:
+    tareas = [pool.submit(_correr_bloque, ruta, inicio, fin, s) for (inicio, fin), s in zip(bloques, semillas)]
+    for tarea in tareas:
+      tarea.result()
+
+  mesas = np.arange(len(N)) if mesas is None else np.asarray(mesas)
+  _escribir_meta_muestras(ruta, "procesos", semilla, mesas, N, V)
+  return np.load(ruta, mmap_mode="r")
+
+
+# ========================
+#  RESUMEN
+# ========================
+def resumir_bootstrap(thetas_boot: np.ndarray, partidos, grupos=GRUPOS_EDAD) -> pd.DataFrame:
+  """Percentiles 2.5 / 50 / 97.5 en el formato de theta_bootstrap_summary.csv."""
+  percentiles = np.nanpercentile(thetas_boot, [2.5, 50, 97.5], axis=0)  # 3 × G × P
+  G, P = percentiles.shape[1:]
+  return pd.DataFrame({
+    "age_group": np.repeat(list(grupos), P),
+    "party": np.tile(list(partidos), G),
+    "theta_2.5": percentiles[0].ravel(),
+    "theta_50": percentiles[1].ravel(),
+    "theta_97.5": percentiles[2].ravel(),
+  })
+
+
+def cargar_muestras(ruta: str) -> np.ndarray | None:
+  """Réplicas B × G × P guardadas (mapeadas, sin leerlas enteras), o None."""
+  if not os.path.exists(ruta):
+    return None
+  return np.load(ruta, mmap_mode="r")
+
+
+if __name__ == "__main__":
+  from inferencia import unir_eleccion
+  from padron import leer_padron_tsv
+
+  eleccion, ruta_padron, B = sys.argv[1], sys.argv[2], int(sys.argv[3])
+  modo = sys.argv[4] if len(sys.argv) > 4 else "lote"
+  archivos = ARCHIVOS[eleccion]
+  mesas = unir_eleccion(leer_padron_tsv(ruta_padron), eleccion)
+  N, V = mesas.diseno(), mesas.V
+
+  theta0 = ajustar_theta(N, V)
+  if modo == "lote":
+    thetas_boot = correr_bootstrap_lote(N, V, B, archivos["muestras"], mesas=mesas.mesas, theta0=theta0)
+  else:
+    thetas_boot = correr_bootstrap(N, V, B, archivos["muestras"], mesas=mesas.mesas, theta0=theta0)
+  resumir_bootstrap(thetas_boot, mesas.partidos).to_csv(archivos["bootstrap"], index=False)
+  print(f"{B} réplicas en {archivos['muestras']}, resumen en {archivos['bootstrap']}")
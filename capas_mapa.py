@@ -0,0 +1,53 @@
+import json
+
+import pydeck as pdk
+from pydeck.bindings.json_tools import default_serialize
+
+# ===============================================================
+# Capas de pydeck pre-serializadas
+#
+# pydeck vuelve a serializar el Deck completo (con indent=2) en cada
+# rerun, incluidas las coordenadas de los polígonos, que no cambian.
+# Acá las capas fijas se serializan una sola vez, en JSON compacto, y
+# en cada rerun solo se serializan las capas chicas que dependen de
+# los datos (conteos, textos) y se empalman con las fijas.
+# ===============================================================
+
+DECIMALES_COORDENADAS = 6  # ~10 cm, más que suficiente para el mapa
+
+_MARCA = "__capa_fija_{}__"
+
+
+def _a_json(objeto) -> str:
+  return json.dumps(objeto, sort_keys=True, default=default_serialize, separators=(",", ":"))
+
+
+def redondear_coordenadas(coords, decimales: int = DECIMALES_COORDENADAS) -> list:
+  return [[round(x, decimales), round(y, decimales)] for x, y in coords]
+
+
+def serializar_capa(capa: pdk.Layer) -> str:
+  """JSON compacto de una capa, listo para reutilizar entre reruns."""
+  return _a_json(capa)
+
+
+class DeckConCapasFijas(pdk.Deck):
+  """
+  Deck cuyas primeras capas se reciben ya serializadas (ver
+  `serializar_capa`). El resto de los argumentos son los de `pdk.Deck`.
+  """
+
+  def __init__(self, capas_fijas=(), **kwargs):
+    super().__init__(**kwargs)
+    self.capas_fijas = list(capas_fijas)
+
+  def to_json(self):
+    spec = default_serialize(self)
+    fijas = spec.pop("capasFijas", [])
+    marcas = [_MARCA.format(i) for i in range(len(fijas))]
+    spec["layers"] = marcas + list(spec.get("layers") or [])
+
+    texto = _a_json(spec)
+    for marca, capa in zip(marcas, fijas):
+      texto = texto.replace(f'"{marca}"', capa, 1)
+    return texto
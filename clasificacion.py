@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+
+# ===============================================================
+# Clasificaciones vectorizadas del padrón
+#
+# Todas reciben una Series y devuelven una Series categórica con el
+# mismo índice. Las clasificaciones de texto trabajan sobre los valores
+# distintos (las categorías) y reutilizan los códigos de cada fila.
+# ===============================================================
+
+ANIO_ACTUAL = 2025
+
+# Cortes inferiores de cada franja: [16, 25), [25, 31), ..., [61, ∞)
+BORDES_EDAD = (16, 25, 31, 45, 61)
+
+CATEGORIAS_PROFESION = ["SIN OCUPACION", "ESTUDIANTE", "NO CONSTA", "JUBILADO"]
+PROFESIONES = CATEGORIAS_PROFESION + ["OTRAS", "SIN DATO"]
+
+ESTADOS_VOTO = ["Votó", "No votó", "Sin información"]
+INFORMACION = ["Con información", "Sin información"]
+
+_VERDADEROS = ["true", "1", "si", "sí"]
+_FALSOS = ["false", "0", "no"]
+
+
+def etiquetas_rangos(bordes=BORDES_EDAD) -> list[str]:
+  """(16, 25, 31) → ["16-24", "25-30", "31+"]"""
+  etiquetas = [f"{a}-{b - 1}" for a, b in zip(bordes[:-1], bordes[1:])]
+  return etiquetas + [f"{bordes[-1]}+"]
+
+
+RANGOS_EDAD = etiquetas_rangos()
+
+
+def _por_categorias(serie: pd.Series, funcion, categorias) -> pd.Series:
+  # Aplica `funcion` (vectorizada) a los valores distintos y no a cada fila
+  if not isinstance(serie.dtype, pd.CategoricalDtype):
+    serie = serie.astype("category")
+  clasificadas = funcion(pd.Series(serie.cat.categories))
+  codigos = pd.Index(categorias).get_indexer(clasificadas)
+  nulo = pd.Index(categorias).get_indexer(funcion(pd.Series([np.nan], dtype="string")))[0]
+  originales = serie.cat.codes.to_numpy()
+  nuevos = np.where(originales >= 0, codigos[originales], nulo)
+  return pd.Series(pd.Categorical.from_codes(nuevos, categorias), index=serie.index, name=serie.name)
+
+
+# ========================
+#  EDAD
+# ========================
+def edad_desde_nacimiento(fecha_nacimiento: pd.Series, anio: int = ANIO_ACTUAL) -> pd.Series:
+  return anio - pd.to_numeric(fecha_nacimiento, errors="coerce").astype("float64")
+
+
+def rango_edad(edad: pd.Series, bordes=BORDES_EDAD, etiquetas=None) -> pd.Series:
+  """
+  Franja etaria de cada edad. Las edades menores al primer borde (o
+  faltantes) quedan como NaN.
+  """
+  etiquetas = etiquetas or etiquetas_rangos(bordes)
+  return pd.cut(edad, bins=list(bordes) + [np.inf], labels=etiquetas, right=False)
+
+
+# ========================
+#  VOTO
+# ========================
+def decodificar_voto(voto: pd.Series) -> np.ndarray:
+  """
+  Estado de voto como int8: 1 votó, 0 no votó, -1 sin información.
+
+  Acepta booleanos nulables, columnas object con True/False/None/NaN y
+  también texto ("True", "false", "1", ...) como queda al leer con dtype=str.
+  """
+  if pd.api.types.is_bool_dtype(voto.dtype):
+    return voto.to_numpy(dtype="int8", na_value=-1)
+
+  valores = voto.to_numpy(dtype=object)
+  estado = np.full(len(voto), -1, dtype=np.int8)
+  conocidos = np.flatnonzero(~pd.isna(valores))
+  subset = valores[conocidos]
+
+  # Booleanos de Python/NumPy: comparación directa, sin pasar a texto
+  verdaderos = subset == True  # noqa: E712
+  falsos = subset == False  # noqa: E712
+  estado[conocidos[verdaderos]] = 1
+  estado[conocidos[falsos]] = 0
+
+  # El resto (texto) se normaliza solo para esas filas
+  resto = conocidos[~(verdaderos | falsos)]
+  if len(resto):
+    texto = pd.Series(valores[resto]).astype("string").str.strip().str.lower()
+    estado[resto[texto.isin(_VERDADEROS).to_numpy(dtype=bool, na_value=False)]] = 1
+    estado[resto[texto.isin(_FALSOS).to_numpy(dtype=bool, na_value=False)]] = 0
+  return estado
+
+
+def estado_voto(voto: pd.Series) -> pd.Series:
+  """Votó / No votó / Sin información."""
+  codigos = np.array([2, 1, 0], dtype=np.int8)[decodificar_voto(voto) + 1]
+  return pd.Series(pd.Categorical.from_codes(codigos, ESTADOS_VOTO), index=voto.index, name=voto.name)
+
+
+def tiene_informacion(voto: pd.Series) -> pd.Series:
+  """Con información (votó o no votó) / Sin información."""
+  codigos = (decodificar_voto(voto) < 0).astype(np.int8)
+  return pd.Series(pd.Categorical.from_codes(codigos, INFORMACION), index=voto.index, name=voto.name)
+
+
+# ========================
+#  PROFESIÓN
+# ========================
+def _clasificar_profesion(profesion: pd.Series) -> pd.Series:
+  texto = profesion.astype("string").str.upper().str.strip()
+  categoria = texto.where(texto.isin(CATEGORIAS_PROFESION), "OTRAS")
+  return categoria.mask(texto.isna() | (texto == "") | (texto == "NAN"), "SIN DATO")
+
+
+def categoria_profesion(profesion: pd.Series) -> pd.Series:
+  """Profesiones especiales tal cual, vacías como SIN DATO y el resto OTRAS."""
+  return _por_categorias(profesion, _clasificar_profesion, PROFESIONES)
+
+
+# ========================
+#  COVARIABLES POR ELECTOR
+# ========================
+# Clasificación de cada elector por covariable, para los modelos que
+# cruzan celdas (`covariables`) o que predicen por elector (`participacion`).
+COVARIABLES = {
+  "rango_edad": lambda df: rango_edad(edad_desde_nacimiento(df["fecha_nacimiento"])),
+  "genero": lambda df: df["genero"],
+  "profesion_categoria": lambda df: categoria_profesion(df["profesion"]),
+  "zona": lambda df: df["zona"],
+}
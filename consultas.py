@@ -0,0 +1,144 @@
+"""
+Consultas cruzadas sobre el padrón con índices de bitmaps.
+
+Para cada dimensión (zona, polígono, rango etario, género, profesión y
+estado de voto) y cada uno de sus valores se guarda un bitmap con un bit
+por elector. Un filtro es un OR de los bitmaps de los valores elegidos
+dentro de cada dimensión y un AND entre dimensiones; contar es sumar los
+bits en 1 (popcount). Así ninguna consulta recorre el frame completo:
+cada operación trabaja sobre n/64 palabras de 64 bits.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from agregados import obtener_derivadas
+from padron import VERSIONES_EN_CACHE, version_padron
+
+DIMENSIONES = {
+  "zona": "Zona",
+  "poligono": "Polígono",
+  "rango_edad": "Rango etario",
+  "genero": "Género",
+  "profesion_categoria": "Profesión",
+  "estado_voto": "Estado de voto",
+}
+
+if hasattr(np, "bitwise_count"):
+  def _popcount(palabras: np.ndarray) -> int:
+    return int(np.bitwise_count(palabras).sum())
+else:
+  _BITS_POR_BYTE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+  def _popcount(palabras: np.ndarray) -> int:
+    return int(_BITS_POR_BYTE[palabras.view(np.uint8)].sum(dtype=np.int64))
+
+
+def _bitmap(mascara: np.ndarray) -> np.ndarray:
+  # Bits empaquetados y rellenados hasta múltiplo de 64 para operar en uint64
+  bytes_ = np.packbits(mascara)
+  relleno = (-len(bytes_)) % 8
+  return np.concatenate([bytes_, np.zeros(relleno, dtype=np.uint8)]).view(np.uint64)
+
+
+# ========================
+#  ÍNDICE
+# ========================
+class IndiceBitmap:
+  """Un bitmap por (dimensión, valor) y operaciones de filtro y conteo."""
+
+  def __init__(self, n: int, bitmaps: dict):
+    self.n = n
+    self.bitmaps = bitmaps  # dimensión → {valor: bitmap uint64}
+    self.todos = _bitmap(np.ones(n, dtype=bool))
+
+  @classmethod
+  def desde_columnas(cls, columnas: dict) -> "IndiceBitmap":
+    """`columnas`: dimensión → Series categórica alineada (NaN = sin dato)."""
+    bitmaps = {}
+    n = 0
+    for dimension, serie in columnas.items():
+      categorica = serie.astype("category")
+      codigos = categorica.cat.codes.to_numpy()
+      n = len(codigos)
+      bitmaps[dimension] = {
+        valor: _bitmap(codigos == i)
+        for i, valor in enumerate(categorica.cat.categories)
+      }
+    return cls(n, bitmaps)
+
+  def valores(self, dimension: str) -> list:
+    return list(self.bitmaps[dimension])
+
+  def filtrar(self, filtros: dict, base: np.ndarray | None = None) -> np.ndarray:
+    """
+    Bitmap de los electores que cumplen todos los `filtros` (dimensión →
+    valor o lista de valores; dentro de una dimensión alcanza con uno).
+    """
+    resultado = self.todos if base is None else base
+    for dimension, valores in filtros.items():
+      valores = valores if isinstance(valores, (list, tuple, set)) else [valores]
+      if not valores:
+        continue
+      union = np.zeros_like(self.todos)
+      for valor in valores:
+        union |= self.bitmaps[dimension][valor]
+      resultado = resultado & union
+    return resultado
+
+  def contar(self, bitmap: np.ndarray) -> int:
+    return _popcount(bitmap)
+
+  def consultar(self, filtros: dict, por: list[str]) -> pd.DataFrame:
+    """
+    Electores, con información, votaron y participación por cada
+    combinación no vacía de los valores de `por`, entre los electores
+    que cumplen `filtros`.
+    """
+    seleccion = self.filtrar(filtros)
+    voto = self.bitmaps["estado_voto"]
+    votaron_bm = voto.get("Votó", np.zeros_like(self.todos))
+    con_info_bm = votaron_bm | voto.get("No votó", np.zeros_like(self.todos))
+
+    filas = []
+
+    def recorrer(bitmap, nivel, claves):
+      # Profundiza dimensión por dimensión y poda las ramas vacías
+      if nivel == len(por):
+        con_informacion = _popcount(bitmap & con_info_bm)
+        votaron = _popcount(bitmap & votaron_bm)
+        filas.append((*claves, _popcount(bitmap), con_informacion, votaron))
+        return
+      for valor, bm in self.bitmaps[por[nivel]].items():
+        parcial = bitmap & bm
+        if parcial.any():
+          recorrer(parcial, nivel + 1, claves + (valor,))
+
+    recorrer(seleccion, 0, ())
+    tabla = pd.DataFrame(filas, columns=[*por, "electores", "con_informacion", "votaron"])
+    with np.errstate(invalid="ignore", divide="ignore"):
+      tabla["participacion"] = np.where(tabla["con_informacion"] > 0, tabla["votaron"] / tabla["con_informacion"], np.nan)
+    return tabla
+
+
+def indice_padron(df: pd.DataFrame, eleccion: str) -> IndiceBitmap:
+  """Índice de las dimensiones de `DIMENSIONES` para una elección."""
+  derivadas = obtener_derivadas(df)
+  return IndiceBitmap.desde_columnas({
+    "zona": df["zona"],
+    "poligono": df["poligono"],
+    "rango_edad": derivadas["rango_edad"],
+    "genero": df["genero"],
+    "profesion_categoria": derivadas["profesion_categoria"],
+    "estado_voto": derivadas[f"estado_{eleccion}"],
+  })
+
+
+@st.cache_resource(show_spinner="Indexando padrón...", max_entries=2 * VERSIONES_EN_CACHE)  # septiembre y octubre
+def _indice_cacheado(version: str, eleccion: str, _df: pd.DataFrame) -> IndiceBitmap:
+  return indice_padron(_df, eleccion)
+
+
+def obtener_indice(df: pd.DataFrame, eleccion: str) -> IndiceBitmap:
+  """Índice de bitmaps por versión de datos y elección, compartido entre sesiones."""
+  return _indice_cacheado(version_padron(df), eleccion, df)
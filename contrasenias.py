@@ -0,0 +1,90 @@
+"""
+Hash de contraseñas con scrypt.
+
+Formato guardado: "scrypt$n$r$p$<salt>$<hash>" (salt y hash en base64),
+así cada hash lleva su propia sal y sus parámetros, y se pueden subir
+los parámetros más adelante sin invalidar los hashes viejos.
+
+Los hashes anteriores (SHA-256 de usuario + contraseña + SALT global)
+se siguen aceptando; `necesita_actualizar` indica cuándo conviene
+reemplazarlos por uno nuevo, lo que el login hace en el primer ingreso
+correcto.
+
+scrypt usa ~16 MB y ~0.1 s de CPU por intento, por eso las
+verificaciones corren en un pool de hilos acotado (`PoolContrasenias`):
+una ráfaga de logins hace cola ahí en lugar de ocupar todos los hilos
+del servidor de Streamlit.
+"""
+import base64
+import hashlib
+import hmac
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+PREFIJO = "scrypt"
+N, R, P = 2 ** 14, 8, 1
+LARGO_SAL = 16
+LARGO_HASH = 32
+CONCURRENCIA = 2
+
+
+def _b64(datos: bytes) -> str:
+  return base64.b64encode(datos).decode("ascii")
+
+
+def _scrypt(password: str, sal: bytes, n: int, r: int, p: int, largo: int) -> bytes:
+  return hashlib.scrypt(password.encode(), salt=sal, n=n, r=r, p=p, dklen=largo, maxmem=2 * 128 * r * (n + p + 2))
+
+
+# ========================
+#  HASH Y VERIFICACIÓN
+# ========================
+def hashear(password: str) -> str:
+  """Hash nuevo con sal aleatoria y los parámetros actuales."""
+  sal = os.urandom(LARGO_SAL)
+  return f"{PREFIJO}${N}${R}${P}${_b64(sal)}${_b64(_scrypt(password, sal, N, R, P, LARGO_HASH))}"
+
+
+def hash_legado(usuario: str, password: str, salt: str) -> str:
+  """Hash anterior: un SHA-256 con una única sal global."""
+  return hashlib.sha256(f"{usuario}{password}{salt}".encode()).hexdigest()
+
+
+def verificar(usuario: str, password: str, guardado: str, salt_legado: str = "") -> bool:
+  """True si `password` corresponde al hash guardado (nuevo o legado)."""
+  if not guardado.startswith(f"{PREFIJO}$"):
+    return hmac.compare_digest(hash_legado(usuario, password, salt_legado), guardado)
+
+  try:
+    _, n, r, p, sal, esperado = guardado.split("$")
+    esperado = base64.b64decode(esperado)
+    obtenido = _scrypt(password, base64.b64decode(sal), int(n), int(r), int(p), len(esperado))
+  except ValueError:
+    return False
+  return hmac.compare_digest(obtenido, esperado)
+
+
+def necesita_actualizar(guardado: str) -> bool:
+  """True si el hash es legado o usa parámetros distintos a los actuales."""
+  return not guardado.startswith(f"{PREFIJO}${N}${R}${P}$")
+
+
+# ========================
+#  POOL ACOTADO
+# ========================
+class PoolContrasenias:
+  """
+  Corre hash y verificación en a lo sumo `concurrencia` hilos a la vez
+  (hashlib.scrypt libera el GIL mientras calcula). Los pedidos que
+  exceden el cupo esperan en la cola del pool.
+  """
+
+  def __init__(self, concurrencia: int = CONCURRENCIA, salt_legado: str = ""):
+    self.salt_legado = salt_legado
+    self._pool = ThreadPoolExecutor(max_workers=concurrencia, thread_name_prefix="contrasenias")
+
+  def hashear(self, password: str) -> str:
+    return self._pool.submit(hashear, password).result()
+
+  def verificar(self, usuario: str, password: str, guardado: str) -> bool:
+    return self._pool.submit(verificar, usuario, password, guardado, self.salt_legado).result()
@@ -0,0 +1,157 @@
+"""
+θ por celdas de covariables cruzadas: P(partido | franja etaria, género, profesión, zona).
+
+Es la misma inferencia ecológica de `inferencia`, pero cada "franja" es
+ahora una celda de covariables cruzadas (cualquier subconjunto de
+`COVARIABLES`). Con cuatro covariables hay cientos de celdas, y cada mesa
+tiene electores en pocas de ellas: la matriz mesa × celda se guarda
+dispersa (scipy.sparse CSR) y el EM en lote de `inferencia` la usa tal
+cual, sin densificarla. Solo para problemas chicos (DENSA_HASTA) y con
+la matriz bastante llena (DENSIDAD_DENSA) el ajuste la densifica, porque
+ahí el EM denso es más rápido.
+
+Con tantas celdas y ~200 mesas el problema queda mal determinado, así
+que cada celda lleva una previa de Dirichlet centrada en el θ de su
+franja etaria (`theta_estimates.csv`), con un peso de FUERZA_PREVIA
+votos: las celdas con muchos votos se alejan de la previa y las chicas
+se quedan cerca.
+
+Uso por línea de comandos:
+  python covariables.py octubre ./data/padron_con_voto_geolocalizado.tsv rango_edad,genero,profesion_categoria,zona
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from clasificacion import COVARIABLES, RANGOS_EDAD, decodificar_voto
+from inferencia import ARCHIVOS, ajustar_theta_lote, resultados_eleccion, theta_desde_csv
+from padron import PREFIJO_VOTO
+from resultados import ResultadosMesa
+
+FUERZA_PREVIA = 20.0  # votos de pseudo-conteo por celda
+DENSA_HASTA = 100_000  # mesas × celdas: por encima, el EM denso pierde aunque N esté llena
+DENSIDAD_DENSA = 0.15  # fracción de entradas no nulas desde la que el EM denso le gana al CSR
+
+
+# ========================
+#  CELDAS
+# ========================
+def celdas_electores(df: pd.DataFrame, covariables: list[str]) -> tuple[np.ndarray, list[pd.Index]]:
+  """
+  Código de celda de cada elector (-1 si le falta alguna covariable) y
+  las categorías de cada covariable. El código numera el producto
+  cartesiano de las categorías, en orden.
+  """
+  codigo = np.zeros(len(df), dtype=np.int64)
+  validos = np.ones(len(df), dtype=bool)
+  categorias = []
+  for nombre in covariables:
+    serie = COVARIABLES[nombre](df).astype("category")
+    codigos = serie.cat.codes.to_numpy()
+    codigo = codigo * len(serie.cat.categories) + codigos
+    validos &= codigos >= 0
+    categorias.append(serie.cat.categories)
+  return np.where(validos, codigo, -1), categorias
+
+
+def matriz_diseno_celdas(
+  df: pd.DataFrame,
+  eleccion: str,
+  resultados: ResultadosMesa,
+  covariables: list[str],
+  solo_votantes: bool = True,
+) -> tuple[sp.csr_matrix, pd.DataFrame]:
+  """
+  Matriz dispersa mesa × celda (CSR, en el orden de las mesas de
+  `resultados`) y las etiquetas de sus columnas, una fila por celda.
+  Solo quedan las celdas con alguien contado. Con `solo_votantes`, igual
+  que en `resultados.PadronPorMesa.diseno`: en las mesas con padrón de
+  mesa se cuentan solo quienes votaron.
+  """
+  mesa = pd.to_numeric(df["mesa"], errors="coerce").to_numpy(dtype="float64", na_value=-1).astype(np.int64)
+  fila = resultados.filas(mesa)
+  celda, categorias = celdas_electores(df, covariables)
+
+  columna = f"{PREFIJO_VOTO}{eleccion}"
+  voto = decodificar_voto(df[columna]) if columna in df.columns else np.full(len(df), -1, dtype=np.int8)
+  contado = (fila >= 0) & (celda >= 0)
+  if solo_votantes:
+    M = len(resultados.mesas)
+    con_padron = np.bincount(fila[fila >= 0], weights=voto[fila >= 0] >= 0, minlength=M) > 0
+    contado &= ~con_padron[np.maximum(fila, 0)] | (voto == 1)
+
+  usadas, columnas = np.unique(celda[contado], return_inverse=True)
+  N = sp.csr_matrix(
+    (np.ones(contado.sum()), (fila[contado], columnas)),
+    shape=(len(resultados.mesas), len(usadas)),
+  )
+  # Etiquetas solo de las celdas usadas, no de todo el producto cartesiano
+  posiciones = np.unravel_index(usadas, [len(c) for c in categorias])
+  etiquetas = pd.DataFrame({nombre: c[p] for nombre, c, p in zip(covariables, categorias, posiciones)})
+  return N, etiquetas
+
+
+def previa_por_franja(etiquetas: pd.DataFrame, theta_franja: np.ndarray) -> np.ndarray:
+  """θ de la franja etaria de cada celda (o el promedio si la celda no la incluye)."""
+  if "rango_edad" not in etiquetas.columns:
+    return np.repeat(theta_franja.mean(axis=0, keepdims=True), len(etiquetas), axis=0)
+  franja = pd.Categorical(etiquetas["rango_edad"], categories=RANGOS_EDAD).codes
+  if (franja < 0).any():
+    desconocidas = sorted(set(etiquetas["rango_edad"][franja < 0].astype(str)))
+    raise ValueError(f"Franjas etarias desconocidas: {desconocidas} (se esperaban {RANGOS_EDAD})")
+  return theta_franja[franja]
+
+
+# ========================
+#  AJUSTE
+# ========================
+def conviene_densa(N) -> bool:
+  """
+  Si conviene densificar N antes del EM: problema chico (DENSA_HASTA) y
+  con al menos DENSIDAD_DENSA de entradas no nulas. Con el padrón real
+  (~200 mesas × ~250 celdas, un tercio no nulas) se densifica.
+  """
+  M, C = N.shape
+  return sp.issparse(N) and M * C <= DENSA_HASTA and N.nnz >= DENSIDAD_DENSA * M * C
+
+
+def ajustar_theta_celdas(N, V: np.ndarray, previa: np.ndarray, fuerza: float = FUERZA_PREVIA, max_iter: int = 5000, tol: float = 1e-7) -> np.ndarray:
+  """
+  θ (C × P) por celda con la previa de Dirichlet `fuerza` · `previa`.
+  N (M × C) puede ser densa o dispersa; se arranca desde la previa.
+  Una N dispersa chica y llena se densifica (`conviene_densa`): ahí los
+  productos densos le ganan al CSR. Ambos caminos dan el mismo θ.
+  """
+  if conviene_densa(N):
+    N = N.toarray()
+  pesos = np.ones((1, N.shape[0]))
+  return ajustar_theta_lote(N, V, pesos, theta0=previa, max_iter=max_iter, tol=tol, previa=fuerza * previa)[0]
+
+
+def estimar_theta_celdas(df: pd.DataFrame, eleccion: str, covariables: list[str], fuerza: float = FUERZA_PREVIA) -> pd.DataFrame:
+  """
+  θ por celda de `covariables` para una elección de `ARCHIVOS`: una fila
+  por celda con las covariables, la cantidad de personas contadas y una
+  columna por partido.
+  """
+  theta_franja, partidos = theta_desde_csv(ARCHIVOS[eleccion]["theta"])
+  resultados = resultados_eleccion(eleccion, partidos)
+  N, etiquetas = matriz_diseno_celdas(df, eleccion, resultados, covariables)
+  theta = ajustar_theta_celdas(N, resultados.votos, previa_por_franja(etiquetas, theta_franja), fuerza)
+
+  salida = etiquetas.copy()
+  salida["personas"] = np.asarray(N.sum(axis=0)).ravel().astype(np.int64)
+  salida[partidos] = theta
+  return salida
+
+
+if __name__ == "__main__":
+  from padron import leer_padron_tsv
+
+  eleccion, ruta_padron = sys.argv[1], sys.argv[2]
+  covariables = sys.argv[3].split(",") if len(sys.argv) > 3 else list(COVARIABLES)
+  df_theta = estimar_theta_celdas(leer_padron_tsv(ruta_padron), eleccion, covariables)
+  df_theta.to_csv(ARCHIVOS[eleccion]["theta_celdas"], index=False)
+  print(f"θ de {len(df_theta)} celdas guardado en {ARCHIVOS[eleccion]['theta_celdas']}")
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from agregados import obtener_derivadas
+from clasificacion import decodificar_voto
+from padron import version_padron
+
+# ===============================================================
+# Binning hexagonal de electores (del lado del servidor)
+#
+# En lugar de mandar decenas de miles de puntos al navegador, se
+# agrupan en hexágonos con NumPy y se envía un registro por hexágono
+# con la cantidad de electores y la participación conocida.
+# ===============================================================
+
+METROS_POR_GRADO_LAT = 110_540
+METROS_POR_GRADO_LON = 111_320  # en el ecuador; se corrige por cos(lat)
+RAIZ_3 = np.sqrt(3)
+
+
+def _redondear_hex(q: np.ndarray, r: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+  # Redondeo en coordenadas cúbicas (x + y + z = 0) a la celda más cercana
+  x, z = q, r
+  y = -x - z
+  rx, ry, rz = np.round(x), np.round(y), np.round(z)
+  dx, dy, dz = np.abs(rx - x), np.abs(ry - y), np.abs(rz - z)
+  corregir_x = (dx > dy) & (dx > dz)
+  corregir_z = ~corregir_x & (dz >= dy)
+  rx = np.where(corregir_x, -ry - rz, rx)
+  rz = np.where(corregir_z, -rx - ry, rz)
+  return rx.astype(np.int64), rz.astype(np.int64)
+
+
+def binear_hexagonos(lon, lat, voto: np.ndarray, radio_m: float) -> pd.DataFrame:
+  """
+  Agrupa puntos en hexágonos (punta arriba) de `radio_m` metros.
+
+  `voto` es el estado decodificado (1 votó, 0 no votó, -1 sin información).
+  Devuelve una fila por hexágono no vacío con su centro (lon, lat),
+  `electores`, `con_informacion`, `votaron` y `participacion` (NaN si
+  no hay nadie con información en el hexágono).
+  """
+  lon = np.asarray(lon, dtype="float64")
+  lat = np.asarray(lat, dtype="float64")
+  validos = np.isfinite(lon) & np.isfinite(lat)
+  lon, lat, voto = lon[validos], lat[validos], np.asarray(voto)[validos]
+  if len(lon) == 0:
+    return pd.DataFrame(columns=["lon", "lat", "electores", "con_informacion", "votaron", "participacion"])
+
+  # Proyección equirectangular local (suficiente a escala de ciudad)
+  lat0 = np.deg2rad(lat.mean())
+  escala_x = METROS_POR_GRADO_LON * np.cos(lat0)
+  x = lon * escala_x / radio_m
+  y = lat * METROS_POR_GRADO_LAT / radio_m
+
+  q, r = _redondear_hex((RAIZ_3 / 3) * x - y / 3, (2 / 3) * y)
+
+  # (q, r) → un entero por celda para agrupar con un único np.unique
+  q_min, r_min = q.min(), r.min()
+  ancho = r.max() - r_min + 1
+  claves, inverso = np.unique((q - q_min) * ancho + (r - r_min), return_inverse=True)
+  celda_q, celda_r = np.divmod(claves, ancho)
+  celda_q, celda_r = celda_q + q_min, celda_r + r_min
+  cantidad = len(claves)
+  electores = np.bincount(inverso, minlength=cantidad)
+  con_informacion = np.bincount(inverso, weights=(voto >= 0), minlength=cantidad).astype(np.int64)
+  votaron = np.bincount(inverso, weights=(voto == 1), minlength=cantidad).astype(np.int64)
+
+  centro_x = RAIZ_3 * (celda_q + celda_r / 2)
+  centro_y = 1.5 * celda_r
+  with np.errstate(invalid="ignore", divide="ignore"):
+    participacion = np.where(con_informacion > 0, votaron / con_informacion, np.nan)
+
+  return pd.DataFrame({
+    "lon": centro_x * radio_m / escala_x,
+    "lat": centro_y * radio_m / METROS_POR_GRADO_LAT,
+    "electores": electores,
+    "con_informacion": con_informacion,
+    "votaron": votaron,
+    "participacion": participacion,
+  })
+
+
+def color_participacion(participacion: np.ndarray, alfa: int = 170) -> list:
+  """Rojo (0%) → verde (100%); gris si no hay información."""
+  p = np.asarray(participacion, dtype="float64")
+  rojo, verde = np.array([231, 76, 60]), np.array([46, 204, 113])
+  colores = rojo + np.nan_to_num(p)[:, None] * (verde - rojo)
+  colores = np.where(np.isnan(p)[:, None], 180, colores)
+  return np.column_stack([colores, np.full(len(p), alfa)]).astype(int).tolist()
+
+
+@st.cache_data(show_spinner="Agrupando electores en hexágonos...")
+def _hexagonos_cacheados(version: str, eleccion: str, radio_m: float, rango: str | None, _df: pd.DataFrame) -> pd.DataFrame:
+  lon, lat = _df["lon"].to_numpy(), _df["lat"].to_numpy()
+  voto = decodificar_voto(_df[f"voto_{eleccion}"])
+  if rango is not None:
+    # Rango etario ya clasificado y compartido: se filtra con una máscara
+    filtro = (obtener_derivadas(_df)["rango_edad"] == rango).to_numpy()
+    lon, lat, voto = lon[filtro], lat[filtro], voto[filtro]
+  hexagonos = binear_hexagonos(lon, lat, voto, radio_m)
+  hexagonos["color"] = color_participacion(hexagonos["participacion"].to_numpy())
+  return hexagonos
+
+
+def obtener_hexagonos(df: pd.DataFrame, eleccion: str, radio_m: float, rango: str | None = None) -> pd.DataFrame:
+  """Hexágonos cacheados por versión de datos, elección, tamaño y filtro."""
+  return _hexagonos_cacheados(version_padron(df), eleccion, radio_m, rango, df)
@@ -0,0 +1,75 @@
+import json
+import threading
+from collections import OrderedDict
+
+import plotly.graph_objects as go
+import streamlit as st
+
+# ===============================================================
+# Cache de figuras de Plotly
+#
+# Armar una figura con plotly.express (validación de cada propiedad
+# incluida) cuesta decenas de ms; reconstruirla desde su JSON sin
+# validar, ~1 ms. Acá se guarda el JSON de cada figura, indexado por
+# (nombre, versión de los datos, parámetros), con desalojo LRU y
+# contadores de aciertos/fallos. La cache es una sola por proceso y
+# la comparten todas las sesiones.
+# ===============================================================
+
+MAXIMO_FIGURAS = 128
+
+
+class CacheFiguras:
+  """LRU acotado de figuras serializadas (JSON), seguro entre hilos."""
+
+  def __init__(self, maximo: int = MAXIMO_FIGURAS):
+    self.maximo = maximo
+    self.aciertos = 0
+    self.fallos = 0
+    self._figuras = OrderedDict()
+    self._lock = threading.Lock()
+
+  def obtener(self, clave, construir) -> str:
+    """JSON de la figura de `clave`; si no está, la arma con `construir()`."""
+    with self._lock:
+      if clave in self._figuras:
+        self._figuras.move_to_end(clave)
+        self.aciertos += 1
+        return self._figuras[clave]
+      self.fallos += 1
+
+    # Se arma fuera del lock: otra sesión puede estar leyendo mientras tanto
+    texto = construir().to_json(validate=False)
+    with self._lock:
+      self._figuras[clave] = texto
+      self._figuras.move_to_end(clave)
+      while len(self._figuras) > self.maximo:
+        self._figuras.popitem(last=False)
+    return texto
+
+  def estadisticas(self) -> dict:
+    with self._lock:
+      return {"figuras": len(self._figuras), "maximo": self.maximo, "aciertos": self.aciertos, "fallos": self.fallos}
+
+  def limpiar(self):
+    with self._lock:
+      self._figuras.clear()
+
+
+@st.cache_resource
+def obtener_cache_figuras() -> CacheFiguras:
+  return CacheFiguras()
+
+
+def figura_cacheada(nombre: str, version: str, construir, *parametros) -> go.Figure:
+  """
+  Figura cacheada por (nombre, version, parametros); `construir()` la
+  arma solo si no está en la cache.
+
+  `version` identifica los datos de entrada (p. ej. `version_padron(df)`
+  o la versión de un archivo) y `parametros` el estado de los widgets
+  que la afectan (deben ser hasheables). Devuelve siempre una figura
+  nueva, que se puede modificar sin tocar la cache.
+  """
+  texto = obtener_cache_figuras().obtener((nombre, version, parametros), construir)
+  return go.Figure(json.loads(texto), _validate=False)
@@ -0,0 +1,129 @@
+"""
+Reajuste incremental de θ cuando llegan mesas nuevas o corregidas.
+
+El EM de `inferencia` solo necesita, por mesa, su fila de la matriz de
+diseño (personas por franja) y su fila de votos por partido: eso es todo
+su estado. `EstadoTheta` guarda esas filas junto con el último θ en un
+.npz. Con un escrutinio o un padrón de mesa nuevo:
+
+- se comparan las filas con las guardadas y se detectan las mesas
+  nuevas, corregidas o quitadas;
+- θ se reajusta arrancando del θ anterior (o de theta_estimates.csv la
+  primera vez), que ya está cerca: converge en pocas iteraciones;
+- en el bootstrap solo se rehacen las réplicas que les dan peso a esas
+  mesas, cada una desde su θ anterior (`bootstrap.actualizar_bootstrap_lote`),
+  si las réplicas guardadas son del motor en lote, con la misma semilla
+  y sobre las mesas del estado; si no, se corren todas de nuevo.
+
+Uso por línea de comandos (después de sumar padrones de mesa o escrutinio):
+  python incremental.py octubre ./data/padron_con_voto_geolocalizado.tsv
+"""
+import os
+import sys
+
+import numpy as np
+
+from inferencia import ajustar_theta_lote
+
+
+class EstadoTheta:
+  """Filas de N y V por mesa (mesas ordenadas) y el θ ajustado con ellas."""
+
+  def __init__(self, mesas, N: np.ndarray, V: np.ndarray, theta: np.ndarray, partidos):
+    self.mesas = np.asarray(mesas, dtype=np.int64)
+    self.N = np.asarray(N, dtype="float64")
+    self.V = np.asarray(V, dtype="float64")
+    self.theta = np.asarray(theta, dtype="float64")
+    self.partidos = list(partidos)
+
+  @classmethod
+  def vacio(cls, G: int, partidos, theta0: np.ndarray | None = None) -> "EstadoTheta":
+    """Sin mesas; `theta0` (p. ej. el de theta_estimates.csv) es el punto de partida."""
+    P = len(partidos)
+    theta = np.full((G, P), 1 / P) if theta0 is None else theta0
+    return cls([], np.zeros((0, G)), np.zeros((0, P)), theta, partidos)
+
+  # ------------------------
+  #  Persistencia
+  # ------------------------
+  @classmethod
+  def cargar(cls, ruta: str) -> "EstadoTheta | None":
+    if not os.path.exists(ruta):
+      return None
+    with np.load(ruta) as datos:
+      return cls(datos["mesas"], datos["N"], datos["V"], datos["theta"], datos["partidos"].tolist())
+
+  def guardar(self, ruta: str):
+    """Escribe el .npz de forma atómica."""
+    os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+    tmp = ruta + ".tmp.npz"
+    np.savez(tmp, mesas=self.mesas, N=self.N, V=self.V, theta=self.theta, partidos=np.array(self.partidos))
+    os.replace(tmp, ruta)
+
+  # ------------------------
+  #  Actualización
+  # ------------------------
+  def mesas_cambiadas(self, mesas, N: np.ndarray, V: np.ndarray) -> np.ndarray:
+    """
+    Mesas nuevas, quitadas o con alguna fila de N o V distinta a la
+    guardada. Si cambió la cantidad de franjas o de partidos, todas.
+    """
+    mesas = np.asarray(mesas, dtype=np.int64)
+    if N.shape[1] != self.N.shape[1] or V.shape[1] != self.V.shape[1]:
+      return np.union1d(mesas, self.mesas)
+    comunes, i_nuevo, i_viejo = np.intersect1d(mesas, self.mesas, return_indices=True)
+    distintas = (N[i_nuevo] != self.N[i_viejo]).any(axis=1) | (V[i_nuevo] != self.V[i_viejo]).any(axis=1)
+    return np.union1d(np.setxor1d(mesas, self.mesas), comunes[distintas])
+
+  def actualizar(self, mesas, N: np.ndarray, V: np.ndarray, tol: float = 1e-9) -> np.ndarray:
+    """
+    Reemplaza las mesas por `mesas` (con sus filas de N y V), reajusta θ
+    desde el θ actual si algo cambió y devuelve las mesas cambiadas.
+    """
+    N = np.asarray(N, dtype="float64")
+    V = np.asarray(V, dtype="float64")
+    cambiadas = self.mesas_cambiadas(mesas, N, V)
+    if len(cambiadas) == 0:
+      return cambiadas
+
+    orden = np.argsort(np.asarray(mesas, dtype=np.int64), kind="stable")
+    self.mesas, self.N, self.V = np.asarray(mesas, dtype=np.int64)[orden], N[orden], V[orden]
+    # Con otras franjas o partidos el θ anterior no sirve de punto de partida
+    theta0 = self.theta if self.theta.shape == (N.shape[1], V.shape[1]) else None
+    self.theta = ajustar_theta_lote(self.N, self.V, np.ones((1, len(self.mesas))), theta0=theta0, tol=tol)[0]
+    return cambiadas
+
+
+if __name__ == "__main__":
+  from bootstrap import actualizar_bootstrap_lote, firma_datos, resumir_bootstrap
+  from inferencia import ARCHIVOS, GRUPOS_EDAD, theta_a_dataframe, theta_desde_csv, unir_eleccion
+  from padron import leer_padron_tsv
+
+  eleccion, ruta_padron = sys.argv[1], sys.argv[2]
+  archivos = ARCHIVOS[eleccion]
+  unidas = unir_eleccion(leer_padron_tsv(ruta_padron), eleccion)
+
+  estado = EstadoTheta.cargar(archivos["estado"])
+  if estado is None or estado.partidos != unidas.partidos:
+    # Primera vez (o cambiaron los partidos): se parte del último θ guardado
+    theta0 = None
+    if os.path.exists(archivos["theta"]):
+      theta_csv, partidos_csv = theta_desde_csv(archivos["theta"])
+      theta0 = theta_csv if partidos_csv == unidas.partidos else None
+    estado = EstadoTheta.vacio(len(GRUPOS_EDAD), unidas.partidos, theta0)
+
+  firma_previa = firma_datos(estado.mesas, estado.N, estado.V)
+  cambiadas = estado.actualizar(unidas.mesas, unidas.diseno(), unidas.V)
+  if len(cambiadas) == 0:
+    print("Sin mesas nuevas ni corregidas")
+    sys.exit()
+
+  theta_a_dataframe(estado.theta, estado.partidos).to_csv(archivos["theta"], index=False)
+  print(f"{len(cambiadas)} mesas nuevas o corregidas, θ guardado en {archivos['theta']}")
+  if os.path.exists(archivos["muestras"]):
+    thetas_boot, rehechas = actualizar_bootstrap_lote(
+      estado.N, estado.V, estado.mesas, cambiadas, archivos["muestras"], firma_previa, theta0=estado.theta,
+    )
+    resumir_bootstrap(thetas_boot, estado.partidos).to_csv(archivos["bootstrap"], index=False)
+    print(f"{rehechas} de {len(thetas_boot)} réplicas recalculadas, resumen en {archivos['bootstrap']}")
+  estado.guardar(archivos["estado"])
@@ -0,0 +1,228 @@
+"""
+Estimación de θ = P(partido | franja etaria) por inferencia ecológica.
+
+Por mesa conocemos cuántos votos sacó cada partido (escrutinio) y la
+composición etaria de quienes votaron (padrones de mesa) o, si el padrón
+de esa mesa no apareció, de todos sus electores. θ se ajusta con un EM
+multiplicativo vectorizado: cada fila de θ queda siempre en el simplex
+(probabilidades ≥ 0 que suman 1).
+
+Uso por línea de comandos (regenera los CSV que grafica InferirVotantes04):
+  python inferencia.py octubre ./data/padron_con_voto_geolocalizado.tsv
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from clasificacion import BORDES_EDAD
+from resultados import MesasUnidas, ResultadosMesa, obtener_padron_por_mesa, unir
+
+EDAD_MAXIMA = 200
+
+# Una entrada por elección: sumar una elección nueva es agregar sus archivos acá
+ARCHIVOS = {
+  "septiembre": {
+    "titulo": "Septiembre",
+    "theta": "data/septiembre/theta_estimates.csv",
+    "bootstrap": "data/septiembre/theta_bootstrap_summary.csv",
+    "muestras": "data/septiembre/theta_bootstrap.npy",
+    "resultados": "data/septiembre/resultados_mesa.tsv",
+    "puntajes": "data/septiembre/propension.npy",
+    "theta_celdas": "data/septiembre/theta_celdas.csv",
+    "estado": "data/septiembre/theta_estado.npz",
+  },
+  "octubre": {
+    "titulo": "Octubre",
+    "theta": "data/theta_estimates.csv",
+    "bootstrap": "data/theta_bootstrap_summary.csv",
+    "muestras": "data/theta_bootstrap.npy",
+    "resultados": "data/resultados_mesa.tsv",
+    "puntajes": "data/propension.npy",
+    "theta_celdas": "data/theta_celdas.csv",
+    "estado": "data/theta_estado.npz",
+  },
+}
+
+
+def etiquetas_theta(bordes=BORDES_EDAD) -> list[str]:
+  """Franjas con el formato de los CSV de θ: "(16, 24)", ..., "(61, 200)"."""
+  limites = list(bordes[1:]) + [EDAD_MAXIMA + 1]
+  return [f"({a}, {b - 1})" for a, b in zip(bordes, limites)]
+
+
+GRUPOS_EDAD = etiquetas_theta()
+
+
+def version_archivo(ruta: str) -> str:
+  """Fecha de modificación y tamaño: cambia cuando se regenera el archivo."""
+  if not os.path.exists(ruta):
+    return ""
+  estado = os.stat(ruta)
+  return f"{estado.st_mtime_ns}-{estado.st_size}"
+
+
+# ========================
+#  DATOS DE ENTRADA
+# ========================
+def matriz_diseno(df: pd.DataFrame, eleccion: str, mesas, solo_votantes: bool = True) -> np.ndarray:
+  """
+  Matriz mesa × franja etaria (M × G) con la cantidad de personas, en el
+  orden de `mesas` (ver `resultados.PadronPorMesa.diseno`).
+  """
+  return obtener_padron_por_mesa(df, eleccion).diseno(solo_votantes, mesas)
+
+
+# ========================
+#  AJUSTE (EM)
+# ========================
+def _normalizar_filas(theta: np.ndarray) -> np.ndarray:
+  total = theta.sum(axis=-1, keepdims=True)
+  return np.divide(theta, total, out=np.full_like(theta, 1 / theta.shape[-1]), where=total > 0)
+
+
+def _escalar_mesas(N: np.ndarray, V: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+  # Escalar cada mesa para que votantes y votos emitidos sumen lo mismo
+  V = np.asarray(V, dtype="float64")
+  if hasattr(N, "tocsr"):
+    # scipy.sparse: se escalan las filas sin densificar
+    N = N.tocsr().astype("float64")
+    total_n = np.asarray(N.sum(axis=1)).ravel()
+    factor = np.divide(V.sum(axis=1), total_n, out=np.zeros_like(total_n), where=total_n > 0)
+    return N.multiply(factor[:, None]).tocsr(), V
+  N = np.asarray(N, dtype="float64")
+  total_n = N.sum(axis=1, keepdims=True)
+  return np.divide(N * V.sum(axis=1, keepdims=True), total_n, out=np.zeros_like(N), where=total_n > 0), V
+
+
+def ajustar_theta(N: np.ndarray, V: np.ndarray, theta0: np.ndarray | None = None, max_iter: int = 5000, tol: float = 1e-9) -> np.ndarray:
+  """
+  Ajusta θ (G × P) tal que los votos esperados N @ θ reproduzcan V (M × P).
+
+  Cada iteración reparte los votos de cada mesa entre franjas en
+  proporción a N[m, g]·θ[g, p] (paso E) y re-normaliza (paso M):
+    θ ← normalizar(θ ∘ Nᵀ (V / (N θ)))
+  Todo son productos de matrices, sin bucles por mesa.
+  """
+  N, V = _escalar_mesas(N, V)
+  G, P = N.shape[1], V.shape[1]
+  theta = np.full((G, P), 1 / P) if theta0 is None else _normalizar_filas(np.asarray(theta0, dtype="float64"))
+
+  for _ in range(max_iter):
+    esperado = N @ theta
+    razon = np.divide(V, esperado, out=np.zeros_like(V), where=esperado > 0)
+    nuevo = _normalizar_filas(theta * (N.T @ razon))
+    if np.abs(nuevo - theta).max() < tol:
+      return nuevo
+    theta = nuevo
+  return theta
+
+
+def _paso_em_lote(N: np.ndarray, V_pesado: np.ndarray, theta: np.ndarray, previa=0) -> np.ndarray:
+  # θ en disposición G × b × P para que los productos sean una sola matriz
+  (M, G), (b, P) = N.shape, theta.shape[1:]
+  razon = np.asarray(N @ theta.reshape(G, -1)).reshape(M, b, P)
+  np.maximum(razon, np.finfo("float64").tiny, out=razon)
+  np.divide(V_pesado, razon, out=razon)
+  nuevo = theta * np.asarray(N.T @ razon.reshape(M, -1)).reshape(G, b, P) + previa
+  return nuevo / nuevo.sum(axis=2, keepdims=True)
+
+
+def ajustar_theta_lote(N: np.ndarray, V: np.ndarray, pesos: np.ndarray, theta0: np.ndarray | None = None, max_iter: int = 2000, tol: float = 1e-9, previa: np.ndarray | None = None) -> np.ndarray:
+  """
+  Ajusta B problemas a la vez, uno por fila de `pesos` (B × M): en el
+  problema b la mesa m cuenta pesos[b, m] veces. Devuelve B × G × P.
+
+  Es el mismo EM que `ajustar_theta`, con los θ apilados y los productos
+  de matrices hechos en lote. Cada ciclo da dos pasos de EM, extrapola
+  (SQUAREM) y estabiliza con un tercer paso; si la extrapolación se sale
+  del simplex se usa el segundo paso sin extrapolar. El EM solo converge
+  muy lento cuando algún θ tiende a 0, y esto le ahorra la mayoría de las
+  iteraciones. Cada réplica deja de iterar cuando converge.
+
+  `theta0` es el punto de partida: G × P para todas las réplicas o
+  B × G × P, uno por réplica (p. ej. las réplicas anteriores al
+  reajustar con mesas nuevas). N puede ser una matriz dispersa de
+  scipy.sparse (no se densifica).
+  `previa` (G × P, en votos) se suma a los conteos esperados de cada paso
+  M: es una previa de Dirichlet que estabiliza las filas de θ con pocos
+  votos (ver `covariables`).
+  """
+  N, V = _escalar_mesas(N, V)
+  pesos = np.asarray(pesos, dtype="float64")
+  G, P = N.shape[1], V.shape[1]
+  inicial = np.full((G, P), 1 / P) if theta0 is None else _normalizar_filas(np.asarray(theta0, dtype="float64"))
+  if inicial.ndim == 3:
+    theta = np.ascontiguousarray(inicial.transpose(1, 0, 2))
+  else:
+    theta = np.repeat(inicial[:, None, :], len(pesos), axis=1)
+  previa = 0 if previa is None else np.asarray(previa, dtype="float64")[:, None, :]
+
+  activos = np.arange(len(pesos))
+  V_pesado = np.ascontiguousarray(V[:, None, :] * pesos.T[:, :, None])  # M × b × P
+  for _ in range(max_iter):
+    actual = theta[:, activos]
+    paso1 = _paso_em_lote(N, V_pesado, actual, previa)
+    paso2 = _paso_em_lote(N, V_pesado, paso1, previa)
+    r, v = paso1 - actual, paso2 - 2 * paso1 + actual
+    alfa = -np.sqrt((r ** 2).sum(axis=(0, 2)) / np.maximum((v ** 2).sum(axis=(0, 2)), np.finfo("float64").tiny))
+    alfa = np.minimum(alfa, -1)[None, :, None]
+    extrapolado = actual - 2 * alfa * r + alfa ** 2 * v
+    fuera = (extrapolado < 0).any(axis=(0, 2))
+    extrapolado[:, fuera] = paso2[:, fuera]
+
+    nuevo = _paso_em_lote(N, V_pesado, extrapolado, previa)
+    theta[:, activos] = nuevo
+    sigue = np.abs(nuevo - actual).max(axis=(0, 2)) >= tol
+    if not sigue.all():
+      activos = activos[sigue]
+      V_pesado = np.ascontiguousarray(V_pesado[:, sigue])
+    if len(activos) == 0:
+      break
+  return theta.transpose(1, 0, 2)
+
+
+# ========================
+#  SALIDA
+# ========================
+def theta_a_dataframe(theta: np.ndarray, partidos, grupos=GRUPOS_EDAD) -> pd.DataFrame:
+  """Mismo formato que theta_estimates.csv (una fila por franja etaria)."""
+  df_theta = pd.DataFrame(theta, columns=list(partidos))
+  df_theta.insert(0, "age_group", list(grupos))
+  return df_theta
+
+
+def theta_desde_csv(ruta: str) -> tuple[np.ndarray, list[str]]:
+  """Inversa de `theta_a_dataframe`: θ (G × P) y los nombres de los partidos."""
+  df_theta = pd.read_csv(ruta).drop(columns="age_group")
+  return df_theta.to_numpy(dtype="float64"), list(df_theta.columns)
+
+
+def estimar_theta(mesas: MesasUnidas, theta0: np.ndarray | None = None) -> pd.DataFrame:
+  """θ por franja etaria y partido a partir del escrutinio unido al padrón por mesa."""
+  theta = ajustar_theta(mesas.diseno(), mesas.V, theta0=theta0)
+  return theta_a_dataframe(theta, mesas.partidos)
+
+
+def resultados_eleccion(eleccion: str, partidos: list[str]) -> ResultadosMesa:
+  """Escrutinio de `eleccion` con las columnas en el orden de `partidos` (vacío si no hay archivo)."""
+  ruta = ARCHIVOS[eleccion]["resultados"]
+  if not os.path.exists(ruta):
+    return ResultadosMesa([], partidos, np.zeros((0, len(partidos))))
+  resultados = ResultadosMesa.leer(ruta).a_dataframe().reindex(columns=partidos, fill_value=0)
+  return ResultadosMesa.desde_dataframe(resultados)
+
+
+def unir_eleccion(df: pd.DataFrame, eleccion: str) -> MesasUnidas:
+  """Escrutinio de `eleccion` (ver `ARCHIVOS`) unido a los agregados por mesa del padrón."""
+  return unir(ResultadosMesa.leer(ARCHIVOS[eleccion]["resultados"]), obtener_padron_por_mesa(df, eleccion))
+
+
+if __name__ == "__main__":
+  from padron import leer_padron_tsv
+
+  eleccion, ruta_padron = sys.argv[1], sys.argv[2]
+  df_theta = estimar_theta(unir_eleccion(leer_padron_tsv(ruta_padron), eleccion))
+  df_theta.to_csv(ARCHIVOS[eleccion]["theta"], index=False)
+  print(f"θ guardado en {ARCHIVOS[eleccion]['theta']}")
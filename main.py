@@ -1,58 +1,59 @@
+import importlib
+import logging
+
 import streamlit as st
-from supabase import create_client, Client
-import hashlib
-from io import StringIO
-import pandas as pd
+
+# La pantalla de login no importa nada pesado: pandas, plotly, pydeck,
+# shapely y el cliente de Supabase se cargan recién cuando se usan.
 
 # ========================
 #  SUPABASE CONNECTION
 # ========================
 @st.cache_resource
 def init_connection():
+  from supabase import create_client
+
   url = st.secrets["SUPABASE_URL"]
   key = st.secrets["SUPABASE_KEY"]
   return create_client(url, key)
 
-supabase = init_connection()
 
 SALT = st.secrets["SALT"]
 
 
-@st.cache_data(show_spinner="Cargando datos TSV...")
-def load_tsv_from_supabase(bucket: str, filename: str) -> pd.DataFrame:
+def load_tsv_from_supabase(bucket: str, filename: str):
   """
   Descarga un archivo .tsv desde Supabase Storage y lo convierte en DataFrame.
-  La función está cacheada mientras dure la sesión del usuario.
+  La descarga se parsea en streaming y queda en la cache columnar local
+  (por bucket/archivo/ETag): solo se vuelve a bajar si el archivo cambió.
   """
 
+  import pandas as pd
+
+  from padron import obtener_padron_storage
+
   try:
-    # Descargar archivo desde un bucket PRIVADO
-    response = supabase.storage.from_(bucket).download(filename)
-
-    # Convertir bytes → string
-    text_data = response.decode("utf-8")
-
-    # Leer TSV
-    df = pd.read_csv(
-      StringIO(text_data),
-      sep="\t",           # MUY IMPORTANTE PARA TSV
-      dtype=str,          # Previene errores por columnas mixtas
-      low_memory=False,   # Recomendado para archivos grandes
+    return obtener_padron_storage(
+      st.secrets["SUPABASE_URL"],
+      st.secrets["SUPABASE_KEY"],
+      bucket,
+      filename,
     )
 
-    return df
-
   except Exception as e:
     st.error(f"❌ Error al cargar TSV: {e}")
     return pd.DataFrame()
 
 
 # ========================
-#  HASH FUNCTION
+#  CONTRASEÑAS
 # ========================
-def hash_password(usuario: str, password: str) -> str:
-    texto = f"{usuario}{password}{SALT}"
-    return hashlib.sha256(texto.encode()).hexdigest()
+@st.cache_resource
+def obtener_pool_contrasenias():
+  from contrasenias import CONCURRENCIA, PoolContrasenias
+
+  # Tope de hashes scrypt simultáneos para todo el servidor
+  return PoolContrasenias(int(st.secrets.get("LOGIN_CONCURRENCIA", CONCURRENCIA)), salt_legado=SALT)
 
 
 # ========================
@@ -69,8 +70,53 @@ if "username" not in st.session_state:
 # ========================
 #  SUPABASE QUERIES
 # ========================
+@st.cache_resource
+def obtener_usuarios():
+  from autenticacion import BackendSupabase, CacheUsuarios
+
+  # Una cache por proceso: los logins simultáneos del mismo usuario
+  # comparten una sola consulta a Supabase
+  return CacheUsuarios(BackendSupabase(init_connection()))
+
+
 def run_query_login(usuario_input):
-    return supabase.table("users").select("id, name, password").eq("name", usuario_input).single().execute()
+    return obtener_usuarios().buscar_usuario(usuario_input)
+
+
+# ========================
+#  PÁGINAS
+# ========================
+# Nombre en el menú → (módulo, función, si recibe el padrón)
+PAGINAS = {
+  "Introduccion": ("Introduccion00", "pagina0", False),
+  "Análisis de Votantes": ("ElectoresConocidos01", "pagina1", True),
+  "Analisis de Edad": ("ElectoresPorEdad02", "pagina2", True),
+  "Analisis por Zona": ("ElectoresPorZonaConocidos03", "pagina3", True),
+  "Probabilidades": ("InferirVotantes04", "pagina4", False),
+  "Consultas cruzadas": ("ConsultasCruzadas05", "pagina5", True),
+  "Propensión por zona": ("PropensionZonas06", "pagina6", True),
+}
+
+
+def cargar_padron():
+  from padron import obtener_padron
+  from sincronizacion import obtener_padron_sincronizado
+
+  # df = load_tsv_from_supabase("padron", "padron/padron_con_voto_geolocalizado.tsv")
+  # files = supabase.storage.from_("padron").list()
+  # st.write(files)
+  df = obtener_padron()
+  if "PARTICIONES_BUCKET" in st.secrets:
+    # Votos de los padrones de mesa transcriptos, sincronizados por lotes
+    df = obtener_padron_sincronizado(
+      df,
+      st.secrets["SUPABASE_URL"],
+      st.secrets["SUPABASE_KEY"],
+      st.secrets["PARTICIONES_BUCKET"],
+      "mesas",
+      ("septiembre", "octubre"),
+    )
+  return df
 
 
 # ========================
@@ -92,16 +138,25 @@ with st.sidebar:
       #  CONSULTA A SUPABASE
       # ========================
       try:
-        response = run_query_login(usuario_input)
-        if response.data is None:
+        usuario = run_query_login(usuario_input)
+        if usuario is None:
           st.error("❌ Usuario no encontrado")
         else:
-          usuario_db = response.data["name"] # type: ignore
-          password_hash_db = response.data["password"] # type: ignore
+          usuario_db = usuario["name"]
+          password_hash_db = usuario["password"]
+
+          pool = obtener_pool_contrasenias()
 
-          password_hash_input = hash_password(usuario_input, contrasenia_input)
+          if pool.verificar(usuario_input, contrasenia_input, password_hash_db):
+            from contrasenias import necesita_actualizar
 
-          if password_hash_input == password_hash_db:
+            # Hash legado (SHA-256) o con parámetros viejos: se reemplaza.
+            # Si falla no se corta el ingreso, se reintenta la próxima vez.
+            if necesita_actualizar(password_hash_db):
+              try:
+                obtener_usuarios().actualizar_password(usuario_db, pool.hashear(contrasenia_input))
+              except Exception:
+                logging.getLogger(__name__).warning("No se pudo actualizar el hash de %s", usuario_db, exc_info=True)
             st.session_state["login"] = True
             st.session_state["username"] = usuario_db
             st.success("✅ Sesión iniciada correctamente")
@@ -119,10 +174,7 @@ with st.sidebar:
     st.success(f"Bienvienid@ **{st.session_state['username']}**")
 
     # Selector de página
-    st.session_state["pagina_actual"] = st.radio(
-      "📄 Navegación",
-      ["Introduccion", "Análisis de Votantes", "Analisis de Edad", "Analisis por Zona", "Probabilidades"],
-    )
+    st.session_state["pagina_actual"] = st.radio("📄 Navegación", list(PAGINAS))
 
     if st.button("Cerrar sesión"):
       st.session_state["login"] = False
@@ -130,40 +182,18 @@ with st.sidebar:
       st.rerun()
 
 
-# ========================
-# PÁGINAS COMO FUNCIONES
-# ========================
-
-from Introduccion00 import pagina0
-from ElectoresConocidos01 import pagina1
-from ElectoresPorEdad02 import pagina2
-from ElectoresPorZonaConocidos03 import pagina3
-from InferirVotantes04 import inferir_votantes_octubre, inferir_votantes_septiembre
-
-
 # ========================
 #  MAIN CONTENT
 # ========================
 if st.session_state["login"]:
-  pagina = st.session_state.get("pagina_actual", "Página 1")
-  # df = load_tsv_from_supabase("padron", "padron/padron_con_voto_geolocalizado.tsv")
-  # files = supabase.storage.from_("padron").list()
-  # st.write(files)
-  df = pd.read_csv("./data/padron_con_voto_geolocalizado.tsv", sep="\t")
-  if pagina == "Introduccion":
-    pagina0()
-  elif pagina == "Análisis de Votantes":
-    pagina1(df)
-  elif pagina == "Analisis de Edad":
-    pagina2(df)
-  elif pagina == "Analisis por Zona":
-    pagina3(df)
-  elif pagina == "Probabilidades":
-    inferir_votantes_septiembre()
-    st.markdown("---")
-    st.markdown("---")
-    st.markdown("---")
-    inferir_votantes_octubre()
+  pagina = st.session_state.get("pagina_actual", "Introduccion")
+  modulo, funcion, usa_padron = PAGINAS[pagina]
+  # El módulo de la página se importa la primera vez que se elige
+  mostrar = getattr(importlib.import_module(modulo), funcion)
+  if usa_padron:
+    mostrar(cargar_padron())
+  else:
+    mostrar()
 
 else:
   st.title("Bienvenido a QCP 🗳")
@@ -0,0 +1,242 @@
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from almacenamiento import abrir_objeto
+
+RUTA_PADRON = "./data/padron_con_voto_geolocalizado.tsv"
+DIRECTORIO_CACHE = "./data/cache"
+
+# Versiones que guarda cada cache compartida (cache_resource): la vigente y
+# la anterior, que siguen usando las sesiones hasta su próximo rerun. Cada
+# sincronización crea una versión nueva; sin tope se acumularían todas.
+VERSIONES_EN_CACHE = 2
+
+COLUMNAS_CATEGORICAS = ["zona", "poligono", "genero", "profesion"]
+PREFIJO_VOTO = "voto_"
+
+# Copy-on-write: una columna agregada o modificada en la copia superficial
+# que recibe cada página nunca escribe sobre el frame compartido ni obliga
+# a copiar el resto (en pandas 3 ya es el comportamiento por defecto).
+if int(pd.__version__.split(".")[0]) < 3:
+  pd.set_option("mode.copy_on_write", True)
+
+
+# ========================
+#  ESQUEMA
+# ========================
+def esquema_padron(columnas) -> dict:
+  """
+  Tipos reales de cada columna del padrón para aplicarlos durante el parseo:
+  categóricas para zona/poligono/genero/profesion, booleano nulable para los
+  votos (True / False / sin información) y enteros chicos para el año.
+  """
+  esquema = {}
+  for col in columnas:
+    if col in COLUMNAS_CATEGORICAS:
+      esquema[col] = "category"
+    elif col.startswith(PREFIJO_VOTO):
+      esquema[col] = "boolean"
+    elif col == "fecha_nacimiento":
+      esquema[col] = "Int16"
+    elif col in ("lat", "lon"):
+      esquema[col] = "float64"
+  return esquema
+
+
+def _limpiar_categorias(serie: pd.Series) -> pd.Series:
+  # Hace el strip sobre las categorías (pocas) y no sobre cada fila
+  nuevas = pd.Index(serie.cat.categories.astype(str).str.strip())
+  unicas = nuevas.unique()
+  if len(unicas) == len(nuevas):
+    return serie.cat.rename_categories(unicas)
+  mapa = unicas.get_indexer(nuevas)
+  codigos = serie.cat.codes.to_numpy()
+  codigos = np.where(codigos >= 0, mapa[codigos], -1)
+  return pd.Series(pd.Categorical.from_codes(codigos, unicas), index=serie.index, name=serie.name)
+
+
+def tipar_padron(df: pd.DataFrame) -> pd.DataFrame:
+  """Normaliza un padrón ya parseado con el esquema de `esquema_padron`."""
+  for col in COLUMNAS_CATEGORICAS:
+    if col in df.columns:
+      df[col] = _limpiar_categorias(df[col])
+  return df
+
+
+def leer_padron_tsv(fuente) -> pd.DataFrame:
+  """
+  Parsea un TSV de padrón (ruta o stream binario) aplicando el esquema real
+  en el mismo parseo, sin pasar por columnas `object` intermedias.
+
+  Con un stream (p. ej. la respuesta HTTP del storage) el parser consume
+  los bytes por bloques: nunca se arma el archivo completo en memoria.
+  """
+  if isinstance(fuente, (str, os.PathLike)):
+    with open(fuente, "rb") as f:
+      return leer_padron_tsv(f)
+
+  # El encabezado se lee aparte para conocer el esquema antes de parsear
+  columnas = fuente.readline().decode("utf-8-sig").rstrip("\r\n").split("\t")
+  df = pd.read_csv(
+    fuente,
+    sep="\t",
+    header=None,
+    names=columnas,
+    dtype=esquema_padron(columnas),
+    encoding="utf-8",
+  )
+  return tipar_padron(df)
+
+
+# ========================
+#  CACHE COLUMNAR
+# ========================
+def hash_archivo(ruta: str) -> str:
+  h = hashlib.sha1()
+  with open(ruta, "rb") as f:
+    for bloque in iter(lambda: f.read(1 << 20), b""):
+      h.update(bloque)
+  return h.hexdigest()
+
+
+def _rutas_cache(ruta: str, directorio: str) -> tuple[str, str]:
+  nombre = os.path.splitext(os.path.basename(ruta))[0]
+  return os.path.join(directorio, f"{nombre}.parquet"), os.path.join(directorio, f"{nombre}.json")
+
+
+def leer_meta(ruta_meta: str) -> dict:
+  try:
+    with open(ruta_meta) as f:
+      return json.load(f)
+  except (OSError, ValueError):
+    return {}
+
+
+def escribir_meta(ruta_meta: str, meta: dict):
+  tmp = ruta_meta + ".tmp"
+  with open(tmp, "w") as f:
+    json.dump(meta, f)
+  os.replace(tmp, ruta_meta)
+
+
+def escribir_parquet(df: pd.DataFrame, ruta_parquet: str):
+  """Escribe el parquet de forma atómica (otra sesión puede estar leyendo)."""
+  os.makedirs(os.path.dirname(ruta_parquet) or ".", exist_ok=True)
+  tmp = ruta_parquet + ".tmp"
+  df.to_parquet(tmp, engine="pyarrow", index=False)
+  os.replace(tmp, ruta_parquet)
+
+
+def preparar_cache(ruta: str = RUTA_PADRON, directorio: str = DIRECTORIO_CACHE) -> tuple[str, str]:
+  """
+  Convierte el TSV a parquet una sola vez y devuelve (ruta_parquet, version).
+
+  La cache se invalida por mtime/tamaño del TSV; si cambió el mtime pero no
+  el contenido (hash), se reutiliza el parquet existente.
+  """
+  ruta_parquet, ruta_meta = _rutas_cache(ruta, directorio)
+  stat = os.stat(ruta)
+  meta = leer_meta(ruta_meta)
+
+  if os.path.exists(ruta_parquet):
+    if meta.get("mtime_ns") == stat.st_mtime_ns and meta.get("tamanio") == stat.st_size:
+      return ruta_parquet, meta["version"]
+
+  version = hash_archivo(ruta)
+  if not (os.path.exists(ruta_parquet) and meta.get("version") == version):
+    escribir_parquet(leer_padron_tsv(ruta), ruta_parquet)
+
+  escribir_meta(ruta_meta, {"mtime_ns": stat.st_mtime_ns, "tamanio": stat.st_size, "version": version})
+  return ruta_parquet, version
+
+
+@st.cache_resource(show_spinner="Cargando padrón...", max_entries=VERSIONES_EN_CACHE)
+def _padron_compartido(ruta_parquet: str, version: str) -> pd.DataFrame:
+  # Un único DataFrame por versión, compartido entre sesiones y reruns
+  df = pd.read_parquet(ruta_parquet, engine="pyarrow")
+  df.attrs["version"] = version
+  return df
+
+
+def obtener_padron(ruta: str = RUTA_PADRON) -> pd.DataFrame:
+  """
+  Devuelve el padrón tipado desde la cache columnar.
+
+  Se entrega una copia superficial del frame compartido: con copy-on-write
+  las páginas pueden agregar columnas sin tocar el original y sin copiar
+  los datos. Las columnas derivadas (rango etario, estado de voto, ...)
+  no se agregan acá: están en `agregados.obtener_derivadas`, una vez por
+  versión para todas las sesiones.
+  """
+  ruta_parquet, version = preparar_cache(ruta)
+  return _padron_compartido(ruta_parquet, version).copy(deep=False)
+
+
+# ========================
+#  PADRÓN DESDE STORAGE
+# ========================
+def _rutas_cache_storage(bucket: str, ruta: str, directorio: str) -> tuple[str, str]:
+  base = os.path.join(directorio, "storage", bucket, os.path.splitext(ruta.lstrip("/"))[0])
+  return base + ".parquet", base + ".json"
+
+
+def descargar_padron(url: str, key: str, bucket: str, ruta: str, directorio: str = DIRECTORIO_CACHE) -> tuple[str, str]:
+  """
+  Descarga un TSV del storage directo a la cache columnar local y devuelve
+  (ruta_parquet, version).
+
+  La cache queda asociada a bucket/ruta/ETag: si el objeto no cambió, el
+  servidor responde 304 y se reutiliza el parquet sin descargar nada. Si
+  cambió, la respuesta se parsea en streaming con el esquema del padrón.
+  """
+  ruta_parquet, ruta_meta = _rutas_cache_storage(bucket, ruta, directorio)
+  meta = leer_meta(ruta_meta)
+  etag = meta.get("etag") if os.path.exists(ruta_parquet) else None
+
+  respuesta = abrir_objeto(url, key, bucket, ruta, etag)
+  if respuesta is None:
+    return ruta_parquet, meta["version"]
+
+  with respuesta:
+    etag_nuevo = respuesta.headers.get("ETag") or ""
+    if etag and etag_nuevo == etag:
+      # El servidor ignoró el If-None-Match pero el objeto es el mismo
+      return ruta_parquet, meta["version"]
+    df = leer_padron_tsv(respuesta)
+
+  # Sin ETag no hay forma de reconocer el contenido: se versiona por tiempo
+  firma = etag_nuevo or str(time.time_ns())
+  version = hashlib.sha1(f"{bucket}/{ruta}/{firma}".encode()).hexdigest()
+
+  escribir_parquet(df, ruta_parquet)
+  escribir_meta(ruta_meta, {"etag": etag_nuevo, "version": version})
+  return ruta_parquet, version
+
+
+@st.cache_data(ttl=300, show_spinner="Descargando padrón...")
+def _sincronizar_storage(url: str, key: str, bucket: str, ruta: str) -> tuple[str, str]:
+  # El GET condicional se hace como mucho una vez cada 5 minutos
+  return descargar_padron(url, key, bucket, ruta)
+
+
+def obtener_padron_storage(url: str, key: str, bucket: str, ruta: str) -> pd.DataFrame:
+  """Igual que `obtener_padron`, pero con el TSV alojado en Supabase Storage."""
+  ruta_parquet, version = _sincronizar_storage(url, key, bucket, ruta)
+  return _padron_compartido(ruta_parquet, version).copy(deep=False)
+
+
+def version_padron(df: pd.DataFrame) -> str:
+  """
+  Identificador de la versión de datos de un padrón, para usar como clave
+  de cache de todo lo que se derive de él. Los frames que vienen de la
+  cache columnar ya la traen; para el resto se calcula una sola vez.
+  """
+  if "version" not in df.attrs:
+    df.attrs["version"] = str(pd.util.hash_pandas_object(df, index=False).sum())
+  return df.attrs["version"]
@@ -0,0 +1,234 @@
+"""
+Participación imputada para los electores sin información de voto.
+
+De buena parte del padrón no se recuperó el padrón de mesa, así que no
+se sabe si votó. Con los electores conocidos se ajusta una regresión
+logística de P(votó | franja etaria, género, profesión, zona) y con
+ella se estiman los votantes entre los desconocidos.
+
+Todas las variables son categóricas, así que el ajuste no necesita
+electores: trabaja sobre las celdas del cubo de `agregados` (votaron /
+no votaron por combinación de variables), con Newton-Raphson sobre los
+conteos binomiales. Una penalización ridge chica (PENALIZACION) evita
+coeficientes infinitos en celdas donde votaron todos o nadie.
+
+La incertidumbre de los totales imputados combina:
+- la de los coeficientes (aproximación de Laplace: normal con la
+  inversa del hessiano, llevada al total por el método delta);
+- la de cada elector (votar o no es Bernoulli con su probabilidad).
+
+El modelo ajustado y las tablas imputadas se cachean por versión del
+padrón y elección.
+"""
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from agregados import obtener_cubo, obtener_derivadas
+from padron import VERSIONES_EN_CACHE, version_padron
+
+VARIABLES = ["rango_edad", "genero", "profesion_categoria", "zona"]
+SIN_DATO = "SIN DATO"
+PENALIZACION = 1.0  # ridge sobre los coeficientes (no sobre la ordenada)
+NIVEL = 0.95
+
+
+def _sigmoide(x: np.ndarray) -> np.ndarray:
+  return 1 / (1 + np.exp(-x))
+
+
+# ========================
+#  CELDAS
+# ========================
+def tabla_celdas(cubo: pd.DataFrame, eleccion: str) -> pd.DataFrame:
+  """
+  Una fila por combinación de VARIABLES con los electores que votaron,
+  que no votaron y sin información en `eleccion`.
+  """
+  parte = cubo[cubo["eleccion"] == eleccion]
+  tabla = parte.pivot_table(index=VARIABLES, columns="estado_voto", values="cantidad", aggfunc="sum", observed=True, dropna=False, fill_value=0)
+  tabla = tabla.reindex(columns=["Votó", "No votó", "Sin información"], fill_value=0)
+  tabla.columns = ["votaron", "no_votaron", "sin_informacion"]
+  return tabla[tabla.sum(axis=1) > 0].reset_index()
+
+
+# ========================
+#  MODELO
+# ========================
+class ModeloParticipacion:
+  """
+  Regresión logística sobre VARIABLES codificadas con una categoría de
+  referencia (la primera de cada una). `niveles` tiene las categorías
+  de cada variable; los coeficientes van en el orden ordenada, niveles
+  de la primera variable salvo la referencia, de la segunda, etc.
+  """
+
+  def __init__(self, niveles: dict[str, list], coeficientes: np.ndarray, covarianza: np.ndarray):
+    self.niveles = niveles
+    self.coeficientes = coeficientes
+    self.covarianza = covarianza
+
+  # ------------------------
+  #  Ajuste
+  # ------------------------
+  @classmethod
+  def ajustar(cls, tabla: pd.DataFrame, penalizacion: float = PENALIZACION, max_iter: int = 50, tol: float = 1e-8) -> "ModeloParticipacion":
+    """Ajusta el modelo con las celdas de `tabla_celdas` que tienen electores conocidos."""
+    conocidas = tabla[(tabla["votaron"] + tabla["no_votaron"]) > 0]
+    if conocidas.empty:
+      raise ValueError("No hay electores con información de voto para ajustar el modelo")
+    niveles = {v: sorted(pd.unique(_valores(conocidas[v]))) for v in VARIABLES}
+    modelo = cls(niveles, np.zeros(1 + sum(len(n) - 1 for n in niveles.values())), None)
+
+    X = modelo.diseno(conocidas)
+    votaron = conocidas["votaron"].to_numpy(dtype="float64")
+    total = votaron + conocidas["no_votaron"].to_numpy(dtype="float64")
+    penal = np.full(X.shape[1], penalizacion)
+    penal[0] = 0
+
+    beta = np.zeros(X.shape[1])
+    beta[0] = np.log(votaron.sum() / max(total.sum() - votaron.sum(), 1))
+    for _ in range(max_iter):
+      p = _sigmoide(X @ beta)
+      gradiente = X.T @ (votaron - total * p) - penal * beta
+      hessiano = (X * (total * p * (1 - p))[:, None]).T @ X + np.diag(penal)
+      paso = np.linalg.solve(hessiano, gradiente)
+      beta += paso
+      if np.abs(paso).max() < tol:
+        break
+
+    p = _sigmoide(X @ beta)
+    hessiano = (X * (total * p * (1 - p))[:, None]).T @ X + np.diag(penal)
+    modelo.coeficientes = beta
+    modelo.covarianza = np.linalg.inv(hessiano)
+    return modelo
+
+  # ------------------------
+  #  Predicción
+  # ------------------------
+  def _codigos(self, columnas) -> list[np.ndarray]:
+    """Código de nivel de cada fila por variable; lo no visto va a la referencia."""
+    codigos = []
+    for v in VARIABLES:
+      # Se traducen las categorías (pocas), no cada fila
+      serie = pd.Series(columnas[v]).astype("category")
+      traduccion = pd.Categorical(_valores(pd.Series(serie.cat.categories)), categories=self.niveles[v]).codes
+      sin_dato = self.niveles[v].index(SIN_DATO) if SIN_DATO in self.niveles[v] else 0
+      codigos.append(np.append(traduccion, sin_dato).astype(np.int64)[serie.cat.codes.to_numpy()])
+    return codigos
+
+  def diseno(self, columnas) -> np.ndarray:
+    """Matriz filas × coeficientes (ordenada + indicadoras) de `columnas`."""
+    codigos = self._codigos(columnas)
+    X = np.zeros((len(codigos[0]), len(self.coeficientes)))
+    X[:, 0] = 1
+    inicio = 1
+    for v, codigo in zip(VARIABLES, codigos):
+      filas = np.flatnonzero(codigo > 0)
+      X[filas, inicio + codigo[filas] - 1] = 1
+      inicio += len(self.niveles[v]) - 1
+    return X
+
+  def probabilidad(self, columnas) -> np.ndarray:
+    """
+    P(votó) de cada fila de `columnas` (DataFrame o dict con VARIABLES).
+    Suma el coeficiente de cada variable por búsqueda, sin armar la
+    matriz de diseño: sirve también para el padrón completo.
+    """
+    eta = np.full(len(columnas[VARIABLES[0]]), self.coeficientes[0])
+    inicio = 1
+    for v, codigo in zip(VARIABLES, self._codigos(columnas)):
+      fin = inicio + len(self.niveles[v]) - 1
+      efecto = np.concatenate([[0.0], self.coeficientes[inicio:fin]])
+      eta += efecto[np.maximum(codigo, 0)]
+      inicio = fin
+    return _sigmoide(eta)
+
+  def probabilidad_electores(self, df: pd.DataFrame) -> np.ndarray:
+    """P(votó) de cada elector del padrón, alineada con `df` (float32)."""
+    # Franja y profesión salen de las columnas derivadas compartidas, sin reclasificar
+    derivadas = obtener_derivadas(df)
+    columnas = {v: derivadas[v] if v in derivadas.columns else df[v] for v in VARIABLES}
+    return self.probabilidad(columnas).astype(np.float32)
+
+  def imputar(self, tabla: pd.DataFrame, por: list[str] | None = None, nivel: float = NIVEL) -> pd.DataFrame:
+    """
+    Votantes del padrón completo (conocidos + imputados entre los sin
+    información) por los grupos `por` de `tabla_celdas`, o en total si
+    `por` es None, con su intervalo de `nivel`.
+    """
+    p = self.probabilidad(tabla)
+    desconocidos = tabla["sin_informacion"].to_numpy(dtype="float64")
+    filas = pd.DataFrame({
+      "electores": tabla[["votaron", "no_votaron", "sin_informacion"]].sum(axis=1),
+      "votaron_conocidos": tabla["votaron"],
+      "sin_informacion": desconocidos,
+      "votaron_imputados": desconocidos * p,
+      "varianza": desconocidos * p * (1 - p),  # Bernoulli de cada elector
+    }, index=tabla.index)
+    # Método delta: gradiente del total imputado respecto de los coeficientes
+    gradiente = pd.DataFrame(self.diseno(tabla) * filas[["varianza"]].to_numpy(), index=tabla.index)
+    if por:
+      claves = [tabla[c] for c in por]
+      salida = filas.groupby(claves, observed=True, dropna=False).sum()
+      gradiente = gradiente.groupby(claves, observed=True, dropna=False).sum().to_numpy()
+    else:
+      salida = filas.sum().to_frame().T
+      gradiente = gradiente.sum().to_numpy()[None, :]
+
+    varianza = salida.pop("varianza").to_numpy() + np.einsum("gk,kl,gl->g", gradiente, self.covarianza, gradiente)
+    margen = NormalDist().inv_cdf((1 + nivel) / 2) * np.sqrt(varianza)
+    salida["imputados_inferior"] = np.clip(salida["votaron_imputados"] - margen, 0, salida["sin_informacion"])
+    salida["imputados_superior"] = np.clip(salida["votaron_imputados"] + margen, 0, salida["sin_informacion"])
+    for imputados, participacion in [
+      ("votaron_imputados", "participacion"),
+      ("imputados_inferior", "participacion_inferior"),
+      ("imputados_superior", "participacion_superior"),
+    ]:
+      salida[participacion] = (salida["votaron_conocidos"] + salida[imputados]) / salida["electores"]
+    return salida
+
+
+def _valores(serie: pd.Series) -> pd.Series:
+  """Valores como texto, con los faltantes como una categoría más."""
+  return serie.astype("object").where(serie.notna(), SIN_DATO).astype(str)
+
+
+# ========================
+#  CACHE
+# ========================
+@st.cache_data(show_spinner=False, max_entries=2 * VERSIONES_EN_CACHE)  # septiembre y octubre
+def _celdas_cacheadas(version: str, eleccion: str, _df: pd.DataFrame) -> pd.DataFrame:
+  return tabla_celdas(obtener_cubo(_df), eleccion)
+
+
+@st.cache_data(show_spinner="Ajustando modelo de participación...", max_entries=2 * VERSIONES_EN_CACHE)
+def _modelo_cacheado(version: str, eleccion: str, _df: pd.DataFrame) -> ModeloParticipacion | None:
+  tabla = _celdas_cacheadas(version, eleccion, _df)
+  if (tabla["votaron"] + tabla["no_votaron"]).sum() == 0:
+    return None
+  return ModeloParticipacion.ajustar(tabla)
+
+
+@st.cache_data(show_spinner="Imputando participación...", max_entries=8 * VERSIONES_EN_CACHE)  # elecciones × agrupaciones
+def _imputacion_cacheada(version: str, eleccion: str, por: tuple | None, _df: pd.DataFrame) -> pd.DataFrame | None:
+  modelo = _modelo_cacheado(version, eleccion, _df)
+  if modelo is None:
+    return None
+  return modelo.imputar(_celdas_cacheadas(version, eleccion, _df), list(por) if por else None)
+
+
+def obtener_modelo(df: pd.DataFrame, eleccion: str) -> ModeloParticipacion | None:
+  """Modelo de participación de `eleccion`, ajustado una vez por versión del padrón (None sin electores conocidos)."""
+  return _modelo_cacheado(version_padron(df), eleccion, df)
+
+
+def imputar_participacion(df: pd.DataFrame, eleccion: str, por: list[str] | None = None) -> pd.DataFrame | None:
+  """
+  Votantes imputados de `eleccion` sobre el padrón completo (ver
+  `ModeloParticipacion.imputar`), calculados una vez por versión del
+  padrón, elección y agrupación.
+  """
+  return _imputacion_cacheada(version_padron(df), eleccion, tuple(por) if por else None, df)
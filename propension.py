@@ -0,0 +1,180 @@
+"""
+Propensión de voto de cada elector: P(partido | franja etaria, resultado de su mesa).
+
+θ da P(partido | franja) para todo el distrito; el escrutinio de la mesa
+corrige esa probabilidad hacia lo que efectivamente se votó ahí. Es el
+mismo reparto del paso E del EM de `inferencia`:
+
+  q[m, g, p] ∝ θ[g, p] · V[m, p] / E[m, p],   E[m, p] = Σ_g N[m, g] θ[g, p]
+
+Las mesas sin escrutinio usan θ tal cual, y los electores sin fecha de
+nacimiento usan la mezcla de θ según la composición etaria del padrón.
+Como q depende solo de (mesa, franja), se calcula una tabla chica
+(M + 1) × (G + 1) × P y a cada elector se le asigna su fila: no hay
+cuentas por elector.
+
+Los puntajes se guardan como una matriz float32 electores × partidos en
+un .npy que se abre mapeado en memoria, alineada fila a fila con el
+padrón. La versión (padrón + θ + escrutinio) va en un .json al lado,
+así se recalcula solo cuando cambia alguno de los tres.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+import streamlit as st
+
+from clasificacion import BORDES_EDAD, decodificar_voto, edad_desde_nacimiento, rango_edad
+from inferencia import ARCHIVOS, resultados_eleccion, theta_desde_csv, version_archivo
+from padron import PREFIJO_VOTO, VERSIONES_EN_CACHE, escribir_meta, leer_meta, version_padron
+from participacion import obtener_modelo
+from resultados import ResultadosMesa, obtener_padron_por_mesa
+
+TAMANIO_BLOQUE = 200_000  # electores por bloque al escribir y al sumar
+
+
+# ========================
+#  ACTUALIZACIÓN POR MESA
+# ========================
+def tabla_posterior(theta: np.ndarray, N: np.ndarray, V: np.ndarray) -> np.ndarray:
+  """
+  q[m, g, p] para las M mesas de V, más una fila final para las mesas sin
+  escrutinio y una columna final para los electores sin franja etaria.
+  """
+  theta = np.asarray(theta, dtype="float64")
+  N = np.asarray(N, dtype="float64")
+  V = np.asarray(V, dtype="float64")
+  (M, G), P = N.shape, theta.shape[1]
+
+  # Franja desconocida: θ promedio ponderado por la composición del padrón
+  peso = N.sum(axis=0)
+  mezcla = peso @ theta / peso.sum() if peso.sum() > 0 else theta.mean(axis=0)
+  previa = np.vstack([theta, mezcla])  # (G + 1) × P
+
+  esperado = N @ theta
+  razon = np.divide(V, esperado, out=np.zeros_like(V), where=esperado > 0)
+  # Una mesa sin votos (o sin electores en el padrón) no corrige nada
+  razon[razon.sum(axis=1) == 0] = 1
+
+  tabla = np.empty((M + 1, G + 1, P))
+  tabla[:M] = previa[None, :, :] * razon[:, None, :]
+  tabla[M] = previa
+  total = tabla.sum(axis=2, keepdims=True)
+  return np.divide(tabla, total, out=np.full_like(tabla, 1 / P), where=total > 0)
+
+
+def indices_electores(df: pd.DataFrame, resultados: ResultadosMesa) -> tuple[np.ndarray, np.ndarray]:
+  """
+  Fila (mesa) y columna (franja) de cada elector en `tabla_posterior`;
+  las mesas sin escrutinio y las edades sin dato van a la última fila /
+  columna.
+  """
+  mesa = pd.to_numeric(df["mesa"], errors="coerce").to_numpy(dtype="float64", na_value=-1).astype(np.int64)
+  fila = resultados.filas(mesa)
+  fila[fila < 0] = len(resultados.mesas)
+  grupo = rango_edad(edad_desde_nacimiento(df["fecha_nacimiento"])).cat.codes.to_numpy().astype(np.int64)
+  grupo[grupo < 0] = len(BORDES_EDAD)
+  return fila, grupo
+
+
+def version_puntajes(df: pd.DataFrame, eleccion: str) -> str:
+  """Versión de las entradas de los puntajes: padrón, θ y escrutinio."""
+  archivos = ARCHIVOS[eleccion]
+  return f"{version_padron(df)}|{version_archivo(archivos['theta'])}|{version_archivo(archivos['resultados'])}"
+
+
+# ========================
+#  PUNTAJES
+# ========================
+def calcular_puntajes(df: pd.DataFrame, eleccion: str, ruta: str) -> tuple[np.ndarray, list[str]]:
+  """
+  Escribe en `ruta` la matriz electores × partidos (float32) y la devuelve
+  mapeada en memoria, junto con los partidos (columnas).
+  """
+  theta, partidos = theta_desde_csv(ARCHIVOS[eleccion]["theta"])
+  resultados = resultados_eleccion(eleccion, partidos)
+  N = obtener_padron_por_mesa(df, eleccion).diseno(mesas=resultados.mesas)
+  tabla = tabla_posterior(theta, N, resultados.votos).astype(np.float32)
+  fila, grupo = indices_electores(df, resultados)
+
+  # Se escribe en un temporal y se reemplaza: otra sesión puede estar leyendo
+  os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+  tmp = ruta + ".tmp"
+  salida = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float32, shape=(len(df), len(partidos)))
+  for inicio in range(0, len(df), TAMANIO_BLOQUE):
+    fin = inicio + TAMANIO_BLOQUE
+    salida[inicio:fin] = tabla[fila[inicio:fin], grupo[inicio:fin]]
+  salida.flush()
+  del salida
+  os.replace(tmp, ruta)
+  return np.load(ruta, mmap_mode="r"), partidos
+
+
+def cargar_puntajes(df: pd.DataFrame, eleccion: str) -> tuple[np.ndarray, list[str]]:
+  """Puntajes de `eleccion` desde el .npy si está al día; si no, los recalcula."""
+  ruta = ARCHIVOS[eleccion]["puntajes"]
+  ruta_meta = os.path.splitext(ruta)[0] + ".json"
+  version = version_puntajes(df, eleccion)
+  meta = leer_meta(ruta_meta)
+  if os.path.exists(ruta) and meta.get("version") == version:
+    return np.load(ruta, mmap_mode="r"), meta["partidos"]
+
+  puntajes, partidos = calcular_puntajes(df, eleccion, ruta)
+  escribir_meta(ruta_meta, {"version": version, "partidos": partidos})
+  return puntajes, partidos
+
+
+@st.cache_resource(show_spinner="Calculando propensiones...", max_entries=2 * VERSIONES_EN_CACHE)  # septiembre y octubre
+def _puntajes_cacheados(version: str, eleccion: str, _df: pd.DataFrame) -> tuple[np.ndarray, list[str]]:
+  return cargar_puntajes(_df, eleccion)
+
+
+def obtener_puntajes(df: pd.DataFrame, eleccion: str) -> tuple[np.ndarray, list[str]]:
+  """Matriz de puntajes mapeada, una por versión y elección para todas las sesiones."""
+  return _puntajes_cacheados(version_puntajes(df, eleccion), eleccion, df)
+
+
+# ========================
+#  VOTOS ESPERADOS
+# ========================
+def probabilidad_voto(df: pd.DataFrame, eleccion: str, resultados: ResultadosMesa) -> np.ndarray:
+  """
+  Probabilidad de que cada elector haya votado: 1 / 0 si su padrón de
+  mesa se conoce; si no, los votos emitidos en su mesa sobre sus
+  electores, o la participación imputada por `participacion` (según
+  edad, género, profesión y zona) si la mesa no tiene escrutinio.
+  """
+  columna = f"{PREFIJO_VOTO}{eleccion}"
+  voto = decodificar_voto(df[columna]) if columna in df.columns else np.full(len(df), -1, dtype=np.int8)
+  conocidos = voto >= 0
+  participacion = (voto == 1).sum() / conocidos.sum() if conocidos.any() else 1.0
+
+  padron_mesa = obtener_padron_por_mesa(df, eleccion)
+  filas = padron_mesa.filas(resultados.mesas)
+  electores = np.where(filas >= 0, padron_mesa.electores[np.maximum(filas, 0)], 0)
+  por_mesa = np.divide(resultados.emitidos, electores, out=np.full(len(electores), participacion), where=electores > 0)
+  por_mesa = np.append(np.clip(por_mesa, 0, 1), participacion)
+
+  fila, _ = indices_electores(df, resultados)
+  modelo = obtener_modelo(df, eleccion) if conocidos.any() else None
+  if modelo is not None:
+    sin_escrutinio = fila == len(resultados.mesas)
+    return np.where(conocidos, voto == 1, np.where(sin_escrutinio, modelo.probabilidad_electores(df), por_mesa[fila])).astype(np.float32)
+  return np.where(conocidos, voto == 1, por_mesa[fila]).astype(np.float32)
+
+
+def votos_esperados(puntajes: np.ndarray, peso: np.ndarray, codigos: np.ndarray, grupos: int) -> np.ndarray:
+  """
+  Σ peso · puntaje por grupo (código 0..grupos-1; -1 no suma): matriz
+  grupos × partidos. Recorre la matriz mapeada por bloques; cada bloque
+  se suma con un producto disperso grupo × elector (pesos) por bloque.
+  """
+  total = np.zeros((grupos, puntajes.shape[1]))
+  for inicio in range(0, len(puntajes), TAMANIO_BLOQUE):
+    fin = inicio + TAMANIO_BLOQUE
+    cod = codigos[inicio:fin]
+    validos = np.flatnonzero(cod >= 0)
+    suma = sp.csr_matrix((peso[inicio:fin][validos].astype("float64"), (cod[validos], validos)), shape=(grupos, len(cod)))
+    total += suma @ np.asarray(puntajes[inicio:fin])
+  return total
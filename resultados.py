@@ -0,0 +1,197 @@
+"""
+Resultados por mesa y su cruce con el padrón.
+
+`ResultadosMesa` guarda el escrutinio de una elección como una matriz
+densa mesa × partido (M × P, int64) con las mesas ordenadas: ubicar un
+conjunto de mesas es un searchsorted.
+
+`PadronPorMesa` resume el padrón por mesa en una sola pasada de
+bincount: electores, composición etaria de todos y de quienes votaron, y
+participación conocida (padrones de mesa transcriptos).
+
+`unir` alinea ambos por número de mesa una única vez; de esa unión sale
+la matriz de diseño de θ (`MesasUnidas.diseno`) sin volver a agrupar el
+padrón.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from clasificacion import BORDES_EDAD, decodificar_voto, edad_desde_nacimiento, rango_edad
+from padron import PREFIJO_VOTO, VERSIONES_EN_CACHE, version_padron
+
+
+def _filas(mesas_ordenadas: np.ndarray, mesas) -> np.ndarray:
+  # Posición de cada mesa en `mesas_ordenadas` (-1 si no está)
+  mesas = np.asarray(mesas, dtype=np.int64)
+  pos = np.searchsorted(mesas_ordenadas, mesas)
+  pos = np.minimum(pos, max(len(mesas_ordenadas) - 1, 0))
+  encontrada = (mesas_ordenadas[pos] == mesas) if len(mesas_ordenadas) else np.zeros(len(mesas), dtype=bool)
+  return np.where(encontrada, pos, -1)
+
+
+def _alinear(arreglo: np.ndarray, filas: np.ndarray) -> np.ndarray:
+  # Filas de `arreglo` en el orden de `filas`; ceros donde la fila es -1
+  salida = np.zeros((len(filas),) + arreglo.shape[1:], dtype=arreglo.dtype)
+  presentes = filas >= 0
+  salida[presentes] = arreglo[filas[presentes]]
+  return salida
+
+
+# ========================
+#  ESCRUTINIO POR MESA
+# ========================
+class ResultadosMesa:
+  """Votos por mesa y partido de una elección (matriz M × P)."""
+
+  def __init__(self, mesas, partidos, votos):
+    mesas = np.asarray(mesas, dtype=np.int64)
+    orden = np.argsort(mesas, kind="stable")
+    self.mesas = mesas[orden]
+    self.partidos = list(partidos)
+    self.votos = np.ascontiguousarray(np.asarray(votos, dtype=np.int64)[orden])
+
+  @classmethod
+  def leer(cls, ruta: str) -> "ResultadosMesa":
+    """TSV con una columna `mesa` y una columna por partido con la cantidad de votos."""
+    crudo = pd.read_csv(ruta, sep="\t")
+    votos = crudo.drop(columns="mesa").fillna(0)
+    return cls(crudo["mesa"].to_numpy(), votos.columns, votos.to_numpy())
+
+  @classmethod
+  def desde_dataframe(cls, resultados: pd.DataFrame) -> "ResultadosMesa":
+    """Frame indexado por mesa con una columna por partido."""
+    return cls(resultados.index.to_numpy(), resultados.columns, resultados.fillna(0).to_numpy())
+
+  def a_dataframe(self) -> pd.DataFrame:
+    return pd.DataFrame(self.votos, index=pd.Index(self.mesas, name="mesa"), columns=self.partidos)
+
+  def filas(self, mesas) -> np.ndarray:
+    """Fila de cada mesa en la matriz de votos (-1 si la mesa no tiene resultados)."""
+    return _filas(self.mesas, mesas)
+
+  @property
+  def emitidos(self) -> np.ndarray:
+    return self.votos.sum(axis=1)
+
+
+def leer_resultados_mesa(ruta: str) -> pd.DataFrame:
+  """Escrutinio por mesa como frame indexado por mesa (una columna por partido)."""
+  return ResultadosMesa.leer(ruta).a_dataframe()
+
+
+# ========================
+#  PADRÓN POR MESA
+# ========================
+class PadronPorMesa:
+  """
+  Agregados del padrón por mesa para una elección: `electores` (M),
+  `por_franja` y `votantes_por_franja` (M × G), `con_informacion` y
+  `votaron` (M). Las mesas quedan ordenadas.
+  """
+
+  def __init__(self, mesas, electores, por_franja, votantes_por_franja, con_informacion, votaron):
+    self.mesas = mesas
+    self.electores = electores
+    self.por_franja = por_franja
+    self.votantes_por_franja = votantes_por_franja
+    self.con_informacion = con_informacion
+    self.votaron = votaron
+
+  @classmethod
+  def desde_padron(cls, df: pd.DataFrame, eleccion: str) -> "PadronPorMesa":
+    mesa = pd.to_numeric(df["mesa"], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    con_mesa = ~np.isnan(mesa)
+    mesas, fila = np.unique(mesa[con_mesa].astype(np.int64), return_inverse=True)
+    M, G = len(mesas), len(BORDES_EDAD)
+
+    grupo = rango_edad(edad_desde_nacimiento(df["fecha_nacimiento"])).cat.codes.to_numpy()[con_mesa]
+    columna = f"{PREFIJO_VOTO}{eleccion}"
+    if columna in df.columns:
+      voto = decodificar_voto(df[columna])[con_mesa]
+    else:
+      voto = np.full(len(fila), -1, dtype=np.int8)
+
+    # Una celda por (mesa, franja); las edades sin dato no entran en las franjas
+    con_edad = grupo >= 0
+    celdas = fila[con_edad] * G + grupo[con_edad]
+    por_franja = np.bincount(celdas, minlength=M * G).reshape(M, G)
+    votantes_por_franja = np.bincount(celdas, weights=voto[con_edad] == 1, minlength=M * G).reshape(M, G).astype(np.int64)
+
+    return cls(
+      mesas,
+      np.bincount(fila, minlength=M),
+      por_franja,
+      votantes_por_franja,
+      np.bincount(fila, weights=voto >= 0, minlength=M).astype(np.int64),
+      np.bincount(fila, weights=voto == 1, minlength=M).astype(np.int64),
+    )
+
+  def filas(self, mesas) -> np.ndarray:
+    """Fila de cada mesa en los agregados (-1 si no hay electores de esa mesa)."""
+    return _filas(self.mesas, mesas)
+
+  @property
+  def con_padron(self) -> np.ndarray:
+    """Mesas con padrón de mesa transcripto (algún voto conocido)."""
+    return self.con_informacion > 0
+
+  def diseno(self, solo_votantes: bool = True, mesas=None) -> np.ndarray:
+    """
+    Mesa × franja etaria (M × G). Con `solo_votantes`, en las mesas con
+    padrón de mesa se cuentan solo quienes votaron; en el resto, todos
+    los electores de la mesa. Con `mesas`, filas en ese orden (ceros para
+    las mesas sin electores en el padrón).
+    """
+    if solo_votantes:
+      diseno = np.where(self.con_padron[:, None], self.votantes_por_franja, self.por_franja).astype("float64")
+    else:
+      diseno = self.por_franja.astype("float64")
+    return diseno if mesas is None else _alinear(diseno, self.filas(mesas))
+
+
+@st.cache_resource(show_spinner="Agrupando el padrón por mesa...", max_entries=2 * VERSIONES_EN_CACHE)  # septiembre y octubre
+def _padron_por_mesa_cacheado(version: str, eleccion: str, _df: pd.DataFrame) -> PadronPorMesa:
+  return PadronPorMesa.desde_padron(_df, eleccion)
+
+
+def obtener_padron_por_mesa(df: pd.DataFrame, eleccion: str) -> PadronPorMesa:
+  """Agregados por mesa por versión de datos y elección, compartidos entre sesiones."""
+  return _padron_por_mesa_cacheado(version_padron(df), eleccion, df)
+
+
+# ========================
+#  UNIÓN MESA × PADRÓN
+# ========================
+class MesasUnidas:
+  """
+  Escrutinio y agregados del padrón alineados por mesa, en el orden de
+  las mesas del escrutinio. `filas` es la fila de cada mesa en los
+  agregados del padrón (-1 si el padrón no tiene electores de esa mesa).
+  """
+
+  def __init__(self, resultados: ResultadosMesa, padron: PadronPorMesa, filas: np.ndarray):
+    self.resultados = resultados
+    self.padron = padron
+    self.filas = filas
+
+  @property
+  def mesas(self) -> np.ndarray:
+    return self.resultados.mesas
+
+  @property
+  def partidos(self) -> list[str]:
+    return self.resultados.partidos
+
+  @property
+  def V(self) -> np.ndarray:
+    return self.resultados.votos
+
+  def diseno(self, solo_votantes: bool = True) -> np.ndarray:
+    """Matriz de diseño de θ (M × G) alineada con `V`."""
+    return _alinear(self.padron.diseno(solo_votantes), self.filas)
+
+
+def unir(resultados: ResultadosMesa, padron: PadronPorMesa) -> MesasUnidas:
+  """Alinea el padrón por mesa con las mesas del escrutinio (un solo searchsorted)."""
+  return MesasUnidas(resultados, padron, padron.filas(resultados.mesas))
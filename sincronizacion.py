@@ -0,0 +1,215 @@
+import hashlib
+import json
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from almacenamiento import abrir_objeto, listar_objetos
+from padron import DIRECTORIO_CACHE, PREFIJO_VOTO, VERSIONES_EN_CACHE, escribir_meta, escribir_parquet, leer_meta
+
+# ===============================================================
+# Padrones por mesa particionados por (elección, mesa)
+#
+# En el storage cada padrón de mesa transcripto es un objeto
+#   <prefijo>/<eleccion>/mesa_<nro>.tsv   con columnas: orden, voto
+# Localmente cada partición se guarda como parquet y un manifiesto
+# recuerda la versión (ETag) de cada una. Sincronizar solo baja lo nuevo o
+# modificado, y el frame en memoria solo re-aplica esas mesas.
+# ===============================================================
+
+PATRON_PARTICION = re.compile(r"mesa_(\d+)\.tsv")
+BITS_ORDEN = 20  # clave (mesa, orden) empaquetada en un int64
+
+
+def _directorio_particiones(directorio: str) -> str:
+  return os.path.join(directorio, "particiones")
+
+
+def _ruta_particion(directorio: str, eleccion: str, mesa: int) -> str:
+  return os.path.join(_directorio_particiones(directorio), eleccion, f"mesa_{mesa}.parquet")
+
+
+def _ruta_manifiesto(directorio: str) -> str:
+  return os.path.join(_directorio_particiones(directorio), "manifiesto.json")
+
+
+def _version_objeto(objeto: dict) -> str:
+  """
+  ETag del objeto o, si el listado no lo trae, fecha de modificación y
+  tamaño. Vacío si no hay ninguno: la partición se trata siempre como
+  cambiada.
+  """
+  metadata = objeto.get("metadata") or {}
+  if metadata.get("eTag"):
+    return metadata["eTag"]
+  modificado = objeto.get("updated_at") or metadata.get("lastModified")
+  if modificado is None or metadata.get("size") is None:
+    return ""
+  return f"{modificado}/{metadata['size']}"
+
+
+def leer_particion(fuente) -> pd.DataFrame:
+  """Parsea el padrón de una mesa (orden + voto) desde una ruta o stream."""
+  return pd.read_csv(
+    fuente,
+    sep="\t",
+    usecols=["orden", "voto"],
+    dtype={"orden": "int32", "voto": "boolean"},
+  )
+
+
+# ========================
+#  SINCRONIZACIÓN CON STORAGE
+# ========================
+def sincronizar_particiones(url: str, key: str, bucket: str, prefijo: str, elecciones, directorio: str = DIRECTORIO_CACHE) -> dict:
+  """
+  Compara el listado remoto (solo metadata) con el manifiesto local y
+  descarga únicamente las particiones nuevas o con versión distinta (ETag,
+  o fecha y tamaño si no hay ETag). Las que ya no existen en el storage
+  se borran.
+
+  Devuelve {eleccion: set(mesas cambiadas)}.
+  """
+  ruta_manifiesto = _ruta_manifiesto(directorio)
+  manifiesto = leer_meta(ruta_manifiesto)
+  cambios = {}
+
+  for eleccion in elecciones:
+    locales = manifiesto.setdefault(eleccion, {})
+    remotos = {}
+    for objeto in listar_objetos(url, key, bucket, f"{prefijo.strip('/')}/{eleccion}"):
+      coincidencia = PATRON_PARTICION.fullmatch(objeto["name"])
+      if coincidencia:
+        remotos[str(int(coincidencia.group(1)))] = (objeto["name"], _version_objeto(objeto))
+
+    cambiadas = set()
+    for mesa, (nombre, version) in remotos.items():
+      ruta = _ruta_particion(directorio, eleccion, int(mesa))
+      if version and locales.get(mesa) == version and os.path.exists(ruta):
+        continue
+      with abrir_objeto(url, key, bucket, f"{prefijo.strip('/')}/{eleccion}/{nombre}") as respuesta:
+        escribir_parquet(leer_particion(respuesta), ruta)
+      locales[mesa] = version
+      cambiadas.add(int(mesa))
+
+    for mesa in set(locales) - set(remotos):
+      ruta = _ruta_particion(directorio, eleccion, int(mesa))
+      if os.path.exists(ruta):
+        os.remove(ruta)
+      del locales[mesa]
+      cambiadas.add(int(mesa))
+
+    cambios[eleccion] = cambiadas
+
+  os.makedirs(_directorio_particiones(directorio), exist_ok=True)
+  escribir_meta(ruta_manifiesto, manifiesto)
+  return cambios
+
+
+# ========================
+#  FRAME SINCRONIZADO
+# ========================
+class PadronSincronizado:
+  """
+  Padrón base + votos de las particiones locales.
+
+  Guarda qué versión de cada partición ya está aplicada; `actualizar` solo
+  lee del disco las particiones que cambiaron desde la última vez y produce
+  un frame nuevo (copia superficial + columna de voto reemplazada), así las
+  sesiones que ya tienen el anterior no se ven afectadas.
+  """
+
+  def __init__(self, df_base: pd.DataFrame, directorio: str = DIRECTORIO_CACHE):
+    self.df = df_base
+    self.version_base = df_base.attrs.get("version", "")
+    self.directorio = directorio
+    self.aplicadas = {}
+    self._lock = threading.Lock()
+
+    # Índice (mesa, orden) → fila, ordenado para búsquedas binarias
+    claves = (df_base["mesa"].to_numpy(np.int64) << BITS_ORDEN) | df_base["orden"].to_numpy(np.int64)
+    self._orden = np.argsort(claves, kind="stable")
+    self._claves = claves[self._orden]
+
+  def _filas_de_mesa(self, mesa: int) -> np.ndarray:
+    inicio, fin = np.searchsorted(self._claves, [mesa << BITS_ORDEN, (mesa + 1) << BITS_ORDEN])
+    return self._orden[inicio:fin]
+
+  def _filas_de_ordenes(self, mesa: int, ordenes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # Devuelve las filas encontradas y la máscara de órdenes que existen en el padrón
+    if len(self._claves) == 0:
+      return np.zeros(0, dtype=np.int64), np.zeros(len(ordenes), dtype=bool)
+    claves = (np.int64(mesa) << BITS_ORDEN) | ordenes.astype(np.int64)
+    pos = np.searchsorted(self._claves, claves).clip(max=len(self._claves) - 1)
+    encontradas = self._claves[pos] == claves
+    return self._orden[pos[encontradas]], encontradas
+
+  def _aplicar_eleccion(self, df: pd.DataFrame, eleccion: str, mesas: set) -> pd.DataFrame:
+    columna = f"{PREFIJO_VOTO}{eleccion}"
+    if columna in df.columns:
+      estado = df[columna].to_numpy(dtype="int8", na_value=-1)
+    else:
+      estado = np.full(len(df), -1, dtype=np.int8)
+
+    for mesa in mesas:
+      # Primero se limpia la mesa (cubre correcciones y particiones borradas)
+      estado[self._filas_de_mesa(mesa)] = -1
+      ruta = _ruta_particion(self.directorio, eleccion, mesa)
+      if os.path.exists(ruta):
+        particion = pd.read_parquet(ruta)
+        filas, encontradas = self._filas_de_ordenes(mesa, particion["orden"].to_numpy())
+        estado[filas] = particion["voto"].to_numpy(dtype="int8", na_value=-1)[encontradas]
+
+    df[columna] = pd.arrays.BooleanArray(estado == 1, estado < 0)
+    return df
+
+  def actualizar(self) -> pd.DataFrame:
+    """Aplica las particiones del manifiesto que todavía no están en memoria."""
+    manifiesto = leer_meta(_ruta_manifiesto(self.directorio))
+    with self._lock:
+      pendientes = {}
+      for eleccion, mesas in manifiesto.items():
+        aplicadas = self.aplicadas.get(eleccion, {})
+        # Sin versión (ni ETag ni fecha y tamaño) no se sabe si cambió: se re-aplica
+        cambiadas = {int(m) for m, version in mesas.items() if not version or aplicadas.get(m) != version}
+        cambiadas |= {int(m) for m in set(aplicadas) - set(mesas)}
+        if cambiadas:
+          pendientes[eleccion] = cambiadas
+
+      if not pendientes:
+        return self.df
+
+      df = self.df.copy(deep=False)
+      for eleccion, mesas in pendientes.items():
+        df = self._aplicar_eleccion(df, eleccion, mesas)
+
+      firma = json.dumps(manifiesto, sort_keys=True)
+      df.attrs["version"] = hashlib.sha1(f"{self.version_base}/{firma}".encode()).hexdigest()
+      self.df = df
+      self.aplicadas = {e: dict(m) for e, m in manifiesto.items()}
+      return df
+
+
+@st.cache_data(ttl=300, show_spinner="Sincronizando padrones de mesa...")
+def _sincronizar(url: str, key: str, bucket: str, prefijo: str, elecciones: tuple) -> dict:
+  return sincronizar_particiones(url, key, bucket, prefijo, elecciones)
+
+
+@st.cache_resource(max_entries=VERSIONES_EN_CACHE)
+def _padron_sincronizado(version_base: str, _df_base: pd.DataFrame) -> PadronSincronizado:
+  return PadronSincronizado(_df_base)
+
+
+def obtener_padron_sincronizado(df_base: pd.DataFrame, url: str, key: str, bucket: str, prefijo: str, elecciones) -> pd.DataFrame:
+  """
+  Devuelve el padrón con los votos de todas las mesas transcriptas hasta
+  ahora. Cada lote nuevo de mesas cuesta una descarga por mesa nueva y una
+  actualización en memoria de esas filas, no una recarga del padrón.
+  """
+  _sincronizar(url, key, bucket, prefijo, tuple(elecciones))
+  estado = _padron_sincronizado(df_base.attrs.get("version", ""), df_base)
+  return estado.actualizar().copy(deep=False)
@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+import shapely
+import streamlit as st
+
+from padron import VERSIONES_EN_CACHE, hash_archivo, version_padron
+
+RUTA_ZONAS = "data/zonas_coronel_rosales.tsv"
+
+
+# ========================
+#  CATÁLOGO DE POLÍGONOS
+# ========================
+def cargar_zonas(ruta: str = RUTA_ZONAS) -> pd.DataFrame:
+  """
+  Lee el TSV de vértices (zona, poligono, orden, lat, lon) y devuelve una
+  fila por polígono con su `key` ("ZONA 1 - 1"), los vértices ordenados,
+  la geometría de shapely y los datos derivados que usa el mapa
+  (centroide, área y caja envolvente), calculados una sola vez.
+  """
+  df_poly = pd.read_csv(ruta, sep="\t")
+  df_poly["zona"] = df_poly["zona"].astype(str).str.strip()
+  df_poly["poligono"] = df_poly["poligono"].astype(str).str.strip()
+  df_poly = df_poly.sort_values(["zona", "poligono", "orden"], kind="stable")
+
+  zonas = []
+  for (zona, poligono), grupo in df_poly.groupby(["zona", "poligono"], sort=False):
+    coords = grupo[["lon", "lat"]].to_numpy()
+    zonas.append({
+      "key": f"{zona} - {poligono}",
+      "zona": zona,
+      "poligono": poligono,
+      "coords": coords.tolist(),
+      "geometry": shapely.Polygon(coords),
+    })
+  zonas = pd.DataFrame(zonas)
+
+  geometrias = zonas["geometry"].to_numpy()
+  centroides = shapely.centroid(geometrias)
+  zonas["lon"] = shapely.get_x(centroides)
+  zonas["lat"] = shapely.get_y(centroides)
+  zonas["area"] = shapely.area(geometrias)
+  zonas[["xmin", "ymin", "xmax", "ymax"]] = shapely.bounds(geometrias)
+  return zonas.set_index("key", drop=False)
+
+
+@st.cache_resource(show_spinner="Cargando polígonos...", max_entries=VERSIONES_EN_CACHE)
+def _zonas_cacheadas(ruta: str, version: str) -> pd.DataFrame:
+  zonas = cargar_zonas(ruta)
+  zonas.attrs["version"] = version
+  return zonas
+
+
+def obtener_zonas(ruta: str = RUTA_ZONAS) -> pd.DataFrame:
+  """Catálogo de polígonos, cacheado por el hash del archivo de zonas."""
+  return _zonas_cacheadas(ruta, hash_archivo(ruta))
+
+
+# ========================
+#  GEOCODIFICACIÓN
+# ========================
+def asignar_zonas(lon: np.ndarray, lat: np.ndarray, geometrias) -> np.ndarray:
+  """
+  Índice del polígono que contiene a cada punto (-1 si no cae en ninguno
+  o no tiene coordenadas).
+
+  Los puntos fuera de la caja que envuelve a todos los polígonos se
+  descartan sin consultar el árbol; el resto se resuelve en bloque con
+  un STRtree. Un punto sobre un borde compartido queda en el primero.
+  """
+  lon = np.asarray(lon, dtype="float64")
+  lat = np.asarray(lat, dtype="float64")
+  geometrias = np.asarray(geometrias, dtype=object)
+  resultado = np.full(len(lon), -1, dtype=np.int32)
+
+  xmin, ymin, xmax, ymax = shapely.total_bounds(geometrias)
+  candidatos = np.flatnonzero(
+    np.isfinite(lon) & np.isfinite(lat)
+    & (lon >= xmin) & (lon <= xmax) & (lat >= ymin) & (lat <= ymax)
+  )
+  if len(candidatos) == 0:
+    return resultado
+
+  arbol = shapely.STRtree(geometrias)
+  puntos, poligonos = arbol.query(shapely.points(lon[candidatos], lat[candidatos]), predicate="intersects")
+
+  # Si un punto cae en más de un polígono se queda con el de menor índice
+  orden = np.lexsort((poligonos, puntos))
+  puntos, poligonos = puntos[orden], poligonos[orden]
+  _, primeros = np.unique(puntos, return_index=True)
+  resultado[candidatos[puntos[primeros]]] = poligonos[primeros]
+  return resultado
+
+
+def clave_padron(df: pd.DataFrame) -> pd.Categorical:
+  """
+  "ZONA - POLIGONO" precargado en el padrón, como categórica. El texto se
+  arma solo para los pares distintos, no para cada elector.
+  """
+  zona = df["zona"].astype("category").cat
+  poligono = df["poligono"].astype("category").cat
+  z, p = zona.codes.to_numpy(), poligono.codes.to_numpy()
+  ancho = len(poligono.categories)
+  pares = np.where((z >= 0) & (p >= 0), z.astype(np.int64) * ancho + p, -1)
+
+  # Un par sin zona o sin polígono (-1) queda primero y pasa a código -1
+  unicos, codigos = np.unique(pares, return_inverse=True)
+  validos = unicos[unicos >= 0]
+  codigos = codigos - (len(unicos) - len(validos))
+  z, p = np.divmod(validos, ancho)
+  categorias = [f"{zona.categories[i]} - {poligono.categories[j]}" for i, j in zip(z, p)]
+  return pd.Categorical.from_codes(codigos, categorias)
+
+
+def geocodificar_padron(df: pd.DataFrame, zonas: pd.DataFrame) -> pd.DataFrame:
+  """
+  Zona y polígono de cada elector según sus coordenadas.
+
+  Devuelve un frame alineado con `df` con `zona_geo`, `poligono_geo`,
+  `key_geo` (NaN si el elector cae fuera de todos los polígonos),
+  `fuera_de_zona` (tiene coordenadas pero ningún polígono lo contiene),
+  `key_padron` (la clave precargada en el padrón) y `zona_distinta`
+  (cae en un polígono distinto al del padrón).
+  """
+  idx = asignar_zonas(df["lon"].to_numpy(), df["lat"].to_numpy(), zonas["geometry"].to_numpy())
+  asignado = idx >= 0
+  con_coords = df["lon"].notna().to_numpy() & df["lat"].notna().to_numpy()
+
+  def columna(nombre):
+    categorias = pd.Index(zonas[nombre].unique())
+    por_poligono = categorias.get_indexer(zonas[nombre])
+    codigos = np.where(asignado, por_poligono[idx.clip(0)], -1)
+    return pd.Categorical.from_codes(codigos, categorias)
+
+  # Polígono del catálogo que corresponde a la clave del padrón (-1 si no está)
+  key_padron = clave_padron(df)
+  idx_padron = zonas.index.get_indexer(key_padron.categories)[key_padron.codes]
+  idx_padron[key_padron.codes < 0] = -1
+
+  return pd.DataFrame({
+    "zona_geo": columna("zona"),
+    "poligono_geo": columna("poligono"),
+    "key_geo": columna("key"),
+    "fuera_de_zona": con_coords & ~asignado,
+    "key_padron": key_padron,
+    "zona_distinta": asignado & (idx != idx_padron),
+  }, index=df.index)
+
+
+@st.cache_resource(show_spinner="Asignando zonas...", max_entries=VERSIONES_EN_CACHE)
+def _geocodificacion_cacheada(version_datos: str, version_zonas: str, _df: pd.DataFrame, _zonas: pd.DataFrame) -> pd.DataFrame:
+  return geocodificar_padron(_df, _zonas)
+
+
+def obtener_geocodificacion(df: pd.DataFrame, zonas: pd.DataFrame) -> pd.DataFrame:
+  """
+  `geocodificar_padron` cacheado por versión de padrón y de zonas. Es un
+  único frame compartido entre sesiones: solo lectura.
+  """
+  return _geocodificacion_cacheada(version_padron(df), zonas.attrs.get("version", ""), df, zonas)